@@ -0,0 +1,76 @@
+"""
+Benchmark alphagrammizing an uploaded word list: the old per-word sort
+with a key function, versus get_alphas_from_words, which alphagrammizes
+the whole file at once.
+
+    ./manage.py benchmark_alphagrammize --words 40000 --alphabet spanish
+
+"""
+
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from base.models import SORT_MAP
+from base.utils import get_alphas_from_words
+
+ALPHABETS = {
+    "english": "ABCDEFGHIJKLMNOPQRSTUVWXYZ",
+    # 1, 2 and 3 stand for the digraphs CH, LL and RR.
+    "spanish": "ABC1DEFGHIJL2MNÑOPQR3STUVXYZ",
+    "polish": "AĄBCĆDEĘFGHIJKLŁMNŃOÓPRSŚTUWYZŹŻ",
+}
+
+
+def synthetic_words(num_words, alphabet, seed=0):
+    rng = random.Random(seed)
+    return [
+        "".join(rng.choice(alphabet) for _ in range(rng.randint(2, 15)))
+        for _ in range(num_words)
+    ]
+
+
+def per_word(contents):
+    """get_alphas_from_words as it was, one sort with a key per word."""
+    alphas = set()
+    for line in contents.split("\n"):
+        letters = list(line.strip().upper())
+        letters.sort(key=lambda y: SORT_MAP[y])
+        alphas.add("".join(letters))
+    return alphas
+
+
+def batch(contents):
+    return set(get_alphas_from_words(contents, len(contents)))
+
+
+class Command(BaseCommand):
+    help = """Benchmarks alphagrammizing an uploaded word list."""
+
+    def add_arguments(self, parser):
+        parser.add_argument("--words", type=int, default=40000)
+        parser.add_argument("--runs", type=int, default=10)
+        parser.add_argument("--alphabet", choices=sorted(ALPHABETS), default="english")
+
+    def handle(self, *args, **options):
+        contents = "\n".join(
+            synthetic_words(options["words"], ALPHABETS[options["alphabet"]])
+        )
+        if per_word(contents) != batch(contents):
+            raise CommandError("The two alphagrammizers differ")
+        for name, fn in (("per word", per_word), ("batch", batch)):
+            elapsed = []
+            for _ in range(options["runs"]):
+                start = time.time()
+                fn(contents)
+                elapsed.append(time.time() - start)
+            elapsed.sort()
+            self.stdout.write(
+                "{:9s} {} words: median {:.1f} ms, max {:.1f} ms".format(
+                    name,
+                    options["words"],
+                    elapsed[len(elapsed) // 2] * 1000,
+                    elapsed[-1] * 1000,
+                )
+            )
@@ -0,0 +1,170 @@
+"""
+Benchmark reading part of a big packed list, with its questions column
+stored compressed (Postgres' default, EXTENDED) and uncompressed
+(EXTERNAL, as migrations base 0012 and wordwalls 0018 set them): a
+round's questions from a saved list, and the last flashcard chunk of a
+named list. The deferred read fetches just the ranges it needs with
+SUBSTR, which on a compressed value has to decompress it up to the end
+of each range.
+
+Changes the column storage and creates the lists in a transaction, and
+rolls everything back. ALTER TABLE locks the tables until then, so run
+this against a local database.
+
+    ./manage.py benchmark_column_storage --questions 200000 --indices 50
+
+"""
+
+import json
+import random
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from base.models import Lexicon, WordList
+from whitleyCards.views import QUIZ_CHUNK_SIZE
+from wordwalls.models import NamedList
+
+
+class Rollback(Exception):
+    pass
+
+
+def synthetic_questions(num_questions):
+    return [
+        {"q": "Q{:07d}".format(i), "a": ["Q{:07d}W".format(i)]}
+        for i in range(num_questions)
+    ]
+
+
+def whole_row(pk, indices):
+    return WordList.objects.get(pk=pk).orig_questions_at(indices)
+
+
+def deferred(pk, indices):
+    sl = WordList.objects.defer(*WordList.QUESTION_FIELDS).get(pk=pk)
+    return sl.orig_questions_at(indices)
+
+
+def named_list_whole(pk, start):
+    return NamedList.objects.get(pk=pk).get_questions()[start : start + QUIZ_CHUNK_SIZE]
+
+
+def named_list_deferred(pk, start):
+    nl = NamedList.objects.defer("questions").get(pk=pk)
+    return nl.questions_slice(start, start + QUIZ_CHUNK_SIZE)
+
+
+class Command(BaseCommand):
+    help = """Benchmarks range reads of a packed list, compressed or not."""
+
+    def add_arguments(self, parser):
+        parser.add_argument("--questions", type=int, default=200000)
+        parser.add_argument(
+            "--indices",
+            type=int,
+            default=50,
+            help="Random questions read per run, like one round",
+        )
+        parser.add_argument("--runs", type=int, default=10)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options["questions"], options["indices"], options["runs"])
+                raise Rollback()
+        except Rollback:
+            pass
+
+    def run(self, num_questions, num_indices, runs):
+        user = User.objects.order_by("pk").first()
+        lexicon = Lexicon.objects.order_by("pk").first()
+        questions = synthetic_questions(num_questions)
+        sl = WordList()
+        sl.initialize_list(list(questions), lexicon, user, save=False)
+        sl.user = user
+        sl.pack()
+        sl.save()
+        nl = NamedList(
+            lexicon=lexicon,
+            numQuestions=num_questions,
+            wordLength=8,
+            isRange=False,
+            questions=json.dumps(questions),
+            name="benchmark",
+        )
+        nl.pack()
+        nl.save()
+        rng = random.Random(0)
+        indices = [rng.randrange(num_questions) for _ in range(num_indices)]
+        last_chunk = (num_questions - 1) // QUIZ_CHUNK_SIZE * QUIZ_CHUNK_SIZE
+
+        cases = (
+            (
+                "saved list, {} questions".format(num_indices),
+                sl,
+                "origQuestions",
+                indices,
+                whole_row,
+                deferred,
+            ),
+            (
+                "named list, last chunk",
+                nl,
+                "questions",
+                last_chunk,
+                named_list_whole,
+                named_list_deferred,
+            ),
+        )
+        for name, row, column, arg, whole, part in cases:
+            if whole(row.pk, arg) != part(row.pk, arg):
+                raise CommandError("{}: the two reads differ".format(name))
+            for storage in ("EXTENDED", "EXTERNAL"):
+                stored = self.set_storage(row, column, storage)
+                self.stdout.write(
+                    "{}, {}: {} questions, {:.0f} kB stored".format(
+                        name, storage, num_questions, stored / 1024
+                    )
+                )
+                for how, fn in (("whole row", whole), ("deferred", part)):
+                    elapsed = []
+                    for _ in range(runs):
+                        t = time.time()
+                        fn(row.pk, arg)
+                        elapsed.append(time.time() - t)
+                    elapsed.sort()
+                    self.stdout.write(
+                        "  {:9s} median {:.1f} ms, max {:.1f} ms".format(
+                            how, elapsed[len(elapsed) // 2] * 1000, elapsed[-1] * 1000
+                        )
+                    )
+
+    def set_storage(self, row, column, storage):
+        """
+        Set the storage of `row`'s table's `column`, and write its value
+        again so it's stored that way. Returns the value's stored size.
+
+        """
+        table = row._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'ALTER TABLE {} ALTER COLUMN "{}" SET STORAGE {}'.format(
+                    table, column, storage
+                )
+            )
+            cursor.execute(
+                'UPDATE {0} SET "{1}" = "{1}" || \'\' WHERE id = %s'.format(
+                    table, column
+                ),
+                [row.pk],
+            )
+            cursor.execute(
+                'SELECT pg_column_size("{}") FROM {} WHERE id = %s'.format(
+                    column, table
+                ),
+                [row.pk],
+            )
+            return cursor.fetchone()[0]
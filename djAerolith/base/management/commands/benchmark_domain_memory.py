@@ -0,0 +1,85 @@
+"""
+Measure how much memory lib.domain Questions take, per question, when
+built from a challenge-style list and from word DB protobufs.
+
+    ./manage.py benchmark_domain_memory --questions 40000 --words 3
+
+"""
+
+import gc
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+
+from lib.domain import Questions
+import rpc.wordsearcher.searcher_pb2 as pb
+
+
+def synthetic_list(num_questions, num_words):
+    return [
+        {
+            "q": "Q{:07d}".format(i),
+            "a": ["Q{:07d}{}".format(i, w) for w in range(num_words)],
+        }
+        for i in range(num_questions)
+    ]
+
+
+def synthetic_pb(num_questions, num_words):
+    return [
+        pb.Alphagram(
+            alphagram="Q{:07d}".format(i),
+            probability=i + 1,
+            combinations=1000,
+            words=[
+                pb.Word(
+                    word="Q{:07d}{}".format(i, w),
+                    alphagram="Q{:07d}".format(i),
+                    definition="a definition of average length, maybe",
+                    front_hooks="ABC",
+                    back_hooks="S",
+                    lexicon_symbols="#",
+                )
+                for w in range(num_words)
+            ],
+        )
+        for i in range(num_questions)
+    ]
+
+
+class Command(BaseCommand):
+    help = """Measures the memory used by lib.domain Questions."""
+
+    def add_arguments(self, parser):
+        parser.add_argument("--questions", type=int, default=40000)
+        parser.add_argument("--words", type=int, default=3)
+
+    def handle(self, *args, **options):
+        num_questions = options["questions"]
+        num_words = options["words"]
+        sources = (
+            ("list", Questions.set_from_list, synthetic_list),
+            ("protobuf", Questions.set_from_pb_alphagrams, synthetic_pb),
+        )
+        for name, setter, make_source in sources:
+            source = make_source(num_questions, num_words)
+            gc.collect()
+            tracemalloc.start()
+            start = time.time()
+            qs = Questions()
+            setter(qs, source)
+            elapsed = time.time() - start
+            size, _ = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            self.stdout.write(
+                "{:8s} {} questions x {} words: {:.0f} bytes/question, "
+                "{:.1f} ms".format(
+                    name,
+                    num_questions,
+                    num_words,
+                    size / num_questions,
+                    elapsed * 1000,
+                )
+            )
+            del qs
@@ -0,0 +1,148 @@
+"""
+Benchmark reading one flashcard chunk of a big saved or named list: the
+whole list decoded and sliced, versus just the chunk read from a deferred
+column. The first and the last chunk are timed separately. Expanding the
+chunk with the word DB isn't included.
+
+Creates the lists in a transaction and rolls everything back.
+
+    ./manage.py benchmark_list_chunks --questions 100000 --runs 10
+
+"""
+
+import json
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from base.models import Lexicon, WordList
+from whitleyCards.views import QUIZ_CHUNK_SIZE
+from wordwalls.models import NamedList
+
+
+class Rollback(Exception):
+    pass
+
+
+def synthetic_questions(num_questions):
+    return [
+        {"q": "Q{:07d}".format(i), "a": ["Q{:07d}W".format(i)]}
+        for i in range(num_questions)
+    ]
+
+
+def saved_list_whole(pk, start, stop):
+    return WordList.objects.get(pk=pk).get_orig_questions()[start:stop]
+
+
+def saved_list_chunk(pk, start, stop):
+    sl = WordList.objects.defer(*WordList.QUESTION_FIELDS).get(pk=pk)
+    return sl.orig_questions_slice(start, stop)
+
+
+def first_missed_whole(pk, start, stop):
+    sl = WordList.objects.get(pk=pk)
+    return sl.orig_questions_at(sl.get_first_missed()[start:stop])
+
+
+def first_missed_chunk(pk, start, stop):
+    sl = WordList.objects.defer(*WordList.QUESTION_FIELDS).get(pk=pk)
+    return sl.orig_questions_at(sl.first_missed_slice(start, stop))
+
+
+def named_list_json(pk, start, stop):
+    return json.loads(NamedList.objects.get(pk=pk).questions)[start:stop]
+
+
+def named_list_chunk(pk, start, stop):
+    return NamedList.objects.defer("questions").get(pk=pk).questions_slice(
+        start, stop
+    )
+
+
+class Command(BaseCommand):
+    help = """Benchmarks reading the first and last chunk of a big list."""
+
+    def add_arguments(self, parser):
+        parser.add_argument("--questions", type=int, default=100000)
+        parser.add_argument("--runs", type=int, default=10)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options["questions"], options["runs"])
+                raise Rollback()
+        except Rollback:
+            pass
+
+    def run(self, num_questions, runs):
+        user = User.objects.order_by("pk").first()
+        lexicon = Lexicon.objects.order_by("pk").first()
+        questions = synthetic_questions(num_questions)
+
+        sl = WordList()
+        sl.initialize_list(questions, lexicon, user, save=False)
+        sl.user = user
+        sl.pack()
+        sl.set_first_missed(list(range(0, num_questions, 2)))
+        sl.numFirstMissed = len(range(0, num_questions, 2))
+        sl.save()
+        nl_json = NamedList.objects.create(
+            lexicon=lexicon,
+            numQuestions=num_questions,
+            wordLength=8,
+            isRange=False,
+            questions=json.dumps(questions),
+            name="benchmark",
+        )
+        nl_packed = NamedList(
+            lexicon=lexicon,
+            numQuestions=num_questions,
+            wordLength=8,
+            isRange=False,
+            questions=json.dumps(questions),
+            name="benchmark",
+        )
+        nl_packed.pack()
+        nl_packed.save()
+
+        cases = (
+            ("saved list", sl, num_questions, saved_list_whole, saved_list_chunk),
+            (
+                "first missed",
+                sl,
+                sl.numFirstMissed,
+                first_missed_whole,
+                first_missed_chunk,
+            ),
+        )
+        for name, wl, total, whole, chunk in cases:
+            self.compare(name, runs, total, (whole, wl.pk), (chunk, wl.pk))
+        self.compare(
+            "named list",
+            runs,
+            num_questions,
+            (named_list_json, nl_json.pk),
+            (named_list_chunk, nl_packed.pk),
+        )
+
+    def compare(self, name, runs, total, whole, chunk):
+        last = (total - 1) // QUIZ_CHUNK_SIZE * QUIZ_CHUNK_SIZE
+        for label, start in (("first", 0), ("last", last)):
+            stop = start + QUIZ_CHUNK_SIZE
+            if whole[0](whole[1], start, stop) != chunk[0](chunk[1], start, stop):
+                raise CommandError("{}: chunks differ".format(name))
+            for how, (fn, pk) in (("whole", whole), ("chunk", chunk)):
+                elapsed = []
+                for _ in range(runs):
+                    t = time.time()
+                    fn(pk, start, stop)
+                    elapsed.append(time.time() - t)
+                elapsed.sort()
+                self.stdout.write(
+                    "{:12s} {:5s} chunk, {}: median {:.1f} ms".format(
+                        name, label, how, elapsed[len(elapsed) // 2] * 1000
+                    )
+                )
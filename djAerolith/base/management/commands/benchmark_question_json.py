@@ -0,0 +1,58 @@
+"""
+Benchmark writing expanded questions as JSON: through Question objects and
+`to_python_full` dicts, versus straight from the word DB protobufs with
+lib/question_json.py.
+
+    ./manage.py benchmark_question_json --questions 10000 --runs 10
+
+"""
+
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from base.management.commands.benchmark_domain_memory import synthetic_pb
+from base.utils import generate_question_list
+from lib.domain import Questions
+from lib.question_json import question_list_json
+from lib.wdb_interface.question_cache import pb_entry
+
+
+def via_objects(pbas):
+    qs = Questions()
+    qs.set_from_pb_alphagrams(pbas)
+    return json.dumps(generate_question_list(qs), ensure_ascii=False)
+
+
+def via_entries(pbas):
+    return "".join(question_list_json([pb_entry(pba) for pba in pbas]))
+
+
+class Command(BaseCommand):
+    help = """Benchmarks serializing expanded questions to JSON."""
+
+    def add_arguments(self, parser):
+        parser.add_argument("--questions", type=int, default=10000)
+        parser.add_argument("--words", type=int, default=3)
+        parser.add_argument("--runs", type=int, default=10)
+
+    def handle(self, *args, **options):
+        pbas = synthetic_pb(options["questions"], options["words"])
+        if via_objects(pbas) != via_entries(pbas):
+            raise CommandError("The two serializations differ")
+        for name, fn in (("objects", via_objects), ("direct", via_entries)):
+            elapsed = []
+            for _ in range(options["runs"]):
+                start = time.time()
+                fn(pbas)
+                elapsed.append(time.time() - start)
+            elapsed.sort()
+            self.stdout.write(
+                "{:8s} {} questions: median {:.1f} ms, max {:.1f} ms".format(
+                    name,
+                    options["questions"],
+                    elapsed[len(elapsed) // 2] * 1000,
+                    elapsed[-1] * 1000,
+                )
+            )
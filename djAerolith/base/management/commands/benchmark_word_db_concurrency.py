@@ -0,0 +1,120 @@
+"""
+Load test the word DB clients: the same calls made by a few threads with
+the blocking clients, as sync workers would make them, versus many at once
+from one event loop with the asyncio clients that async views use.
+
+    ./manage.py benchmark_word_db_concurrency --calls 500 --threads 2 \
+        --concurrency 100 --call search
+
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from base.models import Lexicon
+from lib.wdb_interface.anagrammer import aanagram_letters, anagram_letters
+from lib.wdb_interface.wdb_helper import aword_search, word_search
+from lib.wdb_interface.word_searches import SearchDescription
+
+RACK = "AEINRST?"
+
+
+def search_descriptions(lexicon):
+    return [
+        SearchDescription.lexicon(lexicon),
+        SearchDescription.length(7, 7),
+        SearchDescription.probability_range(1, 100),
+    ]
+
+
+class Command(BaseCommand):
+    help = """Compares word DB throughput of sync threads and asyncio."""
+
+    def add_arguments(self, parser):
+        parser.add_argument("--calls", type=int, default=500)
+        parser.add_argument(
+            "--threads",
+            type=int,
+            default=2,
+            help="Threads making blocking calls, like sync workers",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=100,
+            help="Async calls in flight at once",
+        )
+        parser.add_argument("--call", choices=["anagram", "search"], default="anagram")
+        parser.add_argument("--lexicon", default="NWL20")
+
+    def handle(self, *args, **options):
+        lexicon = Lexicon.objects.get(lexiconName=options["lexicon"])
+        if options["call"] == "anagram":
+
+            def call():
+                return anagram_letters(lexicon.lexiconName, RACK)
+
+            def acall():
+                return aanagram_letters(lexicon.lexiconName, RACK)
+
+        else:
+            sds = search_descriptions(lexicon)
+
+            def call():
+                return word_search(sds, expand=True)
+
+            def acall():
+                return aword_search(sds, expand=True)
+
+        calls = options["calls"]
+        self.report(
+            "sync, {} threads".format(options["threads"]),
+            calls,
+            *self.run_sync(call, calls, options["threads"]),
+        )
+        self.report(
+            "async, {} in flight".format(options["concurrency"]),
+            calls,
+            *asyncio.run(self.run_async(acall, calls, options["concurrency"])),
+        )
+
+    def run_sync(self, call, calls, threads):
+        def timed(_):
+            t = time.time()
+            call()
+            return time.time() - t
+
+        start = time.time()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            latencies = list(executor.map(timed, range(calls)))
+        return time.time() - start, latencies
+
+    async def run_async(self, acall, calls, concurrency):
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def timed():
+            async with semaphore:
+                t = time.time()
+                await acall()
+                return time.time() - t
+
+        start = time.time()
+        latencies = await asyncio.gather(*(timed() for _ in range(calls)))
+        return time.time() - start, latencies
+
+    def report(self, name, calls, elapsed, latencies):
+        latencies = sorted(latencies)
+        self.stdout.write(
+            "{:20s} {} calls in {:.2f} s: {:.0f} calls/s, "
+            "median latency {:.1f} ms, max {:.1f} ms".format(
+                name,
+                calls,
+                elapsed,
+                calls / elapsed,
+                latencies[len(latencies) // 2] * 1000,
+                latencies[-1] * 1000,
+            )
+        )
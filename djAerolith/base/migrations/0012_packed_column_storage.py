@@ -0,0 +1,33 @@
+from django.db import migrations
+
+# Packed lists are read a range at a time with SUBSTR (see ColumnReader in
+# base/models.py). Postgres has to decompress a compressed value up to the
+# end of the range to do that, so keep these columns out of line but
+# uncompressed. The packed format is base64 and doesn't compress much
+# anyway.
+TABLE = 'wordwalls_savedlist'
+COLUMNS = ('origQuestions', 'curQuestions', 'firstMissed')
+
+
+def set_storage(storage):
+    return ['ALTER TABLE {} ALTER COLUMN "{}" SET STORAGE {}'.format(
+        TABLE, column, storage) for column in COLUMNS]
+
+
+# SET STORAGE only applies to values written after it; write the packed
+# lists again, so they're stored uncompressed too.
+REWRITE_PACKED = 'UPDATE {} SET {} WHERE version = 3'.format(
+    TABLE, ', '.join('"{0}" = "{0}" || \'\''.format(column)
+                     for column in COLUMNS))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0011_auto_20190124_2058'),
+    ]
+
+    operations = [
+        migrations.RunSQL(set_storage('EXTERNAL'), set_storage('EXTENDED')),
+        migrations.RunSQL(REWRITE_PACKED, migrations.RunSQL.noop),
+    ]
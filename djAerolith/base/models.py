@@ -16,16 +16,27 @@
 
 # To contact the author, please email delsolar at gmail dot com
 
+import codecs
 import random
 import json
 import uuid
 
+from django.conf import settings
 from django.utils import timezone
 from django.db import models
+from django.db.models.functions import Length, Right, Substr
 from django.contrib.auth.models import User
 
 from base.validators import word_list_format_validator
 from lib.dates import pretty_date
+from lib.packing import (
+    B64Reader,
+    PackedIndices,
+    PackedQuestions,
+    pack_indices,
+    pack_questions,
+    unpack_indices,
+)
 
 EXCLUDED_LEXICA = [
     "OWL2",
@@ -51,21 +62,47 @@ EXCLUDED_LEXICA = [
 # It is pretty ghetto.
 # Consider reworking with lexicon-specific reordering (see macondo e.g.)
 SORT_STRING_ORDER = "AĄÄBCĆ1DEĘFGHIJKLŁ2MNŃÑOÓÖPQR3SŚTUÜVWXYZŹŻ?"
-SORT_MAP = {}
+SORT_MAP = {letter: idx for idx, letter in enumerate(SORT_STRING_ORDER)}
+# A charmap codec that encodes each letter as the byte RANK_BASE + its rank
+# (and newlines as themselves), so a whole text of words is ranked in one
+# pass, a word sorts as bytes with no key function, and the sorted text
+# decodes back in one pass. Letters not in SORT_MAP don't encode.
+_RANK_BASE = 0x21
 
 
-def make_sort_map():
-    global SORT_MAP
-    for idx, val in enumerate(SORT_STRING_ORDER):
-        SORT_MAP[val] = idx
+def _rank_decoding_table():
+    table = ["\ufffe"] * 256  # undefined
+    table[ord("\n")] = "\n"
+    for letter, idx in SORT_MAP.items():
+        table[_RANK_BASE + idx] = letter
+    return "".join(table)
+
+
+_RANK_DECODING_TABLE = _rank_decoding_table()
+_RANK_ENCODING_MAP = codecs.charmap_build(_RANK_DECODING_TABLE)
 
 
 def alphagrammize(word):
-    if len(SORT_MAP) == 0:
-        make_sort_map()
-    letters = list(word.upper())
-    letters.sort(key=lambda y: SORT_MAP[y])
-    return "".join(letters)
+    return "".join(sorted(word.upper(), key=SORT_MAP.__getitem__))
+
+
+def alphagrammize_words(words):
+    """
+    Alphagrammize a list of words (with no newlines in them) at once. The
+    output is the same as alphagrammize's for each word, and so is the
+    KeyError for a letter that can't be sorted.
+
+    """
+    if not words:
+        return []
+    text = "\n".join(words).upper()
+    try:
+        ranked, _ = codecs.charmap_encode(text, "strict", _RANK_ENCODING_MAP)
+    except UnicodeEncodeError as e:
+        raise KeyError(e.object[e.start])
+    sorted_ranks = b"\n".join(map(bytes, map(sorted, ranked.split(b"\n"))))
+    text, _ = codecs.charmap_decode(sorted_ranks, "strict", _RANK_DECODING_TABLE)
+    return text.split("\n")
 
 
 class Maintenance(models.Model):
@@ -84,6 +121,49 @@ class Lexicon(models.Model):
         return self.lexiconName
 
 
+class ColumnReader(B64Reader):
+    """
+    Reads byte ranges of a packed text column straight from the database,
+    so we don't have to load the whole column to get at part of it.
+
+    Postgres can only read part of a column this way cheaply if it's
+    stored uncompressed; migrations set STORAGE EXTERNAL on the columns
+    this reads.
+
+    """
+
+    # Enough to cover the headers in lib/packing.py.
+    PREFIX_CHARS = 12
+    # Substrings per query.
+    BATCH_SIZE = 500
+
+    def __init__(self, instance, field):
+        self._rows = type(instance)._base_manager.filter(pk=instance.pk)
+        self._field = field
+        num_chars, tail, self._prefix = self._rows.values_list(
+            Length(field), Right(field, 2), Substr(field, 1, self.PREFIX_CHARS)
+        ).get()
+        self._len = self._decoded_length(num_chars or 0, tail or "")
+
+    def __len__(self):
+        return self._len
+
+    def _chars(self, ranges):
+        chunks = [None] * len(ranges)
+        to_fetch = {}
+        for i, (start, stop) in enumerate(ranges):
+            if stop <= len(self._prefix):
+                chunks[i] = self._prefix[start:stop]
+            else:
+                to_fetch["c{}".format(i)] = Substr(self._field, start + 1, stop - start)
+        keys = list(to_fetch)
+        for b in range(0, len(keys), self.BATCH_SIZE):
+            batch = {k: to_fetch[k] for k in keys[b : b + self.BATCH_SIZE]}
+            for k, text in self._rows.values(**batch).get().items():
+                chunks[int(k[1:])] = text
+        return chunks
+
+
 class SavedList(models.Model):
     CATEGORY_ANAGRAM = "A"  # Regular word walls
     CATEGORY_BUILD = "B"  # Subwords
@@ -97,6 +177,15 @@ class SavedList(models.Model):
         (CATEGORY_TYPING, "Typing"),
     )
 
+    # Version 2 lists store their questions and indices as JSON.
+    # Version 3 lists store them packed (see lib/packing.py), so that
+    # parts of them can be read without decoding the whole list.
+    VERSION_JSON = 2
+    VERSION_PACKED = 3
+    # The potentially huge columns. Defer these when loading a list to
+    # quiz on; the accessors below will then read just the parts they need.
+    QUESTION_FIELDS = ("origQuestions", "curQuestions", "missed", "firstMissed")
+
     lexicon = models.ForeignKey(Lexicon, on_delete=models.CASCADE)
     created = models.DateTimeField(auto_now_add=True)
     lastSaved = models.DateTimeField(auto_now=True)
@@ -163,11 +252,15 @@ class SavedList(models.Model):
         self.numMissed = 0
         self.goneThruOnce = False
         self.questionIndex = 0
-        self.origQuestions = json.dumps(questions)
-        self.curQuestions = json.dumps(list(range(num_questions)))
-        self.missed = json.dumps([])
-        self.firstMissed = json.dumps([])
-        self.version = 2
+        if save and num_questions >= settings.WORD_LIST_PACK_THRESHOLD:
+            self.version = self.VERSION_PACKED
+            self.origQuestions = pack_questions(questions)
+        else:
+            self.version = self.VERSION_JSON
+            self.origQuestions = json.dumps(questions)
+        self.set_cur_questions(list(range(num_questions)))
+        self.set_missed([])
+        self.set_first_missed([])
         self.category = category
         if save:
             self.user = user
@@ -203,7 +296,7 @@ class SavedList(models.Model):
     def restart_list(self, shuffle=False):
         """Restart this list; save it back to the database."""
         self.initialize_list(
-            json.loads(self.origQuestions),
+            self.get_orig_questions(),
             self.lexicon,
             self.user,
             shuffle,
@@ -216,7 +309,7 @@ class SavedList(models.Model):
         self.curQuestions = self.firstMissed
         self.numCurAlphagrams = self.numFirstMissed
         self.questionIndex = 0
-        self.missed = json.dumps([])
+        self.set_missed([])
         self.numMissed = 0
         self.save()
 
@@ -225,10 +318,105 @@ class SavedList(models.Model):
         self.curQuestions = self.missed
         self.numCurAlphagrams = self.numMissed
         self.questionIndex = 0
-        self.missed = json.dumps([])
+        self.set_missed([])
         self.numMissed = 0
         self.save()
 
+    def is_packed(self):
+        return self.version == self.VERSION_PACKED
+
+    def _decode_indices(self, value):
+        if self.is_packed():
+            return unpack_indices(value)
+        return json.loads(value)
+
+    def _encode_indices(self, indices):
+        if self.is_packed():
+            return pack_indices(indices)
+        return json.dumps(indices)
+
+    def get_orig_questions(self):
+        """Return all questions, as a list of {'q': .., 'a': [..]}."""
+        if self.is_packed():
+            return PackedQuestions(self.origQuestions).tolist()
+        return json.loads(self.origQuestions)
+
+    def _packed_source(self, field):
+        """
+        The text of a packed field, or a reader for it in the database if
+        the field wasn't loaded.
+
+        """
+        if field in self.get_deferred_fields():
+            return ColumnReader(self, field)
+        return getattr(self, field)
+
+    def orig_questions_at(self, indices):
+        """Return the questions at the given origQuestions indices."""
+        if self.is_packed():
+            return PackedQuestions(self._packed_source("origQuestions")).take(indices)
+        orig_questions = json.loads(self.origQuestions)
+        return [orig_questions[i] for i in indices]
+
+    def orig_questions_slice(self, start, stop):
+        """Return origQuestions[start:stop]."""
+        if self.is_packed():
+            return PackedQuestions(self._packed_source("origQuestions")).slice(
+                start, stop
+            )
+        return json.loads(self.origQuestions)[start:stop]
+
+    def _indices_slice(self, field, start, stop):
+        if self.is_packed():
+            return PackedIndices(self._packed_source(field)).slice(start, stop)
+        return json.loads(getattr(self, field))[start:stop]
+
+    def get_cur_questions(self):
+        return self._decode_indices(self.curQuestions)
+
+    def cur_questions_slice(self, start, stop):
+        """Return curQuestions[start:stop] (indices into origQuestions)."""
+        return self._indices_slice("curQuestions", start, stop)
+
+    def set_cur_questions(self, indices):
+        self.curQuestions = self._encode_indices(indices)
+
+    def get_missed(self):
+        return self._decode_indices(self.missed)
+
+    def set_missed(self, indices):
+        self.missed = self._encode_indices(indices)
+
+    def get_first_missed(self):
+        return self._decode_indices(self.firstMissed)
+
+    def first_missed_slice(self, start, stop):
+        """Return firstMissed[start:stop] (indices into origQuestions)."""
+        return self._indices_slice("firstMissed", start, stop)
+
+    def set_first_missed(self, indices):
+        self.firstMissed = self._encode_indices(indices)
+
+    def pack(self):
+        """Convert a JSON (version 2) list to the packed format. Doesn't save."""
+        if self.is_packed():
+            return
+        orig_questions = json.loads(self.origQuestions)
+        cur_questions = json.loads(self.curQuestions)
+        missed = json.loads(self.missed)
+        first_missed = json.loads(self.firstMissed)
+        self.version = self.VERSION_PACKED
+        self.origQuestions = pack_questions(orig_questions)
+        self.set_cur_questions(cur_questions)
+        self.set_missed(missed)
+        self.set_first_missed(first_missed)
+
+    def clean_fields(self, exclude=None):
+        # The format validator only understands JSON lists.
+        if self.is_packed():
+            exclude = list(exclude or []) + ["origQuestions"]
+        super().clean_fields(exclude=exclude)
+
     def to_python(self):
         """
         Converts to a serializable Python object.
@@ -242,10 +430,10 @@ class SavedList(models.Model):
             "numMissed": self.numMissed,
             "goneThruOnce": self.goneThruOnce,
             "questionIndex": self.questionIndex,
-            "origQuestions": json.loads(self.origQuestions),
-            "curQuestions": json.loads(self.curQuestions),
-            "missed": json.loads(self.missed),
-            "firstMissed": json.loads(self.firstMissed),
+            "origQuestions": self.get_orig_questions(),
+            "curQuestions": self.get_cur_questions(),
+            "missed": self.get_missed(),
+            "firstMissed": self.get_first_missed(),
             "version": self.version,
             "id": self.pk,
             "temporary": self.is_temporary,
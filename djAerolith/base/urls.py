@@ -8,6 +8,7 @@ from base.views import (
     list_questions_view,
     questions_for_prob_range,
     word_lookup,
+    word_db_stats,
 )
 
 urlpatterns = [
@@ -18,4 +19,5 @@ urlpatterns = [
     re_path(r"^api/word_db/full_questions/$", list_questions_view),
     re_path(r"^api/word_db/questions_prob_range/$", questions_for_prob_range),
     re_path(r"^api/word_lookup$", word_lookup),
+    re_path(r"^api/word_db/stats/$", word_db_stats),
 ]
@@ -1,16 +1,26 @@
+import asyncio
+import json
 import logging
 from typing import List
 
 from django.utils.translation import gettext as _
 
-from base.models import alphagrammize
+from base.models import alphagrammize, alphagrammize_words
+from lib.question_json import (
+    question_list_json,
+    question_list_json_pages,
+    question_map_json,
+    question_map_json_pages,
+)
 from lib.wdb_interface.wdb_helper import (
-    questions_from_probability_range,
-    questions_from_alpha_dicts,
+    aquestion_entries_from_alpha_dicts,
+    question_entries_from_alpha_dicts,
+    question_entries_from_probability_range,
 )
 
 logger = logging.getLogger(__name__)
 FETCH_MANY_SIZE = 1000
+MAX_WORD_LENGTH = 15
 
 
 class UserListParseException(Exception):
@@ -23,11 +33,19 @@ def get_alphas_from_words(contents: str, max_words: int) -> List[str]:
     alphagrams
 
     """
+    words = [line.strip() for line in contents.split("\n")]
+    if len(words) <= max_words and max(map(len, words)) <= MAX_WORD_LENGTH:
+        # The usual case: alphagrammize the whole file at once.
+        try:
+            return list(set(alphagrammize_words([w for w in words if len(w) > 1])))
+        except KeyError:
+            raise UserListParseException(_("List contains invalid characters."))
+    # Go line by line, to give the error for the first bad line.
     line_number = 0
     alpha_set = set()
     for line in contents.split("\n"):
         word = line.strip()
-        if len(word) > 15:
+        if len(word) > MAX_WORD_LENGTH:
             raise UserListParseException(_("List contains non-word elements"))
         line_number += 1
         if line_number > max_words:
@@ -62,29 +80,106 @@ def generate_question_map(questions):
     return q_map
 
 
-def generate_question_list_from_alphagrams(lexicon, alph_objects):
+def question_entry_pages_from_alphagrams(lexicon, alph_objects, page_size):
     """
-    Generate a list of questions from a list of {'q': ..., 'a': [..]}
-    objects.
+    Expand a list of {'q': ..., 'a': [..]} objects `page_size` at a time,
+    lazily; yields a list of question cache entries per page.
 
     """
-    return generate_question_list(questions_from_alpha_dicts(lexicon, alph_objects))
+    for i in range(0, len(alph_objects), page_size):
+        yield question_entries_from_alpha_dicts(
+            lexicon, alph_objects[i : i + page_size]
+        )
+
 
+async def aquestion_entry_pages_from_alphagrams(lexicon, alph_objects, page_size):
+    """question_entry_pages_from_alphagrams, as an async iterator."""
+    for i in range(0, len(alph_objects), page_size):
+        yield await aquestion_entries_from_alpha_dicts(
+            lexicon, alph_objects[i : i + page_size]
+        )
 
-def generate_question_map_from_alphagrams(lexicon, alph_objects):
+
+async def aquestion_entries_from_alphagrams(lexicon, alph_objects, page_size):
     """
-    Generate a question map from a list of {'q': ..., 'a': [..]} objects.
+    The question cache entries for a list of {'q': ..., 'a': [..]}
+    objects, expanded `page_size` at a time, with all the word DB calls
+    made at once.
 
     """
-    return generate_question_map(questions_from_alpha_dicts(lexicon, alph_objects))
+    pages = await asyncio.gather(
+        *(
+            aquestion_entries_from_alpha_dicts(
+                lexicon, alph_objects[i : i + page_size]
+            )
+            for i in range(0, len(alph_objects), page_size)
+        )
+    )
+    return [entry for page in pages for entry in page]
+
 
+def question_entry_pages_from_probabilities(lexicon, p_min, p_max, length, page_size):
+    """
+    Expand a probability range `page_size` probabilities at a time,
+    lazily; yields a list of question cache entries per page.
 
-def expanded_question_list_from_probabilities(lexicon, p_min, p_max, length):
-    """Generate a full list of questions from a probability range."""
-    questions = questions_from_probability_range(
-        lexicon, p_min, p_max, length, expand=True
+    """
+    # Past the last probability the word DB finds nothing, and says so
+    # with an error.
+    p_max = min(p_max, json.loads(lexicon.lengthCounts).get(str(length), 0))
+    for start in range(p_min, p_max + 1, page_size):
+        yield question_entries_from_probability_range(
+            lexicon, start, min(start + page_size - 1, p_max), length
+        )
+
+
+def question_list_json_from_alphagrams(lexicon, alph_objects, page_size=None):
+    """
+    Generate the JSON list of questions for a list of
+    {'q': ..., 'a': [..]} objects, in pieces (see lib/question_json.py).
+    With a `page_size`, the questions are only expanded as the pieces are
+    consumed, a page at a time.
+
+    """
+    if page_size:
+        return question_list_json_pages(
+            question_entry_pages_from_alphagrams(lexicon, alph_objects, page_size)
+        )
+    return question_list_json(
+        question_entries_from_alpha_dicts(lexicon, alph_objects)
+    )
+
+
+def question_map_json_from_alphagrams(lexicon, alph_objects, page_size=None):
+    """
+    Generate the JSON question map for a list of {'q': ..., 'a': [..]}
+    objects, in pieces; paged like question_list_json_from_alphagrams.
+
+    """
+    if page_size:
+        return question_map_json_pages(
+            question_entry_pages_from_alphagrams(lexicon, alph_objects, page_size)
+        )
+    return question_map_json(question_entries_from_alpha_dicts(lexicon, alph_objects))
+
+
+def expanded_question_list_json_from_probabilities(
+    lexicon, p_min, p_max, length, page_size=None
+):
+    """
+    Generate the JSON list of full questions for a probability range;
+    paged like question_list_json_from_alphagrams.
+
+    """
+    if page_size:
+        return question_list_json_pages(
+            question_entry_pages_from_probabilities(
+                lexicon, p_min, p_max, length, page_size
+            )
+        )
+    return question_list_json(
+        question_entries_from_probability_range(lexicon, p_min, p_max, length)
     )
-    return generate_question_list(questions)
 
 
 def quizzes_response(quizzes):
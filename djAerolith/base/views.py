@@ -22,19 +22,30 @@ import json
 import logging
 import time
 
+from asgiref.sync import sync_to_async
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
 from django.core.exceptions import ValidationError
 from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
 from django.views.decorators.csrf import csrf_exempt
 from django.shortcuts import render
 
 from base.models import WordList, Lexicon, AlphagramTag, alphagrammize
 
-from base.utils import (generate_question_map_from_alphagrams,
-                        generate_question_list_from_alphagrams,
-                        expanded_question_list_from_probabilities)
-from lib.wdb_interface.anagrammer import anagram_letters, WDBError
-from lib.response import response, StatusCode
+from base.utils import (aquestion_entries_from_alphagrams,
+                        aquestion_entry_pages_from_alphagrams,
+                        question_list_json_from_alphagrams,
+                        question_map_json_from_alphagrams,
+                        expanded_question_list_json_from_probabilities)
+from lib.async_views import async_login_required
+from lib.question_json import aquestion_map_json_pages, question_map_json
+from lib.wdb_interface.anagrammer import aanagram_letters, WDBError
+from lib.wdb_interface.client_pool import pool_stats
+from lib.wdb_interface.question_cache import question_cache_stats
+from lib.response import (json_response, response, StatusCode,
+                          streaming_json_response)
 
 logger = logging.getLogger(__name__)
 
@@ -88,6 +99,8 @@ def saved_list_sync(request):
         sl.full_clean()
     except ValidationError as e:
         return response('Your saved list is improperly formatted: %s', e)
+    if len(orig_qs) >= settings.WORD_LIST_PACK_THRESHOLD:
+        sl.pack()
     sl.save()
     profile.wordwallsSaveListSize += len(orig_qs)
     profile.save()
@@ -210,9 +223,12 @@ def saved_list(request, id):
 
 
 def save_stars(request, stars, sl):
-    origQuestions = json.loads(sl.origQuestions)
+    indices = [int(qidx) for qidx in stars]
+    alphas = {
+        idx: q['q'] for idx, q in zip(indices, sl.orig_questions_at(indices))
+    }
     for qidx, star_obj in stars.items():
-        alph = origQuestions[int(qidx)]['q']
+        alph = alphas[int(qidx)]
         if star_obj['s'] == 0:
             logger.debug('Creating user tag for %s: %s - %s (%s) ',
                          request.user, alph, sl.lexicon, star_obj['t'])
@@ -239,9 +255,9 @@ def edit_saved_list(request, sl):
     sl.numMissed = body.get('numMissed')
     sl.goneThruOnce = body.get('goneThruOnce')
     sl.questionIndex = body.get('questionIndex')
-    sl.curQuestions = json.dumps(body.get('curQuestions'))
-    sl.missed = json.dumps(body.get('missed'))
-    sl.firstMissed = json.dumps(body.get('firstMissed'))
+    sl.set_cur_questions(body.get('curQuestions'))
+    sl.set_missed(body.get('missed'))
+    sl.set_first_missed(body.get('firstMissed'))
     try:
         sl.full_clean()
     except ValidationError as e:
@@ -259,28 +275,61 @@ def map_stars_to_tag(star_ct):
     return 'D{}'.format(star_ct)
 
 
-@login_required
-def question_map(request):
+def _question_json_response(request, make_pieces):
+    """
+    Respond with the question JSON that `make_pieces(page_size)` writes.
+    With ?stream=1 the questions are fetched from the word DB a page at a
+    time while the response is being sent, so memory stays bounded.
+
+    """
+    if request.GET.get('stream') == '1':
+        return streaming_json_response(
+            make_pieces(settings.WORD_DB_STREAM_PAGE_SIZE))
+    return json_response(make_pieces(None))
+
+
+@transaction.non_atomic_requests
+@async_login_required
+async def question_map(request):
     """
     Stand-alone endpoint for loading a question map. This is usually
     called after the user makes a request to load a remote quiz.
 
+    The list is expanded a page (WORD_DB_STREAM_PAGE_SIZE questions) per
+    word DB call, with all the calls in flight at once; with ?stream=1,
+    one page at a time, as the response is sent. Under WSGI, the streamed
+    pages are fetched by the server's thread with the blocking client, as
+    a WSGI server can only stream a sync iterator; Django reads an async
+    one to the end before sending any of it.
+
     XXX: Maybe should not be two endpoints. See new_quiz in flashcards.views
 
     """
     if request.method != 'GET':
         return response('This endpoint only accepts GET', status=400)
     try:
-        sl = WordList.objects.get(user=request.user,
-                                  id=request.GET.get('listId'))
+        sl = await WordList.objects.select_related('lexicon').aget(
+            user=request.user, id=request.GET.get('listId'))
     except WordList.DoesNotExist:
         return response('This list does not exist!', status=404)
 
     t1 = time.time()
-    q_map = generate_question_map_from_alphagrams(sl.lexicon,
-                                                  json.loads(sl.origQuestions))
+    orig_questions = sl.get_orig_questions()
+    page_size = settings.WORD_DB_STREAM_PAGE_SIZE
+    if request.GET.get('stream') == '1':
+        if isinstance(request, ASGIRequest):
+            pieces = aquestion_map_json_pages(
+                aquestion_entry_pages_from_alphagrams(
+                    sl.lexicon, orig_questions, page_size))
+        else:
+            pieces = question_map_json_from_alphagrams(
+                sl.lexicon, orig_questions, page_size)
+        return streaming_json_response(pieces)
+    entries = await aquestion_entries_from_alphagrams(
+        sl.lexicon, orig_questions, page_size)
+    q_map = json_response(question_map_json(entries))
     logger.info('Map generated, returning. Time: %s s.' % (time.time() - t1))
-    return response(q_map)
+    return q_map
 
 
 @csrf_exempt
@@ -300,7 +349,9 @@ def list_questions_view(request):
         lex = Lexicon.objects.get(lexiconName=lexicon_name)
     except Lexicon.DoesNotExist:
         return response('Bad Lexicon', StatusCode.BAD_REQUEST)
-    return response(generate_question_list_from_alphagrams(lex, questions))
+    return _question_json_response(
+        request, lambda page_size: question_list_json_from_alphagrams(
+            lex, questions, page_size))
 
 
 @csrf_exempt
@@ -317,7 +368,18 @@ def questions_for_prob_range(request):
         lex = Lexicon.objects.get(lexiconName=lexicon_name)
     except Lexicon.DoesNotExist:
         return response('Bad Lexicon', StatusCode.BAD_REQUEST)
-    return response(expanded_question_list_from_probabilities(lex, pmin, pmax, length))
+    return _question_json_response(
+        request, lambda page_size: expanded_question_list_json_from_probabilities(
+            lex, pmin, pmax, length, page_size))
+
+
+@staff_member_required
+def word_db_stats(request):
+    """ Word DB client pool and question cache stats, for this process. """
+    return response({
+        'client_pool': pool_stats(),
+        'question_cache': question_cache_stats(),
+    })
 
 
 @login_required
@@ -325,14 +387,15 @@ def listmanager(request):
     return render(request, 'listmanager.html')
 
 
-@login_required
-def word_lookup(request):
+@transaction.non_atomic_requests
+@async_login_required
+async def word_lookup(request):
     lexicon = request.GET.get('lexicon')
     letters = request.GET.get('letters')
     if letters.startswith('!'):
-        return alphagram_history_search(request)
+        return await sync_to_async(alphagram_history_search)(request)
     try:
-        results = anagram_letters(lexicon, letters)
+        results = await aanagram_letters(lexicon, letters)
     except WDBError as e:
         return response(str(e), StatusCode.BAD_REQUEST)
     return response(results)
@@ -355,7 +418,7 @@ def alphagram_history_search(request):
     lists = WordList.objects.filter(user=request.user, lexicon=lex_obj).filter(
         category=WordList.CATEGORY_ANAGRAM).filter(is_temporary=False)
     for wl in lists:
-        questions = json.loads(wl.origQuestions)
+        questions = wl.get_orig_questions()
         for idx, q in enumerate(questions):
             if q['q'] == alphagram:
                 summary.append(get_q_summary(wl, idx, alphagram))
@@ -370,8 +433,8 @@ def get_q_summary(wl, q_idx, alphagram):
 
     """
     q_summary = []
-    missed = json.loads(wl.missed)
-    first_missed = json.loads(wl.firstMissed)
+    missed = wl.get_missed()
+    first_missed = wl.get_first_missed()
     question_index = wl.questionIndex
     gone_thru_once = wl.goneThruOnce
     last_saved = wl.lastSaved
@@ -1,6 +1,20 @@
+"""
+ASGI entry point, which the Docker image serves (see gunicorn.py):
+
+    gunicorn djaerolith.asgi:application --config gunicorn.py
+
+Under an ASGI server the async views (see lib/async_views.py) wait on the
+word DB without holding a worker, and each worker process keeps one
+event loop, so its word DB connections stay alive between requests.
+Under WSGI (e.g. runserver) every async view gets an event loop of its
+own instead.
+
+"""
+
 import os
-from channels.asgi import get_channel_layer
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "djaerolith.settings")
 
-channel_layer = get_channel_layer()
+from django.core.asgi import get_asgi_application  # noqa: E402
+
+application = get_asgi_application()
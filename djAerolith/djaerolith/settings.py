@@ -356,12 +356,65 @@ AWS_SECRET_ACCESS_KEY = os.environ.get("AWS_SECRET_ACCESS_KEY")
 WORD_DB_SERVER_ADDRESS = os.environ.get(
     "WORD_DB_SERVER_ADDRESS", "http://word_db_server:8180"
 )
+# Idle keep-alive sessions to keep per process, and the default timeout
+# (seconds) for word DB calls. See lib/wdb_interface/client_pool.py.
+WORD_DB_CLIENT_POOL_SIZE = int(os.environ.get("WORD_DB_CLIENT_POOL_SIZE", 8))
+WORD_DB_TIMEOUT = 30
+# Word DB calls async views can have in flight at once, per process. See
+# lib/wdb_interface/async_client.py.
+WORD_DB_ASYNC_MAX_CONNECTIONS = int(
+    os.environ.get("WORD_DB_ASYNC_MAX_CONNECTIONS", 100)
+)
+# Expanded questions to keep in process memory, per process. See
+# lib/wdb_interface/question_cache.py.
+WORD_DB_QUESTION_CACHE_SIZE = int(os.environ.get("WORD_DB_QUESTION_CACHE_SIZE", 20000))
+# Questions to expand per word DB call when a question list or map is
+# streamed (?stream=1). See base/views.py.
+WORD_DB_STREAM_PAGE_SIZE = 1000
+# Searches being flashcarded, kept per process so that each chunk only
+# expands its own questions. See whitleyCards/search_cursor.py.
+WHITLEYCARDS_CURSOR_CACHE_SIZE = 50
+WHITLEYCARDS_CURSOR_TTL = 2 * 60 * 60
+WHITLEYCARDS_CURSOR_MAX_QUESTIONS = 100000
+# "server" talks to the word_db_server over Twirp; "local" reads its SQLite
+# lexicon databases from WORD_DB_LOCATION in-process. See
+# lib/wdb_interface/local_backend.py.
+WORD_DB_BACKEND = os.environ.get("WORD_DB_BACKEND", "server")
+WORD_DB_LOCATION = os.environ.get("WORD_DB_LOCATION", "")
 
 BACKUP_BUCKET_SUFFIX = os.environ.get("BACKUP_BUCKET_SUFFIX")
 
 SAVE_LIST_LIMIT_NONMEMBER = 15000
 SAVE_LIST_LIMIT_MEMBER = 5000000
 WORDWALLS_QUESTIONS_PER_ROUND = 50
+# Word lists with at least this many questions are stored packed (see
+# lib/packing.py) rather than as JSON.
+WORD_LIST_PACK_THRESHOLD = 10000
+# Where the live state of a round is kept between guesses. See
+# wordwalls/table_state.py. One of "db", "locmem", "cache".
+WORDWALLS_TABLE_STATE_BACKEND = os.environ.get("WORDWALLS_TABLE_STATE_BACKEND", "db")
+WORDWALLS_TABLE_STATE_CACHE = os.environ.get("WORDWALLS_TABLE_STATE_CACHE", "default")
+# Longer than the longest possible round (an hour).
+WORDWALLS_TABLE_STATE_TIMEOUT = 2 * 60 * 60
+# The cache that shares table-creation meta info between processes, and
+# how often (seconds) a process checks whether its copy is still current.
+# See wordwalls/meta_info.py.
+WORDWALLS_META_INFO_CACHE = "default"
+WORDWALLS_META_INFO_CHECK_SECS = 30
+# How long a serialized leaderboard may be cached. Writing an entry or a
+# medal drops it right away. See wordwalls/leaderboards.py.
+WORDWALLS_LEADERBOARD_CACHE_TIMEOUT = 10 * 60
+# How many parsed daily challenges a process keeps, and for how long
+# (seconds). See wordwalls/challenge_cache.py.
+WORDWALLS_CHALLENGE_CACHE_SIZE = 256
+WORDWALLS_CHALLENGE_CACHE_SECS = 10 * 60
+# Expand the next round's questions in the background when a round ends
+# or a list is loaded; rounds kept per process, for how long (seconds), and
+# the threads that expand them. See wordwalls/round_prefetch.py.
+WORDWALLS_PREFETCH = True
+WORDWALLS_PREFETCH_CACHE_SIZE = 200
+WORDWALLS_PREFETCH_TTL = 10 * 60
+WORDWALLS_PREFETCH_WORKERS = 2
 
 SECURE_PROXY_SSL_HEADER = ("HTTP_X_FORWARDED_PROTO", "https")
 
@@ -371,6 +424,10 @@ if "test" in sys.argv:
             "BACKEND": "django.core.cache.backends.dummy.DummyCache",
         }
     }
+    # Test transactions roll back without telling the challenge cache.
+    WORDWALLS_CHALLENGE_CACHE_SECS = 0
+    # Background threads would outlive the mocks of the tests that start them.
+    WORDWALLS_PREFETCH = False
 else:
     CACHES = {
         "default": {
@@ -1,14 +1,17 @@
 import logging
 import json
 
+from asgiref.sync import sync_to_async
 from django.contrib.auth.decorators import login_required
+from django.db import transaction
 from django.shortcuts import render
 from django.conf import settings
 
 from base.models import Lexicon, WordList
 from base.utils import generate_question_map, quizzes_response
+from lib.async_views import async_login_required
 from lib.response import response
-from lib.wdb_interface.wdb_helper import word_search
+from lib.wdb_interface.wdb_helper import aword_search
 from lib.wdb_interface.word_searches import temporary_list_name
 from wordwalls.api import build_search_criteria
 from wordwalls.game import GameInitException
@@ -34,23 +37,24 @@ def main(request):
     )
 
 
-@login_required
-def new_quiz(request):
+@transaction.non_atomic_requests
+@async_login_required
+async def new_quiz(request):
     """
     Create a new quiz but doesn't create any 'card' models.
     Card models will only be used for cardbox in future.
     """
     body = json.loads(request.body)
     logger.debug(body)
-    lexicon = Lexicon.objects.get(lexiconName=body["lexicon"])
+    lexicon = await Lexicon.objects.aget(lexiconName=body["lexicon"])
     try:
-        search_description = build_search_criteria(
+        search_description = await sync_to_async(build_search_criteria)(
             request.user, lexicon, body["searchCriteria"]
         )
     except GameInitException as e:
         return response(str(e), status=400)
 
-    questions = word_search(search_description, expand=True)
+    questions = await aword_search(search_description, expand=True)
     if questions.size() == 0:
         return response("No questions were found.", status=400)
     wl = WordList()
@@ -2,6 +2,8 @@
 bind = "0.0.0.0:8000"
 workers = 2
 pidfile = "/gunicorn.pid"
-worker_class = "sync"
+# The async views (see lib/async_views.py) wait on the word DB without
+# holding a worker; sync views run in a thread pool.
+worker_class = "uvicorn_worker.UvicornWorker"
 timeout = 30
 daemon = False
\ No newline at end of file
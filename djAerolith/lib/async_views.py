@@ -0,0 +1,52 @@
+"""
+Helpers for async views.
+
+Django 4.2's login_required and require_http_methods only wrap sync
+views, and ATOMIC_REQUESTS can't wrap async views at all, so every async
+view must also be marked @transaction.non_atomic_requests. Its ORM work
+then runs in autocommit; wrap anything that writes more than one row in
+transaction.atomic, inside sync_to_async.
+
+    @transaction.non_atomic_requests
+    @async_login_required
+    @async_require_POST
+    async def view(request):
+        ...
+
+"""
+
+import functools
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.views import redirect_to_login
+from django.http import HttpResponseNotAllowed
+
+
+def _is_authenticated(request):
+    # Loading request.user hits the session store and the DB, so it has
+    # to happen in sync code; once loaded, it can be used from async code.
+    return request.user.is_authenticated
+
+
+def async_login_required(view):
+    """login_required, for async views."""
+
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if not await sync_to_async(_is_authenticated)(request):
+            return redirect_to_login(request.get_full_path())
+        return await view(request, *args, **kwargs)
+
+    return wrapper
+
+
+def async_require_POST(view):
+    """require_POST, for async views."""
+
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method != "POST":
+            return HttpResponseNotAllowed(["POST"])
+        return await view(request, *args, **kwargs)
+
+    return wrapper
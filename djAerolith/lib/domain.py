@@ -4,6 +4,19 @@ from typing import List
 
 
 class Word:
+    # Hundreds of thousands of these can be alive at once (a big upload, a
+    # flashcard chunk); slots keep them small. See benchmark_domain_memory.
+    __slots__ = (
+        "word",
+        "alphagram",
+        "definition",
+        "front_hooks",
+        "back_hooks",
+        "lexicon_symbols",
+        "inner_front_hook",
+        "inner_back_hook",
+    )
+
     def __init__(
         self,
         word,
@@ -22,8 +35,8 @@ class Word:
         self.front_hooks = front_hooks or ""
         self.back_hooks = back_hooks or ""
         self.lexicon_symbols = lexicon_symbols or ""
-        self.inner_front_hook = True if inner_front_hook == 1 else False
-        self.inner_back_hook = True if inner_back_hook == 1 else False
+        self.inner_front_hook = inner_front_hook == 1
+        self.inner_back_hook = inner_back_hook == 1
 
     def __repr__(self):
         return self.__str__()
@@ -37,23 +50,24 @@ class Word:
 
 def words_from_pb(pbw):
     """ Turn the protobuf list of Words into a list of domain.Word """
-    words = []
-    for word in pbw:
-        w = Word(
-            word=word.word,
-            alphagram=word.alphagram,
-            definition=word.definition,
-            front_hooks=word.front_hooks,
-            back_hooks=word.back_hooks,
-            lexicon_symbols=word.lexicon_symbols,
-            inner_front_hook=word.inner_front_hook,
-            inner_back_hook=word.inner_back_hook,
+    return [
+        Word(
+            word.word,
+            word.alphagram,
+            word.definition,
+            word.front_hooks,
+            word.back_hooks,
+            word.inner_front_hook,
+            word.inner_back_hook,
+            word.lexicon_symbols,
         )
-        words.append(w)
-    return words
+        for word in pbw
+    ]
 
 
 class Alphagram:
+    __slots__ = ("alphagram", "probability", "length", "combinations")
+
     def __init__(
         self, alphagram: str, probability: int = None, combinations: int = None
     ):
@@ -76,6 +90,8 @@ class Alphagram:
 
 
 class Question:
+    __slots__ = ("alphagram", "answers")
+
     def __init__(
         self, alphagram: Alphagram = None, answers: List[Word] = None
     ):
@@ -88,19 +104,14 @@ class Question:
         self.answers = answers
 
     def set_answers_from_word_list(self, word_list):
-        self.answers = []
-        for word in word_list:
-            self.answers.append(Word(word=word))
+        self.answers = [Word(word) for word in word_list]
 
     def to_python_full(self):
         """ A complete representation of question. """
-        q = {
+        return {
             "question": self.alphagram.alphagram,
             "probability": self.alphagram.probability,
-            "answers": [],
-        }
-        for a in self.answers:
-            q["answers"].append(
+            "answers": [
                 {
                     "word": a.word,
                     "def": a.definition,
@@ -110,8 +121,9 @@ class Question:
                     "f_inner": a.inner_front_hook,
                     "b_inner": a.inner_back_hook,
                 }
-            )
-        return q
+                for a in self.answers
+            ],
+        }
 
     def to_python(self):
         return {
@@ -130,7 +142,22 @@ class Question:
         return f"<Question: {self.alphagram} ({self.answers})>"
 
 
+def question_from_pb(pba):
+    """ Turn a protobuf Alphagram into a domain.Question """
+    return Question(
+        # sorry:
+        alphagram=Alphagram(
+            pba.alphagram,
+            pba.probability,
+            pba.combinations,
+        ),
+        answers=words_from_pb(pba.words),
+    )
+
+
 class Questions:
+    __slots__ = ("questions", "build_mode")
+
     def __init__(self):
         self.questions = []
         self.build_mode = False
@@ -159,6 +186,17 @@ class Questions:
     def shuffle(self):
         random.shuffle(self.questions)
 
+    def copy(self):
+        """
+        A new Questions with the same Question objects; it can be shuffled
+        or appended to without changing this one.
+
+        """
+        qs = Questions()
+        qs.questions = list(self.questions)
+        qs.build_mode = self.build_mode
+        return qs
+
     def clear(self):
         self.questions = []
 
@@ -184,29 +222,16 @@ class Questions:
         [{'q': 'ABC', 'a': ['CAB']}, ... ]
 
         """
-        self.clear()
-        for q in qs:
-            question = Question()
-            question.set_from_obj(q)
-            self.append(question)
+        self.questions = [
+            Question(Alphagram(q["q"]), [Word(w) for w in q["a"]]) for q in qs
+        ]
 
     def set_from_pb_alphagrams(self, pba):
         """
         Set Questions from a protobuf Alphagrams object.
 
         """
-        self.clear()
-        for alphagram in pba:
-            question = Question(
-                # sorry:
-                alphagram=Alphagram(
-                    alphagram.alphagram,
-                    alphagram.probability,
-                    alphagram.combinations,
-                ),
-                answers=words_from_pb(alphagram.words),
-            )
-            self.append(question)
+        self.questions = [question_from_pb(alphagram) for alphagram in pba]
 
     def sort_by_probability(self):
         self.questions.sort(key=lambda q: q.alphagram.probability)
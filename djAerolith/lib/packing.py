@@ -0,0 +1,332 @@
+"""
+A compact, random-access encoding for the question lists of a word list.
+
+JSON is a poor fit for a list with millions of questions; to get at
+question 4,000,000 we have to parse the whole thing. Here we encode:
+
+    - index arrays (e.g. curQuestions, missed) as fixed-width little-endian
+      integers. The width (1, 2 or 4 bytes) is the smallest that fits the
+      largest index. We don't delta-encode them, because a shuffled list
+      is a random permutation and wouldn't get any smaller, and fixed
+      widths let us seek straight to any element.
+    - question lists (origQuestions) as a table of length-prefixed UTF-8
+      strings, plus an array of offsets into it so any question can be
+      found without decoding the ones before it.
+
+Both come out as base64 text, so they can live in the existing text
+columns. Base64 maps every 3 bytes to 4 characters, so any byte range can
+be decoded from just the characters that cover it, wherever it starts;
+the data doesn't need to be aligned to those 3-byte groups.
+
+"""
+
+import array
+import base64
+import struct
+import sys
+
+INDEX_MAGIC = b"I"
+QUESTIONS_MAGIC = b"Q"
+_TYPECODES = {1: "B", 2: "H", 4: "I"}
+
+
+class PackingError(Exception):
+    pass
+
+
+def _width_for(max_value):
+    if max_value < 1 << 8:
+        return 1
+    elif max_value < 1 << 16:
+        return 2
+    elif max_value < 1 << 32:
+        return 4
+    raise PackingError("Value too large to pack: {}".format(max_value))
+
+
+def _int_array(width, values=()):
+    arr = array.array(_TYPECODES[width], values)
+    if arr.itemsize != width:
+        # Some platforms have a 4-byte "L" but an 8-byte "I", etc.
+        raise PackingError("No {}-byte array type on this platform".format(width))
+    return arr
+
+
+def _to_le(arr):
+    if sys.byteorder != "little":
+        arr = array.array(arr.typecode, arr)
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def _from_le(width, data):
+    arr = _int_array(width)
+    arr.frombytes(data)
+    if sys.byteorder != "little":
+        arr.byteswap()
+    return arr
+
+
+class B64Reader(object):
+    """
+    Reads byte ranges out of base64 text without decoding all of it.
+
+    Subclasses can fetch the text from somewhere else (e.g. the database)
+    by overriding `__len__` and `_chars`.
+
+    """
+
+    def __init__(self, text):
+        self.text = text
+
+    def __len__(self):
+        return self._decoded_length(len(self.text), self.text[-2:])
+
+    def _decoded_length(self, num_chars, tail):
+        """The number of bytes in `num_chars` of base64 ending in `tail`."""
+        if num_chars == 0:
+            return 0
+        return num_chars // 4 * 3 - tail.count("=")
+
+    def _chars(self, ranges):
+        """Return the text for each (start, stop) character range."""
+        return [self.text[start:stop] for start, stop in ranges]
+
+    def read(self, start, stop):
+        return self.read_many([(start, stop)])[0]
+
+    def read_many(self, ranges):
+        """Return the bytes for each (start, stop) byte range."""
+        char_ranges = []
+        for start, stop in ranges:
+            if stop <= start:
+                char_ranges.append((0, 0))
+            else:
+                char_ranges.append((start // 3 * 4, (stop + 2) // 3 * 4))
+        chunks = []
+        for (start, stop), text in zip(ranges, self._chars(char_ranges)):
+            if stop <= start:
+                chunks.append(b"")
+                continue
+            offset = start - start // 3 * 3
+            chunks.append(base64.b64decode(text)[offset : offset + (stop - start)])
+        return chunks
+
+
+def _reader(text_or_reader):
+    if isinstance(text_or_reader, B64Reader):
+        return text_or_reader
+    return B64Reader(text_or_reader)
+
+
+def pack_indices(indices):
+    """Encode a list of non-negative integers. Returns base64 text."""
+    width = _width_for(max(indices)) if len(indices) else 1
+    data = INDEX_MAGIC + bytes([width, 0]) + _to_le(_int_array(width, indices))
+    return base64.b64encode(data).decode("ascii")
+
+
+class PackedIndices(object):
+    """
+    A read-only sequence of integers encoded with pack_indices. Takes the
+    encoded text, or a B64Reader for it.
+
+    """
+
+    HEADER_SIZE = 3
+
+    def __init__(self, text):
+        self._reader = _reader(text)
+        header = self._reader.read(0, self.HEADER_SIZE)
+        if header[:1] != INDEX_MAGIC:
+            raise PackingError("Not a packed index array")
+        self.width = header[1]
+        self._len = (len(self._reader) - self.HEADER_SIZE) // self.width
+
+    def __len__(self):
+        return self._len
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(self._len)
+            if step != 1:
+                return list(self)[key]
+            return self.slice(start, stop)
+        if key < 0:
+            key += self._len
+        if not 0 <= key < self._len:
+            raise IndexError("index out of range")
+        return self.slice(key, key + 1)[0]
+
+    def __iter__(self):
+        return iter(self.slice(0, self._len))
+
+    def slice(self, start, stop):
+        """Return elements [start, stop) as a list."""
+        stop = min(stop, self._len)
+        if stop <= start:
+            return []
+        data = self._reader.read(
+            self.HEADER_SIZE + start * self.width, self.HEADER_SIZE + stop * self.width
+        )
+        return _from_le(self.width, data).tolist()
+
+    def tolist(self):
+        return self.slice(0, self._len)
+
+
+def unpack_indices(text):
+    return PackedIndices(text).tolist()
+
+
+def _put_varint(out, n):
+    while n >= 0x80:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _get_varint(data, pos):
+    result = 0
+    shift = 0
+    while True:
+        b = data[pos]
+        pos += 1
+        result |= (b & 0x7F) << shift
+        if b < 0x80:
+            return result, pos
+        shift += 7
+
+
+def _put_string(out, s):
+    encoded = s.encode("utf-8")
+    _put_varint(out, len(encoded))
+    out += encoded
+
+
+def _get_string(data, pos):
+    length, pos = _get_varint(data, pos)
+    return data[pos : pos + length].decode("utf-8"), pos + length
+
+
+def pack_questions(questions):
+    """
+    Encode a list of {'q': alphagram, 'a': [word, ...]} questions.
+    Returns base64 text.
+
+    Layout: a 3-byte header (magic, offset width, 0), the number of
+    questions as a 4-byte integer, count + 1 offsets into the records,
+    then the records. Each record is the alphagram, the number of
+    answers, and the answers, all varint length-prefixed.
+
+    """
+    records = bytearray()
+    offsets = [0]
+    for q in questions:
+        _put_string(records, q["q"])
+        answers = q.get("a", [])
+        _put_varint(records, len(answers))
+        for a in answers:
+            _put_string(records, a)
+        offsets.append(len(records))
+    width = _width_for(offsets[-1])
+    data = bytearray(QUESTIONS_MAGIC + bytes([width, 0]))
+    data += struct.pack("<I", len(questions))
+    data += _to_le(_int_array(width, offsets))
+    data += records
+    return base64.b64encode(bytes(data)).decode("ascii")
+
+
+def _decode_question(data, pos=0):
+    alphagram, pos = _get_string(data, pos)
+    num_answers, pos = _get_varint(data, pos)
+    answers = []
+    for _ in range(num_answers):
+        a, pos = _get_string(data, pos)
+        answers.append(a)
+    return {"q": alphagram, "a": answers}, pos
+
+
+class PackedQuestions(object):
+    """
+    A read-only sequence of questions encoded with pack_questions. Takes
+    the encoded text, or a B64Reader for it.
+
+    """
+
+    HEADER_SIZE = 7
+
+    def __init__(self, text):
+        self._reader = _reader(text)
+        header = self._reader.read(0, self.HEADER_SIZE)
+        if header[:1] != QUESTIONS_MAGIC:
+            raise PackingError("Not a packed question list")
+        self._width = header[1]
+        (self._len,) = struct.unpack("<I", header[3:7])
+        self._records_start = self.HEADER_SIZE + (self._len + 1) * self._width
+
+    def __len__(self):
+        return self._len
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(self._len)
+            if step != 1:
+                return self.take(range(start, stop, step))
+            return self.slice(start, stop)
+        if key < 0:
+            key += self._len
+        if not 0 <= key < self._len:
+            raise IndexError("index out of range")
+        return self.slice(key, key + 1)[0]
+
+    def __iter__(self):
+        return iter(self.slice(0, self._len))
+
+    def _offsets(self, start, stop):
+        """Offsets of records start..stop (inclusive), as a list."""
+        pos = self.HEADER_SIZE + start * self._width
+        data = self._reader.read(pos, pos + (stop - start + 1) * self._width)
+        return _from_le(self._width, data).tolist()
+
+    def slice(self, start, stop):
+        """Return questions [start, stop) as a list."""
+        stop = min(stop, self._len)
+        if stop <= start:
+            return []
+        offsets = self._offsets(start, stop)
+        data = self._reader.read(
+            self._records_start + offsets[0], self._records_start + offsets[-1]
+        )
+        questions = []
+        pos = 0
+        for _ in range(stop - start):
+            q, pos = _decode_question(data, pos)
+            questions.append(q)
+        return questions
+
+    def take(self, indices):
+        """Return the questions at `indices`, in that order."""
+        offset_ranges = []
+        for i in indices:
+            if not 0 <= i < self._len:
+                raise IndexError("index out of range")
+            pos = self.HEADER_SIZE + i * self._width
+            offset_ranges.append((pos, pos + 2 * self._width))
+        record_ranges = []
+        for data in self._reader.read_many(offset_ranges):
+            start, stop = _from_le(self._width, data)
+            record_ranges.append(
+                (self._records_start + start, self._records_start + stop)
+            )
+        return [
+            _decode_question(data)[0]
+            for data in self._reader.read_many(record_ranges)
+        ]
+
+    def tolist(self):
+        return self.slice(0, self._len)
+
+
+def unpack_questions(text):
+    return PackedQuestions(text).tolist()
@@ -0,0 +1,119 @@
+"""
+Write expanded questions as JSON straight from question cache entries
+(see lib/wdb_interface/question_cache.py), without building Question
+objects or `to_python_full` dicts first.
+
+The output is exactly what `json.dumps(..., ensure_ascii=False)` of the
+equivalent `to_python_full` list or map gives. The functions yield the
+JSON in pieces; join them, or stream them (see lib.response).
+
+"""
+
+from json.encoder import encode_basestring
+
+
+def _bool(value):
+    return "true" if value else "false"
+
+
+def _int(value):
+    return "null" if value is None else str(int(value))
+
+
+def _entry_json(entry):
+    alphagram, probability, _, words = entry
+    answers = ", ".join(
+        '{{"word": {}, "def": {}, "f_hooks": {}, "b_hooks": {}, '
+        '"symbols": {}, "f_inner": {}, "b_inner": {}}}'.format(
+            encode_basestring(word),
+            encode_basestring(definition or ""),
+            encode_basestring(front_hooks or ""),
+            encode_basestring(back_hooks or ""),
+            encode_basestring(lexicon_symbols or ""),
+            _bool(inner_front_hook == 1),
+            _bool(inner_back_hook == 1),
+        )
+        for (
+            word,
+            _,
+            definition,
+            front_hooks,
+            back_hooks,
+            inner_front_hook,
+            inner_back_hook,
+            lexicon_symbols,
+        ) in words
+    )
+    return '{{"question": {}, "probability": {}, "answers": [{}]}}'.format(
+        encode_basestring(alphagram), _int(probability), answers
+    )
+
+
+def question_list_json(entries):
+    """The JSON list of questions (as `generate_question_list`), in pieces."""
+    return question_list_json_pages([entries])
+
+
+def question_map_json(entries):
+    """The JSON map of questions (as `generate_question_map`), in pieces."""
+    return question_map_json_pages([entries])
+
+
+def question_list_json_pages(pages):
+    """
+    The JSON list of the questions in `pages`, an iterable of lists of
+    entries; one piece per page, so pages can be fetched as they're
+    written.
+
+    """
+    yield "["
+    first = True
+    for page in pages:
+        if not page:
+            continue
+        yield ("" if first else ", ") + ", ".join(_entry_json(e) for e in page)
+        first = False
+    yield "]"
+
+
+def question_map_json_pages(pages):
+    """
+    The JSON map of the questions in `pages`, one piece per page. Within a
+    page a later duplicate replaces an earlier one, as it would in a dict;
+    an alphagram already written for an earlier page is skipped.
+
+    """
+    yield "{"
+    written = set()
+    for page in pages:
+        piece = _map_page_json(page, written)
+        if piece:
+            yield piece
+    yield "}"
+
+
+async def aquestion_map_json_pages(pages):
+    """question_map_json_pages, for an async iterable of pages."""
+    yield "{"
+    written = set()
+    async for page in pages:
+        piece = _map_page_json(page, written)
+        if piece:
+            yield piece
+    yield "}"
+
+
+def _map_page_json(page, written):
+    """The map items of a page, if any; adds their alphagrams to `written`."""
+    by_alphagram = {}
+    for entry in page:
+        if entry[0] not in written:
+            by_alphagram[entry[0]] = entry
+    if not by_alphagram:
+        return None
+    piece = ("" if not written else ", ") + ", ".join(
+        "{}: {}".format(encode_basestring(alphagram), _entry_json(entry))
+        for alphagram, entry in by_alphagram.items()
+    )
+    written.update(by_alphagram)
+    return piece
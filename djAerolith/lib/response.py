@@ -1,5 +1,5 @@
 import json
-from django.http import HttpResponse
+from django.http import HttpResponse, StreamingHttpResponse
 
 
 class StatusCode(object):
@@ -17,5 +17,22 @@ def response(obj, status=StatusCode.OK):
     return resp
 
 
+# returns an HttpResponse of JSON that's already been written, in pieces
+def json_response(pieces, status=StatusCode.OK):
+    return HttpResponse("".join(pieces),
+                        content_type="application/json; charset=utf-8",
+                        status=status)
+
+
+# returns a StreamingHttpResponse that writes the JSON pieces as they're made;
+# `pieces` may be an async iterator, for async views
+def streaming_json_response(pieces, status=StatusCode.OK):
+    # The response encodes str pieces with the content type's charset.
+    return StreamingHttpResponse(
+        pieces,
+        content_type="application/json; charset=utf-8",
+        status=status)
+
+
 def bad_request(obj):
     return response(obj, StatusCode.BAD_REQUEST)
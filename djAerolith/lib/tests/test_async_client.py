@@ -0,0 +1,69 @@
+import asyncio
+import json
+import unittest
+
+import httpx
+from twirp import errors
+from twirp.context import Context
+from twirp.exceptions import TwirpServerException
+
+from lib.wdb_interface.async_client import AsyncQuestionSearcherClient, get_http_client
+import rpc.wordsearcher.searcher_pb2 as pb
+
+
+def search(handler):
+    async def call():
+        async with httpx.AsyncClient(
+            transport=httpx.MockTransport(handler)
+        ) as http_client:
+            client = AsyncQuestionSearcherClient("http://wdb", 5, http_client)
+            return await client.Search(ctx=Context(), request=pb.SearchRequest())
+
+    return asyncio.run(call())
+
+
+class AsyncClientTestCase(unittest.TestCase):
+    def test_response(self):
+        def handler(request):
+            self.assertEqual(
+                request.url.path, "/twirp/wordsearcher.QuestionSearcher/Search"
+            )
+            self.assertEqual(request.headers["Content-Type"], "application/protobuf")
+            resp = pb.SearchResponse(lexicon="NWL20")
+            resp.alphagrams.add(alphagram="AEINRST")
+            return httpx.Response(200, content=resp.SerializeToString())
+
+        response = search(handler)
+        self.assertEqual(response.lexicon, "NWL20")
+        self.assertEqual(response.alphagrams[0].alphagram, "AEINRST")
+
+    def test_twirp_error(self):
+        def handler(request):
+            return httpx.Response(
+                404,
+                content=json.dumps(
+                    {"code": "not_found", "msg": "query returns no results"}
+                ),
+            )
+
+        with self.assertRaises(TwirpServerException) as ctx:
+            search(handler)
+        self.assertEqual(ctx.exception.code, errors.Errors.NotFound)
+
+    def test_unreachable(self):
+        def handler(request):
+            raise httpx.ConnectError("connection refused", request=request)
+
+        with self.assertRaises(TwirpServerException) as ctx:
+            search(handler)
+        self.assertEqual(ctx.exception.code, errors.Errors.Unavailable)
+
+    def test_http_client_closed_with_loop(self):
+        async def use():
+            client = get_http_client()
+            self.assertIs(get_http_client(), client)
+            await asyncio.sleep(0)
+            self.assertFalse(client.is_closed)
+            return client
+
+        self.assertTrue(asyncio.run(use()).is_closed)
@@ -0,0 +1,31 @@
+import unittest
+
+from lib.wdb_interface.client_pool import ClientPool
+
+
+class ClientPoolTestCase(unittest.TestCase):
+    def test_sessions_are_reused(self):
+        pool = ClientPool(size=1)
+        with pool.session() as s1:
+            pass
+        with pool.session() as s2:
+            self.assertIs(s1, s2)
+        self.assertEqual(pool.stats()['hits'], 1)
+        self.assertEqual(pool.stats()['misses'], 1)
+
+    def test_extra_sessions_are_discarded(self):
+        pool = ClientPool(size=1)
+        with pool.session() as s1:
+            with pool.session() as s2:
+                self.assertIsNot(s1, s2)
+        stats = pool.stats()
+        self.assertEqual(stats['misses'], 2)
+        self.assertEqual(stats['idle'], 1)
+        self.assertEqual(stats['discarded'], 1)
+
+    def test_session_returned_on_error(self):
+        pool = ClientPool(size=2)
+        with self.assertRaises(ValueError):
+            with pool.session():
+                raise ValueError()
+        self.assertEqual(pool.stats()['idle'], 1)
@@ -0,0 +1,43 @@
+import unittest
+
+from lib.domain import Alphagram, Question, Questions, Word
+
+
+class DomainTestCase(unittest.TestCase):
+    def test_list_round_trip(self):
+        qs = Questions()
+        qs.set_from_list([{"q": "AEINRST", "a": ["RETINAS", "STAINER"]}])
+        self.assertEqual(
+            qs.to_python(), [{"q": "AEINRST", "a": ["RETINAS", "STAINER"]}]
+        )
+        copy = qs.copy()
+        copy.append(Question(Alphagram("ART"), [Word("RAT")]))
+        self.assertEqual(len(qs), 1)
+
+    def test_to_python_full(self):
+        q = Question(
+            Alphagram("ART", probability=5),
+            [Word("RAT", definition="a rodent", back_hooks="S", inner_front_hook=1)],
+        )
+        self.assertEqual(
+            q.to_python_full(),
+            {
+                "question": "ART",
+                "probability": 5,
+                "answers": [
+                    {
+                        "word": "RAT",
+                        "def": "a rodent",
+                        "f_hooks": "",
+                        "b_hooks": "S",
+                        "symbols": "",
+                        "f_inner": True,
+                        "b_inner": False,
+                    }
+                ],
+            },
+        )
+
+    def test_no_instance_dict(self):
+        with self.assertRaises(AttributeError):
+            Word("RAT").extra = 1
@@ -0,0 +1,153 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from twirp.context import Context
+from twirp.exceptions import TwirpServerException
+
+from base.models import Lexicon
+from lib.wdb_interface.local_backend import (
+    LexiconDatabases,
+    LocalAnagrammer,
+    LocalQuestionSearcher,
+)
+from lib.wdb_interface.word_searches import SearchDescription
+import rpc.wordsearcher.searcher_pb2 as pb
+
+WORDS = [
+    # word, alphagram, probability
+    ("RETINAS", "AEINRST", 1),
+    ("STAINER", "AEINRST", 1),
+    ("NASTIER", "AEINRST", 1),
+    ("ENTAILS", "AEILNST", 2),
+    ("SALIENT", "AEILNST", 2),
+    ("ZAX", "AXZ", 9),
+    ("RAT", "ART", 1),
+    ("TAR", "ART", 1),
+    ("AT", "AT", 1),
+]
+
+
+def make_lexicon_db(path):
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE alphagrams (alphagram TEXT, length INTEGER, "
+        "probability INTEGER, combinations INTEGER, num_anagrams INTEGER, "
+        "num_vowels INTEGER, point_value INTEGER, difficulty INTEGER)"
+    )
+    conn.execute(
+        "CREATE TABLE words (word TEXT, alphagram TEXT, definition TEXT, "
+        "front_hooks TEXT, back_hooks TEXT, inner_front_hook INTEGER, "
+        "inner_back_hook INTEGER, lexicon_symbols TEXT)"
+    )
+    alphagrams = {}
+    for word, alphagram, probability in WORDS:
+        conn.execute(
+            "INSERT INTO words VALUES (?, ?, ?, '', '', 0, 0, '')",
+            (word, alphagram, "def of " + word),
+        )
+        alphagrams.setdefault(alphagram, [probability, 0])[1] += 1
+    for alphagram, (probability, num_anagrams) in alphagrams.items():
+        conn.execute(
+            "INSERT INTO alphagrams VALUES (?, ?, ?, 100, ?, 0, 0, 0)",
+            (alphagram, len(alphagram), probability, num_anagrams),
+        )
+    conn.commit()
+    conn.close()
+
+
+class LocalBackendTestCase(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        make_lexicon_db(os.path.join(self.dir, "TEST.db"))
+        databases = LexiconDatabases(self.dir)
+        self.searcher = LocalQuestionSearcher(databases)
+        self.anagrammer = LocalAnagrammer(databases)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def search(self, *descriptions, expand=False):
+        request = pb.SearchRequest(
+            searchparams=[SearchDescription.lexicon(Lexicon(lexiconName="TEST"))]
+            + list(descriptions),
+            expand=expand,
+        )
+        return self.searcher.Search(ctx=Context(), request=request)
+
+    def test_length_search(self):
+        resp = self.search(SearchDescription.length(7, 7))
+        self.assertEqual(
+            [a.alphagram for a in resp.alphagrams], ["AEINRST", "AEILNST"]
+        )
+        self.assertEqual(
+            [w.word for w in resp.alphagrams[0].words],
+            ["NASTIER", "RETINAS", "STAINER"],
+        )
+        self.assertEqual(resp.alphagrams[0].words[0].definition, "")
+
+    def test_expanded_search(self):
+        resp = self.search(SearchDescription.alphagram_list(["ART"]), expand=True)
+        self.assertEqual(resp.alphagrams[0].words[0].definition, "def of RAT")
+        self.assertEqual(resp.alphagrams[0].combinations, 100)
+
+    def test_probability_limit(self):
+        resp = self.search(
+            SearchDescription.length(7, 7),
+            SearchDescription.probability_limit(2, 2),
+        )
+        self.assertEqual([a.alphagram for a in resp.alphagrams], ["AEILNST"])
+
+    def test_matching_anagram_with_blank(self):
+        resp = self.search(SearchDescription.matching_anagram("AX?"))
+        self.assertEqual([a.alphagram for a in resp.alphagrams], ["AXZ"])
+
+    def test_no_results(self):
+        with self.assertRaises(TwirpServerException) as e:
+            self.search(SearchDescription.alphagram_list([]))
+        self.assertEqual(e.exception.message, "query returns no results")
+
+    def test_unknown_lexicon(self):
+        request = pb.SearchRequest(
+            searchparams=[SearchDescription.lexicon(Lexicon(lexiconName="NOPE"))]
+        )
+        with self.assertRaises(TwirpServerException):
+            self.searcher.Search(ctx=Context(), request=request)
+
+    def test_expand_drops_missing_words(self):
+        request = pb.SearchResponse(
+            lexicon="TEST",
+            alphagrams=[
+                pb.Alphagram(
+                    alphagram="ART",
+                    words=[pb.Word(word="RAT"), pb.Word(word="ATR")],
+                )
+            ],
+        )
+        resp = self.searcher.Expand(ctx=Context(), request=request)
+        self.assertEqual([w.word for w in resp.alphagrams[0].words], ["RAT"])
+        self.assertEqual(resp.alphagrams[0].probability, 1)
+
+    def test_anagram_build(self):
+        resp = self.anagrammer.Anagram(
+            ctx=Context(),
+            request=pb.AnagramRequest(
+                lexicon="TEST", letters="tar", mode=pb.AnagramRequest.Mode.BUILD
+            ),
+        )
+        self.assertEqual([w.word for w in resp.words], ["RAT", "TAR", "AT"])
+        self.assertEqual(resp.num_words, 3)
+
+    def test_anagram_exact_with_blanks(self):
+        resp = self.anagrammer.Anagram(
+            ctx=Context(),
+            request=pb.AnagramRequest(
+                lexicon="TEST", letters="AEIN?ST", mode=pb.AnagramRequest.Mode.EXACT
+            ),
+        )
+        self.assertEqual(
+            [w.word for w in resp.words],
+            ["ENTAILS", "NASTIER", "RETINAS", "SALIENT", "STAINER"],
+        )
@@ -0,0 +1,72 @@
+import random
+import unittest
+
+from lib.packing import (
+    PackedIndices,
+    PackedQuestions,
+    PackingError,
+    pack_indices,
+    pack_questions,
+    unpack_indices,
+    unpack_questions,
+)
+
+
+class PackedIndicesTestCase(unittest.TestCase):
+    def test_round_trip(self):
+        for n in (0, 1, 2, 3, 4, 255, 256, 70000):
+            indices = list(range(n))
+            random.shuffle(indices)
+            self.assertEqual(unpack_indices(pack_indices(indices)), indices)
+
+    def test_width(self):
+        self.assertEqual(PackedIndices(pack_indices([1, 255])).width, 1)
+        self.assertEqual(PackedIndices(pack_indices([1, 256])).width, 2)
+        self.assertEqual(PackedIndices(pack_indices([1, 65536])).width, 4)
+        with self.assertRaises(PackingError):
+            pack_indices([1 << 32])
+
+    def test_random_access(self):
+        indices = list(range(1000))
+        random.shuffle(indices)
+        packed = PackedIndices(pack_indices(indices))
+        self.assertEqual(len(packed), 1000)
+        for start in range(0, 20):
+            self.assertEqual(packed.slice(start, start + 50),
+                             indices[start:start + 50])
+        self.assertEqual(packed[999], indices[999])
+        self.assertEqual(packed[-1], indices[-1])
+        self.assertEqual(packed[990:2000], indices[990:])
+        self.assertEqual(packed.slice(1000, 1050), [])
+        with self.assertRaises(IndexError):
+            packed[1000]
+
+
+class PackedQuestionsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.questions = [
+            {'q': 'AEILNOST', 'a': ['ELATIONS', 'INSOLATE', 'TOENAILS']},
+            {'q': 'ADEEMNRT', 'a': ['TRADEMEN']},
+            {'q': 'AEÑOS', 'a': ['AÑOSE']},
+            {'q': 'ACEHIJN', 'a': []},
+        ]
+
+    def test_round_trip(self):
+        self.assertEqual(unpack_questions(pack_questions(self.questions)),
+                         self.questions)
+        self.assertEqual(unpack_questions(pack_questions([])), [])
+
+    def test_random_access(self):
+        questions = self.questions * 500
+        packed = PackedQuestions(pack_questions(questions))
+        self.assertEqual(len(packed), 2000)
+        self.assertEqual(packed[1998], questions[1998])
+        self.assertEqual(packed.slice(3, 9), questions[3:9])
+        self.assertEqual(packed.take([1999, 0, 6]),
+                         [questions[1999], questions[0], questions[6]])
+
+    def test_not_packed(self):
+        with self.assertRaises(PackingError):
+            PackedQuestions(pack_indices([1, 2, 3]))
+        with self.assertRaises(PackingError):
+            PackedIndices(pack_questions(self.questions))
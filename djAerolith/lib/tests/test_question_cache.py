@@ -0,0 +1,87 @@
+import contextlib
+import unittest
+
+import mock
+
+from lib.lru import LRUCache
+from lib.wdb_interface import question_cache
+from lib.wdb_interface.wdb_helper import question_entries_from_alpha_dicts
+import rpc.wordsearcher.searcher_pb2 as pb
+
+LEXICON = mock.Mock(lexiconName='NWL20')
+
+
+def expand(ctx, request):
+    """A fake Expand: adds a definition to every word it's asked for."""
+    response = pb.SearchResponse(lexicon=request.lexicon)
+    for alpha in request.alphagrams:
+        pba = response.alphagrams.add(alphagram=alpha.alphagram,
+                                      probability=1)
+        for word in alpha.words:
+            pba.words.add(word=word.word, alphagram=alpha.alphagram,
+                          definition='def ' + word.word)
+    return response
+
+
+class QuestionCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        question_cache._cache = LRUCache(100)
+        self.client = mock.Mock()
+        self.client.Expand.side_effect = expand
+
+        @contextlib.contextmanager
+        def searcher_client(timeout=None):
+            yield self.client
+
+        patcher = mock.patch('lib.wdb_interface.wdb_helper.searcher_client',
+                             searcher_client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        question_cache._cache = None
+
+    def expanded(self):
+        """The alphagrams each Expand call asked for."""
+        return [[a.alphagram for a in call.kwargs['request'].alphagrams]
+                for call in self.client.Expand.call_args_list]
+
+    def test_hit_skips_expand(self):
+        alphas = [{'q': 'AEINRST', 'a': ['RETAINS', 'STAINER']}]
+        first = question_entries_from_alpha_dicts(LEXICON, alphas)
+        second = question_entries_from_alpha_dicts(LEXICON, alphas)
+        self.assertEqual(first, second)
+        self.assertEqual(second[0][3][0][2], 'def RETAINS')
+        self.assertEqual(self.expanded(), [['AEINRST']])
+        self.assertEqual(question_cache.question_cache_stats()['hits'], 1)
+
+    def test_different_answers_miss(self):
+        question_entries_from_alpha_dicts(
+            LEXICON, [{'q': 'AEINRST', 'a': ['RETAINS', 'STAINER']}])
+        # Another lexicon version, with a different set of answers.
+        entries = question_entries_from_alpha_dicts(
+            LEXICON, [{'q': 'AEINRST', 'a': ['RETAINS', 'NASTIER']}])
+        self.assertEqual([w[0] for w in entries[0][3]],
+                         ['RETAINS', 'NASTIER'])
+        # As many answers, but not the same ones.
+        entries = question_entries_from_alpha_dicts(
+            LEXICON, [{'q': 'AEINRST', 'a': ['RETAINS']}])
+        self.assertEqual([w[0] for w in entries[0][3]], ['RETAINS'])
+        self.assertEqual(self.expanded(),
+                         [['AEINRST'], ['AEINRST'], ['AEINRST']])
+
+    def test_merged_entries_keep_order(self):
+        question_entries_from_alpha_dicts(LEXICON, [
+            {'q': 'AEILNST', 'a': ['ENTAILS']},
+            {'q': 'ADEEIKS', 'a': ['DEKES']},
+        ])
+        alphas = [
+            {'q': 'AEINRST', 'a': ['RETAINS']},
+            {'q': 'AEILNST', 'a': ['ENTAILS']},
+            {'q': 'ACEINRST', 'a': ['CANISTER']},
+            {'q': 'ADEEIKS', 'a': ['DEKES']},
+        ]
+        entries = question_entries_from_alpha_dicts(LEXICON, alphas)
+        self.assertEqual([e[0] for e in entries], [a['q'] for a in alphas])
+        # Only the uncached ones were expanded.
+        self.assertEqual(self.expanded()[-1], ['AEINRST', 'ACEINRST'])
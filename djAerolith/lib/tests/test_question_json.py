@@ -0,0 +1,81 @@
+import asyncio
+import json
+import unittest
+
+from base.utils import generate_question_list, generate_question_map
+from lib.domain import Questions
+from lib.question_json import (
+    aquestion_map_json_pages,
+    question_list_json,
+    question_list_json_pages,
+    question_map_json,
+    question_map_json_pages,
+)
+from lib.wdb_interface.question_cache import question_from_entry
+
+ENTRIES = [
+    (
+        "AEINRST",
+        1,
+        3000,
+        (
+            ("RETINAS", "AEINRST", "RETINA, a layer of the eye", "", "", 0, 0, ""),
+            ("STAINER", "AEINRST", 'one that "stains"', "", "S", 0, 1, "+"),
+        ),
+    ),
+    ("ACEFIN", 7, 10, (("FIANCÉ", "ACEFIN", "betrothed\\man", "", "S", 1, 0, "#"),)),
+    ("AEINRST", 1, 3000, ()),
+]
+
+
+def dumps(obj):
+    return json.dumps(obj, ensure_ascii=False)
+
+
+class QuestionJSONTestCase(unittest.TestCase):
+    def questions(self):
+        qs = Questions()
+        qs.questions = [question_from_entry(e) for e in ENTRIES]
+        return qs
+
+    def test_list_matches_to_python_full(self):
+        self.assertEqual(
+            "".join(question_list_json(ENTRIES)),
+            dumps(generate_question_list(self.questions())),
+        )
+
+    def test_map_matches_to_python_full(self):
+        self.assertEqual(
+            "".join(question_map_json(ENTRIES)),
+            dumps(generate_question_map(self.questions())),
+        )
+
+    def test_empty(self):
+        self.assertEqual("".join(question_list_json([])), "[]")
+        self.assertEqual("".join(question_map_json([])), "{}")
+
+    def test_pages(self):
+        pages = [ENTRIES[:1], [], ENTRIES[1:]]
+        self.assertEqual(
+            "".join(question_list_json_pages(pages)),
+            "".join(question_list_json(ENTRIES)),
+        )
+        # The duplicate on a later page is left out.
+        self.assertEqual(
+            json.loads("".join(question_map_json_pages(pages))),
+            json.loads("".join(question_map_json(ENTRIES[:2]))),
+        )
+
+    def test_async_map_pages(self):
+        pages = [ENTRIES[:1], [], ENTRIES[1:]]
+
+        async def apages():
+            for page in pages:
+                yield page
+
+        async def join():
+            return "".join([p async for p in aquestion_map_json_pages(apages())])
+
+        self.assertEqual(
+            asyncio.run(join()), "".join(question_map_json_pages(pages))
+        )
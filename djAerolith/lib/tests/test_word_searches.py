@@ -5,7 +5,7 @@ from django.test import TestCase
 
 from base.models import Lexicon, User, AlphagramTag
 from lib.wdb_interface.word_searches import SearchDescription
-from lib.wdb_interface.wdb_helper import WDBError, word_search
+from lib.wdb_interface.wdb_helper import WDBError, word_search, word_searches
 logger = logging.getLogger(__name__)
 
 
@@ -148,3 +148,38 @@ class MassiveTagSearchCase(TestCase):
         logger.debug('Tag search completed in %s seconds', time.time() - t)
         self.assertEqual(qs.size(), 2500)
 
+    def test_batched_searches(self):
+        self.create_some_tags()
+        results = word_searches([
+            [
+                SearchDescription.lexicon(self.nwl18),
+                SearchDescription.length(8, 8),
+                SearchDescription.probability_range(1, 10),
+            ],
+            [
+                SearchDescription.lexicon(self.csw19),
+                SearchDescription.length(8, 8),
+                SearchDescription.has_tags(['D4'], self.cesar, self.csw19),
+            ],
+        ])
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results[0].size(), 10)
+        self.assertEqual(['AELMOSTU'], results[1].alphagram_string_list())
+
+    def test_batched_searches_raise_first_error(self):
+        self.create_some_tags()
+        with self.assertRaises(WDBError) as e:
+            word_searches([
+                [
+                    SearchDescription.lexicon(self.nwl18),
+                    SearchDescription.length(8, 8),
+                    SearchDescription.probability_range(1, 10),
+                ],
+                [
+                    SearchDescription.lexicon(self.nwl18),
+                    SearchDescription.length(8, 8),
+                    SearchDescription.has_tags(['D4'], self.cesar,
+                                               self.nwl18),
+                ],
+            ])
+        self.assertEqual(str(e.exception), 'query returns no results')
@@ -1,13 +1,12 @@
 import logging
 from typing import List
 
-from django.conf import settings
 from twirp.context import Context
 from twirp.exceptions import TwirpServerException
 
-from lib.wdb_interface.constants import TIMEOUT
+from lib.wdb_interface.async_client import async_anagrammer_client
+from lib.wdb_interface.client_pool import anagrammer_client
 from lib.wdb_interface.exceptions import WDBError
-from rpc.wordsearcher.searcher_twirp import AnagrammerClient
 import rpc.wordsearcher.searcher_pb2 as pb
 
 logger = logging.getLogger(__name__)
@@ -28,12 +27,12 @@ def gen_blank_challenges(
     num_2_blanks: int,
     num_questions: int,
     max_answers: int,
+    timeout: float = None,
 ) -> List[dict]:
     """
     Generate a set of blank challenges with the given parameters.
 
     """
-    client = AnagrammerClient(settings.WORD_DB_SERVER_ADDRESS, timeout=TIMEOUT)
     sr = pb.BlankChallengeCreateRequest(
         lexicon=lexicon_name,
         num_questions=num_questions,
@@ -43,7 +42,8 @@ def gen_blank_challenges(
     )
 
     try:
-        response = client.BlankChallengeCreator(ctx=Context(), request=sr)
+        with anagrammer_client(timeout) as client:
+            response = client.BlankChallengeCreator(ctx=Context(), request=sr)
     except TwirpServerException as e:
         raise WDBError(e)
     return resp_to_alphagram_dicts(response)
@@ -56,8 +56,8 @@ def gen_build_challenge(
     require_length_solution: bool,
     min_solutions: int,
     max_solutions: int,
+    timeout: float = None,
 ):
-    client = AnagrammerClient(settings.WORD_DB_SERVER_ADDRESS, timeout=TIMEOUT)
     sr = pb.BuildChallengeCreateRequest(
         lexicon=lexicon_name,
         min_solutions=min_solutions,
@@ -67,20 +67,40 @@ def gen_build_challenge(
         require_length_solution=require_length_solution,
     )
     try:
-        response = client.BuildChallengeCreator(ctx=Context(), request=sr)
+        with anagrammer_client(timeout) as client:
+            response = client.BuildChallengeCreator(ctx=Context(), request=sr)
     except TwirpServerException as e:
         raise WDBError(e)
     return resp_to_alphagram_dicts(response)
 
 
 def anagram_letters(
-    lexicon_name: str, letters: str, mode=pb.AnagramRequest.Mode.EXACT
+    lexicon_name: str,
+    letters: str,
+    mode=pb.AnagramRequest.Mode.EXACT,
+    timeout: float = None,
 ):
-    client = AnagrammerClient(settings.WORD_DB_SERVER_ADDRESS, timeout=TIMEOUT)
     sr = pb.AnagramRequest(lexicon=lexicon_name, letters=letters, mode=mode)
     try:
-        response = client.Anagram(ctx=Context(), request=sr)
+        with anagrammer_client(timeout) as client:
+            response = client.Anagram(ctx=Context(), request=sr)
     except TwirpServerException as e:
         raise WDBError(e)
     words = [w.word for w in response.words]
     return words
+
+
+async def aanagram_letters(
+    lexicon_name: str,
+    letters: str,
+    mode=pb.AnagramRequest.Mode.EXACT,
+    timeout: float = None,
+):
+    """anagram_letters, for async views."""
+    sr = pb.AnagramRequest(lexicon=lexicon_name, letters=letters, mode=mode)
+    client = async_anagrammer_client(timeout)
+    try:
+        response = await client.Anagram(ctx=Context(), request=sr)
+    except TwirpServerException as e:
+        raise WDBError(e)
+    return [w.word for w in response.words]
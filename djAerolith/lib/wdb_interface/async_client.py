@@ -0,0 +1,170 @@
+"""
+Asyncio clients for the word_db_server, for async views.
+
+The clients here post through a shared `httpx.AsyncClient` instead of a
+requests.Session, so one process can wait on many word DB calls at once
+without tying up a thread for each. Their methods return coroutines:
+
+    client = async_searcher_client()
+    response = await client.Search(ctx=Context(), request=sr)
+
+An httpx client belongs to the event loop it's first used on, so one is
+kept per running loop, and closed when that loop shuts down. It keeps up
+to WORD_DB_CLIENT_POOL_SIZE idle connections alive and opens at most
+WORD_DB_ASYNC_MAX_CONNECTIONS at a time; calls beyond that wait for a
+free connection rather than failing.
+WORD_DB_TIMEOUT and WORD_DB_BACKEND mean what they do for the clients in
+client_pool.py; with the "local" backend, the in-process clients are run
+in a worker thread.
+
+"""
+
+import asyncio
+import threading
+import weakref
+
+import httpx
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from twirp import errors, exceptions
+
+from lib.wdb_interface.local_backend import local_anagrammer, local_searcher
+from rpc.wordsearcher.searcher_twirp import AnagrammerClient, QuestionSearcherClient
+
+
+class AsyncClientMixin(object):
+    """
+    Make Twirp requests through an httpx.AsyncClient. This is
+    SessionClientMixin._make_request as a coroutine, so the generated
+    methods (Search, Anagram, ...) return awaitables.
+
+    """
+
+    def __init__(self, address, timeout, http_client):
+        super().__init__(address, timeout=timeout)
+        self._http_client = http_client
+
+    async def _make_request(self, *args, url, ctx, request, response_obj, **kwargs):
+        if "timeout" not in kwargs:
+            # Waiting for a free connection doesn't count.
+            kwargs["timeout"] = httpx.Timeout(self._timeout, pool=None)
+        headers = ctx.get_headers()
+        if "headers" in kwargs:
+            headers.update(kwargs["headers"])
+        kwargs["headers"] = headers
+        kwargs["headers"]["Content-Type"] = "application/protobuf"
+        try:
+            resp = await self._http_client.post(
+                url=self._address + url, content=request.SerializeToString(), **kwargs
+            )
+        except httpx.TimeoutException as e:
+            raise exceptions.TwirpServerException(
+                code=errors.Errors.DeadlineExceeded,
+                message=str(e),
+                meta={"original_exception": e},
+            )
+        except httpx.TransportError as e:
+            raise exceptions.TwirpServerException(
+                code=errors.Errors.Unavailable,
+                message=str(e),
+                meta={"original_exception": e},
+            )
+        if resp.status_code == 200:
+            response = response_obj()
+            response.ParseFromString(resp.content)
+            return response
+        try:
+            raise exceptions.TwirpServerException.from_json(resp.json())
+        except ValueError:
+            raise exceptions.TwirpServerException(
+                code=errors.Errors.Unknown,
+                message=resp.text or resp.reason_phrase,
+                meta={"status_code": resp.status_code},
+            ) from None
+
+
+class AsyncQuestionSearcherClient(AsyncClientMixin, QuestionSearcherClient):
+    pass
+
+
+class AsyncAnagrammerClient(AsyncClientMixin, AnagrammerClient):
+    pass
+
+
+class AsyncLocalClient(object):
+    """Run the calls of an in-process client in a worker thread."""
+
+    def __init__(self, client):
+        self._client = client
+
+    def __getattr__(self, name):
+        return sync_to_async(getattr(self._client, name), thread_sensitive=False)
+
+
+_http_clients = weakref.WeakKeyDictionary()
+_http_clients_lock = threading.Lock()
+
+
+async def _close_with_loop(client):
+    # Waits at the yield until the loop shuts down. asyncio.run, and
+    # async_to_sync running an async view under WSGI, close the async
+    # generators left on a loop before closing it, which runs the finally
+    # block while the loop can still await.
+    try:
+        yield
+    finally:
+        await client.aclose()
+
+
+async def _start(closer):
+    await closer.__anext__()
+
+
+def get_http_client():
+    """
+    Return the httpx client for the running event loop. It's closed when
+    the loop shuts down, so the loop async_to_sync makes for each async
+    view under WSGI doesn't leave its connections open.
+
+    """
+    loop = asyncio.get_running_loop()
+    with _http_clients_lock:
+        entry = _http_clients.get(loop)
+        if entry is None:
+            limits = httpx.Limits(
+                max_connections=settings.WORD_DB_ASYNC_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.WORD_DB_CLIENT_POOL_SIZE,
+            )
+            # Retry once if a connection can't be made.
+            transport = httpx.AsyncHTTPTransport(limits=limits, retries=1)
+            client = httpx.AsyncClient(transport=transport)
+            # The loop only keeps weak references to its async generators.
+            closer = _close_with_loop(client)
+            entry = _http_clients[loop] = (client, closer)
+            # This runs before the client's first request gets a connection.
+            loop.create_task(_start(closer))
+    return entry[0]
+
+
+def _timeout(timeout):
+    if timeout is not None:
+        return timeout
+    return settings.WORD_DB_TIMEOUT
+
+
+def async_searcher_client(timeout=None):
+    """An asyncio QuestionSearcher client."""
+    if settings.WORD_DB_BACKEND == "local":
+        return AsyncLocalClient(local_searcher())
+    return AsyncQuestionSearcherClient(
+        settings.WORD_DB_SERVER_ADDRESS, _timeout(timeout), get_http_client()
+    )
+
+
+def async_anagrammer_client(timeout=None):
+    """An asyncio Anagrammer client."""
+    if settings.WORD_DB_BACKEND == "local":
+        return AsyncLocalClient(local_anagrammer())
+    return AsyncAnagrammerClient(
+        settings.WORD_DB_SERVER_ADDRESS, _timeout(timeout), get_http_client()
+    )
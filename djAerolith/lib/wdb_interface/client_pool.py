@@ -0,0 +1,199 @@
+"""
+A process-wide pool of HTTP sessions for talking to the word_db_server.
+
+The generated Twirp clients post with `requests.post`, which opens (and
+closes) a new connection for every call. The clients here post through a
+`requests.Session` instead, so connections are kept alive and reused.
+Sessions aren't safe to share between threads, so each call checks one out
+of the pool and returns it when done.
+
+    with searcher_client() as client:
+        response = client.Search(ctx=Context(), request=sr)
+
+Settings:
+    WORD_DB_CLIENT_POOL_SIZE - the number of idle sessions to keep around.
+        Extra sessions are created when more threads than this are talking
+        to the word DB at once, and closed when they are returned.
+    WORD_DB_TIMEOUT - the default timeout (in seconds) for a call. Pass
+        `timeout` to override it for one call.
+    WORD_DB_BACKEND - if "local", the context managers yield in-process
+        clients from local_backend.py instead, and no sessions are used.
+
+"""
+
+import contextlib
+import queue
+import threading
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from twirp import errors, exceptions
+from urllib3.util.retry import Retry
+
+from lib.wdb_interface.local_backend import local_anagrammer, local_searcher
+from rpc.wordsearcher.searcher_twirp import AnagrammerClient, QuestionSearcherClient
+
+
+class SessionClientMixin(object):
+    """
+    Make Twirp requests through a requests.Session. This is
+    twirp.client.TwirpClient._make_request, with `requests.post` replaced.
+
+    """
+
+    def __init__(self, address, timeout, session):
+        super().__init__(address, timeout=timeout)
+        self._session = session
+
+    def _make_request(self, *args, url, ctx, request, response_obj, **kwargs):
+        if "timeout" not in kwargs:
+            kwargs["timeout"] = self._timeout
+        headers = ctx.get_headers()
+        if "headers" in kwargs:
+            headers.update(kwargs["headers"])
+        kwargs["headers"] = headers
+        kwargs["headers"]["Content-Type"] = "application/protobuf"
+        try:
+            resp = self._session.post(
+                url=self._address + url, data=request.SerializeToString(), **kwargs
+            )
+            if resp.status_code == 200:
+                response = response_obj()
+                response.ParseFromString(resp.content)
+                return response
+            try:
+                raise exceptions.TwirpServerException.from_json(resp.json())
+            except ValueError:
+                raise exceptions.TwirpServerException(
+                    code=errors.Errors.Unknown,
+                    message=resp.text or resp.reason,
+                    meta={"status_code": resp.status_code},
+                ) from None
+        except requests.exceptions.Timeout as e:
+            raise exceptions.TwirpServerException(
+                code=errors.Errors.DeadlineExceeded,
+                message=str(e),
+                meta={"original_exception": e},
+            )
+        except requests.exceptions.ConnectionError as e:
+            raise exceptions.TwirpServerException(
+                code=errors.Errors.Unavailable,
+                message=str(e),
+                meta={"original_exception": e},
+            )
+
+
+class PooledQuestionSearcherClient(SessionClientMixin, QuestionSearcherClient):
+    pass
+
+
+class PooledAnagrammerClient(SessionClientMixin, AnagrammerClient):
+    pass
+
+
+class ClientPool(object):
+    """A thread-safe pool of keep-alive sessions, with usage counters."""
+
+    def __init__(self, size):
+        self.size = size
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.discarded = 0
+
+    def _new_session(self):
+        session = requests.Session()
+        # A kept-alive connection may have been closed by the server while
+        # it was idle. All word DB calls are reads, so it's safe to retry
+        # those once, POST or not.
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=1,
+            max_retries=Retry(total=1, allowed_methods=None, status=0),
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    @contextlib.contextmanager
+    def session(self):
+        try:
+            session = self._idle.get_nowait()
+            hit = True
+        except queue.Empty:
+            session = self._new_session()
+            hit = False
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        try:
+            yield session
+        finally:
+            if self._idle.qsize() < self.size:
+                self._idle.put(session)
+            else:
+                session.close()
+                with self._lock:
+                    self.discarded += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": self.size,
+                "idle": self._idle.qsize(),
+                "hits": self.hits,
+                "misses": self.misses,
+                "discarded": self.discarded,
+            }
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_client_pool():
+    """Return the process-wide client pool."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ClientPool(settings.WORD_DB_CLIENT_POOL_SIZE)
+    return _pool
+
+
+def _timeout(timeout):
+    if timeout is not None:
+        return timeout
+    return settings.WORD_DB_TIMEOUT
+
+
+@contextlib.contextmanager
+def searcher_client(timeout=None):
+    """A QuestionSearcher client backed by a pooled session."""
+    if settings.WORD_DB_BACKEND == "local":
+        yield local_searcher()
+        return
+    with get_client_pool().session() as session:
+        yield PooledQuestionSearcherClient(
+            settings.WORD_DB_SERVER_ADDRESS, _timeout(timeout), session
+        )
+
+
+@contextlib.contextmanager
+def anagrammer_client(timeout=None):
+    """An Anagrammer client backed by a pooled session."""
+    if settings.WORD_DB_BACKEND == "local":
+        yield local_anagrammer()
+        return
+    with get_client_pool().session() as session:
+        yield PooledAnagrammerClient(
+            settings.WORD_DB_SERVER_ADDRESS, _timeout(timeout), session
+        )
+
+
+def pool_stats():
+    return get_client_pool().stats()
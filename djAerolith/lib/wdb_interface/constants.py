@@ -1 +0,0 @@
-TIMEOUT = 30  # timeout for communicating iwth Twirp server
@@ -0,0 +1,396 @@
+"""
+An in-process implementation of the word_db_server QuestionSearcher and
+Anagrammer services, reading the same SQLite lexicon databases the server
+does (WORD_DB_LOCATION/<lexicon>.db). Select it with
+WORD_DB_BACKEND = "local"; the clients in client_pool.py then call these
+directly instead of going over the network.
+
+The databases are expected to have these tables (as built by
+word_db_server's dbmaker):
+
+    alphagrams (alphagram, length, probability, combinations, num_anagrams,
+                num_vowels, point_value, difficulty, ...)
+    words (word, alphagram, definition, front_hooks, back_hooks,
+           inner_front_hook, inner_back_hook, lexicon_symbols, ...)
+
+Errors are raised as TwirpServerException, the same as the remote clients
+would raise them, so callers can't tell the difference.
+
+"""
+
+import itertools
+import json
+import logging
+import os
+import random
+import re
+import sqlite3
+import threading
+from collections import Counter
+
+from django.conf import settings
+from twirp import errors
+from twirp.exceptions import TwirpServerException
+
+from base.models import SORT_STRING_ORDER, alphagrammize
+import rpc.wordsearcher.searcher_pb2 as pb
+
+logger = logging.getLogger(__name__)
+
+Condition = pb.SearchRequest.Condition
+BLANK = "?"
+ALPHABET = SORT_STRING_ORDER.replace(BLANK, "")
+# Give up on generating a challenge after this many random racks.
+MAX_CHALLENGE_TRIES = 5000
+
+ALPHAGRAM_COLUMNS = "a.alphagram, a.length, a.probability, a.combinations"
+WORD_COLUMNS = (
+    "word, alphagram, definition, front_hooks, back_hooks, inner_front_hook, "
+    "inner_back_hook, lexicon_symbols"
+)
+MIN_MAX_COLUMNS = {
+    Condition.LENGTH: "a.length",
+    Condition.PROBABILITY_RANGE: "a.probability",
+    Condition.NUMBER_OF_ANAGRAMS: "a.num_anagrams",
+    Condition.NUMBER_OF_VOWELS: "a.num_vowels",
+    Condition.POINT_VALUE: "a.point_value",
+    Condition.DIFFICULTY_RANGE: "a.difficulty",
+}
+
+
+def _error(code, message):
+    return TwirpServerException(code=code, message=message)
+
+
+def _regexp(pattern, value):
+    return value is not None and re.search(pattern, value) is not None
+
+
+class LexiconDatabases(object):
+    """Read-only SQLite connections to the lexicon databases, per thread."""
+
+    def __init__(self, location):
+        self.location = location
+        self._local = threading.local()
+
+    def connection(self, lexicon_name):
+        if not lexicon_name:
+            raise _error(errors.Errors.InvalidArgument, "no lexicon specified")
+        conns = getattr(self._local, "conns", None)
+        if conns is None:
+            conns = self._local.conns = {}
+        conn = conns.get(lexicon_name)
+        if conn is None:
+            path = os.path.join(self.location, "{}.db".format(lexicon_name))
+            if os.path.basename(path) != "{}.db".format(lexicon_name) or (
+                not os.path.exists(path)
+            ):
+                raise _error(
+                    errors.Errors.NotFound,
+                    "lexicon not found: {}".format(lexicon_name),
+                )
+            conn = sqlite3.connect("file:{}?mode=ro".format(path), uri=True)
+            conn.create_function("REGEXP", 2, _regexp, deterministic=True)
+            conns[lexicon_name] = conn
+        return conn
+
+
+def _pb_word(row, expand):
+    if not expand:
+        return pb.Word(word=row[0], alphagram=row[1])
+    return pb.Word(
+        word=row[0],
+        alphagram=row[1],
+        definition=row[2] or "",
+        front_hooks=row[3] or "",
+        back_hooks=row[4] or "",
+        inner_front_hook=bool(row[5]),
+        inner_back_hook=bool(row[6]),
+        lexicon_symbols=row[7] or "",
+    )
+
+
+def _words_for_alphagrams(conn, alphagrams):
+    """Return {alphagram: [word rows]} for the given alphagrams."""
+    by_alphagram = {}
+    rows = conn.execute(
+        "SELECT {} FROM words WHERE alphagram IN "
+        "(SELECT value FROM json_each(?)) ORDER BY word".format(WORD_COLUMNS),
+        (json.dumps(list(alphagrams)),),
+    )
+    for row in rows:
+        by_alphagram.setdefault(row[1], []).append(row)
+    return by_alphagram
+
+
+def _alphagrammize(letters):
+    try:
+        return alphagrammize(letters)
+    except KeyError as e:
+        raise _error(
+            errors.Errors.InvalidArgument, "unsupported letter: {}".format(e.args[0])
+        )
+
+
+def _blank_fills(num_blanks):
+    return itertools.combinations_with_replacement(ALPHABET, num_blanks)
+
+
+def _exact_candidates(rack):
+    """The alphagrams of all the words that exactly use `rack`."""
+    letters = rack.replace(BLANK, "")
+    num_blanks = len(rack) - len(letters)
+    return {
+        _alphagrammize(letters + "".join(fill)) for fill in _blank_fills(num_blanks)
+    }
+
+
+def _build_candidates(rack, min_length=2, max_length=None):
+    """The alphagrams of all the words that can be made from `rack`."""
+    letters = rack.replace(BLANK, "")
+    num_blanks = len(rack) - len(letters)
+    counts = sorted(Counter(letters).items())
+    candidates = set()
+    for used in itertools.product(*[range(c + 1) for _, c in counts]):
+        sub = "".join(letter * n for (letter, _), n in zip(counts, used))
+        for blanks_used in range(num_blanks + 1):
+            length = len(sub) + blanks_used
+            if length < min_length or (max_length and length > max_length):
+                continue
+            for fill in _blank_fills(blanks_used):
+                candidates.add(_alphagrammize(sub + "".join(fill)))
+    return candidates
+
+
+class LocalQuestionSearcher(object):
+    """Implements the QuestionSearcher service against local databases."""
+
+    def __init__(self, databases):
+        self.databases = databases
+
+    def _build_query(self, searchparams):
+        lexicon_name = None
+        where = []
+        params = []
+        limit = ""
+        for sp in searchparams:
+            c = sp.condition
+            if c == Condition.LEXICON:
+                lexicon_name = sp.stringvalue.value
+            elif c in MIN_MAX_COLUMNS:
+                where.append("{} BETWEEN ? AND ?".format(MIN_MAX_COLUMNS[c]))
+                params.extend([sp.minmax.min, sp.minmax.max])
+            elif c == Condition.SINGLE_VALUE_LENGTH:
+                where.append("a.length = ?")
+                params.append(sp.numbervalue.value)
+            elif c == Condition.PROBABILITY_LIST:
+                where.append("a.probability IN (SELECT value FROM json_each(?))")
+                params.append(json.dumps(list(sp.numberarray.values)))
+            elif c == Condition.PROBABILITY_LIMIT:
+                limit = " LIMIT ? OFFSET ?"
+                limit_params = [
+                    max(sp.minmax.max - sp.minmax.min + 1, 0),
+                    max(sp.minmax.min - 1, 0),
+                ]
+            elif c == Condition.ALPHAGRAM_LIST:
+                where.append("a.alphagram IN (SELECT value FROM json_each(?))")
+                params.append(json.dumps(list(sp.stringarray.values)))
+            elif c == Condition.MATCHING_ANAGRAM:
+                where.append("a.alphagram IN (SELECT value FROM json_each(?))")
+                params.append(
+                    json.dumps(list(_exact_candidates(sp.stringvalue.value.upper())))
+                )
+            elif c == Condition.WORD_LIST:
+                where.append(
+                    "a.alphagram IN (SELECT alphagram FROM words WHERE word IN "
+                    "(SELECT value FROM json_each(?)))"
+                )
+                params.append(json.dumps([w.upper() for w in sp.stringarray.values]))
+            elif c == Condition.REGEX:
+                where.append(
+                    "a.alphagram IN (SELECT alphagram FROM words WHERE word REGEXP ?)"
+                )
+                params.append(sp.stringvalue.value)
+            else:
+                raise _error(
+                    errors.Errors.Unimplemented,
+                    "search condition {} is not supported by the local word "
+                    "database".format(Condition.Name(c)),
+                )
+        query = "SELECT {} FROM alphagrams a".format(ALPHAGRAM_COLUMNS)
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        query += " ORDER BY a.length, a.probability"
+        if limit:
+            query += limit
+            params.extend(limit_params)
+        return lexicon_name, query, params
+
+    def Search(self, *args, ctx, request, **kwargs):
+        lexicon_name, query, params = self._build_query(request.searchparams)
+        conn = self.databases.connection(lexicon_name)
+        try:
+            rows = conn.execute(query, params).fetchall()
+        except sqlite3.Error as e:
+            raise _error(errors.Errors.Internal, str(e))
+        if not rows:
+            raise _error(errors.Errors.NotFound, "query returns no results")
+        words = _words_for_alphagrams(conn, [r[0] for r in rows])
+        response = pb.SearchResponse(lexicon=lexicon_name)
+        for alphagram, length, probability, combinations in rows:
+            pba = response.alphagrams.add(
+                alphagram=alphagram,
+                length=length,
+                probability=probability or 0,
+                combinations=combinations or 0,
+                expandedRepr=request.expand,
+            )
+            pba.words.extend(
+                _pb_word(w, request.expand) for w in words.get(alphagram, [])
+            )
+        return response
+
+    def Expand(self, *args, ctx, request, **kwargs):
+        conn = self.databases.connection(request.lexicon)
+        alphagrams = [a.alphagram for a in request.alphagrams]
+        info = {}
+        rows = conn.execute(
+            "SELECT {} FROM alphagrams a WHERE a.alphagram IN "
+            "(SELECT value FROM json_each(?))".format(ALPHAGRAM_COLUMNS),
+            (json.dumps(alphagrams),),
+        )
+        for alphagram, length, probability, combinations in rows:
+            info[alphagram] = (length, probability or 0, combinations or 0)
+        words = {}
+        for rows in _words_for_alphagrams(conn, alphagrams).values():
+            for row in rows:
+                words[row[0]] = row
+        response = pb.SearchResponse(lexicon=request.lexicon)
+        for a in request.alphagrams:
+            length, probability, combinations = info.get(
+                a.alphagram, (len(a.alphagram), 0, 0)
+            )
+            pba = response.alphagrams.add(
+                alphagram=a.alphagram,
+                length=length,
+                probability=probability,
+                combinations=combinations,
+                expandedRepr=True,
+            )
+            # Words that are no longer in the lexicon are dropped.
+            pba.words.extend(
+                _pb_word(words[w.word], True) for w in a.words if w.word in words
+            )
+        return response
+
+
+class LocalAnagrammer(object):
+    """Implements the Anagrammer service against local databases."""
+
+    def __init__(self, databases):
+        self.databases = databases
+
+    def _anagram_rows(self, conn, rack, build, min_length=2, max_length=None):
+        if build:
+            candidates = _build_candidates(rack, min_length, max_length)
+        else:
+            candidates = _exact_candidates(rack)
+        words = _words_for_alphagrams(conn, candidates)
+        return sorted(
+            itertools.chain.from_iterable(words.values()),
+            key=lambda row: (-len(row[0]), row[0]),
+        )
+
+    def Anagram(self, *args, ctx, request, **kwargs):
+        conn = self.databases.connection(request.lexicon)
+        rows = self._anagram_rows(
+            conn,
+            request.letters.upper(),
+            request.mode == pb.AnagramRequest.Mode.BUILD,
+        )
+        response = pb.AnagramResponse(num_words=len(rows))
+        response.words.extend(_pb_word(row, request.expand) for row in rows)
+        return response
+
+    def _random_alphagram(self, conn, length):
+        (count,) = conn.execute(
+            "SELECT COUNT(*) FROM alphagrams WHERE length = ?", (length,)
+        ).fetchone()
+        if count == 0:
+            raise _error(
+                errors.Errors.NotFound, "no words of length {}".format(length)
+            )
+        (alphagram,) = conn.execute(
+            "SELECT alphagram FROM alphagrams WHERE length = ? LIMIT 1 OFFSET ?",
+            (length, random.randrange(count)),
+        ).fetchone()
+        return alphagram
+
+    def BlankChallengeCreator(self, *args, ctx, request, **kwargs):
+        conn = self.databases.connection(request.lexicon)
+        response = pb.SearchResponse(lexicon=request.lexicon)
+        seen = set()
+        num_2_blanks = 0
+        tries = 0
+        while len(response.alphagrams) < request.num_questions:
+            tries += 1
+            if tries > MAX_CHALLENGE_TRIES:
+                raise _error(
+                    errors.Errors.Internal, "could not generate blank challenges"
+                )
+            num_blanks = 2 if num_2_blanks < request.num_with_2_blanks else 1
+            letters = list(self._random_alphagram(conn, request.word_length))
+            for _ in range(num_blanks):
+                letters.pop(random.randrange(len(letters)))
+            rack = _alphagrammize("".join(letters) + BLANK * num_blanks)
+            if rack in seen:
+                continue
+            seen.add(rack)
+            rows = self._anagram_rows(conn, rack, False)
+            if not 0 < len(rows) <= request.max_solutions:
+                continue
+            if num_blanks == 2:
+                num_2_blanks += 1
+            pba = response.alphagrams.add(alphagram=rack, length=len(rack))
+            pba.words.extend(_pb_word(row, False) for row in rows)
+        return response
+
+    def BuildChallengeCreator(self, *args, ctx, request, **kwargs):
+        conn = self.databases.connection(request.lexicon)
+        for _ in range(MAX_CHALLENGE_TRIES):
+            rack = self._random_alphagram(conn, request.max_length)
+            rows = self._anagram_rows(
+                conn, rack, True, request.min_length, request.max_length
+            )
+            if not request.min_solutions <= len(rows) <= request.max_solutions:
+                continue
+            if request.require_length_solution and not any(
+                len(row[0]) == request.max_length for row in rows
+            ):
+                continue
+            response = pb.SearchResponse(lexicon=request.lexicon)
+            pba = response.alphagrams.add(alphagram=rack, length=len(rack))
+            pba.words.extend(_pb_word(row, False) for row in rows)
+            return response
+        raise _error(errors.Errors.Internal, "could not generate build challenge")
+
+
+_databases = None
+_databases_lock = threading.Lock()
+
+
+def get_databases():
+    global _databases
+    if _databases is None:
+        with _databases_lock:
+            if _databases is None:
+                _databases = LexiconDatabases(settings.WORD_DB_LOCATION)
+    return _databases
+
+
+def local_searcher():
+    return LocalQuestionSearcher(get_databases())
+
+
+def local_anagrammer():
+    return LocalAnagrammer(get_databases())
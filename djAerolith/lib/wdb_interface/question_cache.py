@@ -0,0 +1,102 @@
+"""
+A process-wide cache of fully expanded questions (definitions, hooks,
+symbols, etc), keyed by (lexicon name, alphagram).
+
+Lexica don't change once they're published, so entries never need to be
+invalidated; the cache is only bounded in size
+(WORD_DB_QUESTION_CACHE_SIZE questions), evicting the least recently used.
+
+"""
+
+import threading
+
+from django.conf import settings
+
+from lib.domain import Alphagram, Question, Word
+from lib.lru import LRUCache
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_question_cache():
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = LRUCache(settings.WORD_DB_QUESTION_CACHE_SIZE)
+    return _cache
+
+
+def pb_entry(pba):
+    """
+    A compact, immutable form of an expanded protobuf Alphagram:
+    (alphagram, probability, combinations, words), each word a tuple of
+    (word, alphagram, definition, front_hooks, back_hooks,
+    inner_front_hook, inner_back_hook, lexicon_symbols).
+
+    """
+    words = tuple(
+        (
+            w.word,
+            w.alphagram,
+            w.definition,
+            w.front_hooks,
+            w.back_hooks,
+            w.inner_front_hook,
+            w.inner_back_hook,
+            w.lexicon_symbols,
+        )
+        for w in pba.words
+    )
+    return (pba.alphagram, pba.probability, pba.combinations, words)
+
+
+def cache_pb_alphagram(lexicon_name, pba):
+    """Cache an expanded protobuf Alphagram; returns its entry."""
+    entry = pb_entry(pba)
+    get_question_cache().set((lexicon_name, pba.alphagram), entry)
+    return entry
+
+
+def cached_entry(lexicon_name, alpha_dict):
+    """
+    Return the cached entry for an {'q': alphagram, 'a': [words]} dict,
+    or None if it's not cached (with the same answers).
+
+    """
+    entry = get_question_cache().get((lexicon_name, alpha_dict["q"]))
+    if entry is None:
+        return None
+    words = entry[3]
+    if len(words) != len(alpha_dict["a"]) or {w[0] for w in words} != set(
+        alpha_dict["a"]
+    ):
+        # The list has a different set of answers for this alphagram
+        # (e.g. it was made for an older version of the lexicon).
+        return None
+    return entry
+
+
+def question_from_entry(entry):
+    alphagram, probability, combinations, words = entry
+    return Question(
+        alphagram=Alphagram(alphagram, probability, combinations),
+        answers=[Word(*w) for w in words],
+    )
+
+
+def cached_question(lexicon_name, alpha_dict):
+    """
+    Return a Question for an {'q': alphagram, 'a': [words]} dict, or None
+    if it's not cached (with the same answers).
+
+    """
+    entry = cached_entry(lexicon_name, alpha_dict)
+    if entry is None:
+        return None
+    return question_from_entry(entry)
+
+
+def question_cache_stats():
+    return get_question_cache().stats()
@@ -1,3 +1,4 @@
+from concurrent.futures import ThreadPoolExecutor
 from typing import List
 
 from django.conf import settings
@@ -6,10 +7,15 @@ from twirp.exceptions import TwirpServerException
 
 from base.models import Lexicon
 from lib.domain import Questions
-from lib.wdb_interface.constants import TIMEOUT
+from lib.wdb_interface.async_client import async_searcher_client
+from lib.wdb_interface.client_pool import searcher_client
 from lib.wdb_interface.exceptions import WDBError
+from lib.wdb_interface.question_cache import (
+    cache_pb_alphagram,
+    cached_entry,
+    question_from_entry,
+)
 from lib.wdb_interface.word_searches import SearchDescription
-from rpc.wordsearcher.searcher_twirp import QuestionSearcherClient
 import rpc.wordsearcher.searcher_pb2 as pb
 
 
@@ -32,17 +38,84 @@ def questions_from_alphagrams(
 
 
 def questions_from_alpha_dicts(
-    lexicon: Lexicon, alphas: List[dict]
+    lexicon: Lexicon, alphas: List[dict], timeout: float = None
 ) -> Questions:
     """
     This has to use the client.expand function.
     alphas looks like:
         [{'q': ..., 'a': [...]}, ...] where everything is a string.
+
+    Questions that are in the question cache aren't expanded again.
     """
-    client = QuestionSearcherClient(
-        settings.WORD_DB_SERVER_ADDRESS, timeout=TIMEOUT
-    )
+    qs = Questions()
+    qs.questions = [
+        question_from_entry(entry)
+        for entry in question_entries_from_alpha_dicts(lexicon, alphas, timeout)
+    ]
+    return qs
+
+
+def question_entries_from_alpha_dicts(
+    lexicon: Lexicon, alphas: List[dict], timeout: float = None
+):
+    """
+    Like questions_from_alpha_dicts, but returns question cache entries
+    (see question_cache.pb_entry) rather than Questions.
+
+    """
+    entries = [cached_entry(lexicon.lexiconName, alpha) for alpha in alphas]
+    to_expand = [alphas[i] for i, e in enumerate(entries) if e is None]
+    if to_expand:
+        _merge_expanded(
+            lexicon, alphas, entries, to_expand, _expand(lexicon, to_expand, timeout)
+        )
+    return [e for e in entries if e is not None]
+
+
+async def aquestion_entries_from_alpha_dicts(
+    lexicon: Lexicon, alphas: List[dict], timeout: float = None
+):
+    """question_entries_from_alpha_dicts, for async views."""
+    entries = [cached_entry(lexicon.lexiconName, alpha) for alpha in alphas]
+    to_expand = [alphas[i] for i, e in enumerate(entries) if e is None]
+    if to_expand:
+        client = async_searcher_client(timeout)
+        try:
+            response = await client.Expand(
+                ctx=Context(), request=_expand_request(lexicon, to_expand)
+            )
+        except TwirpServerException as e:
+            raise WDBError(e)
+        _merge_expanded(lexicon, alphas, entries, to_expand, response.alphagrams)
+    return [e for e in entries if e is not None]
+
+
+def _merge_expanded(lexicon, alphas, entries, to_expand, pbas):
+    """Cache the expanded `pbas` and fill in the missing `entries`."""
+    expanded = {}
+    for pba in pbas:
+        expanded[pba.alphagram] = cache_pb_alphagram(lexicon.lexiconName, pba)
+    for i, alpha in enumerate(alphas):
+        if entries[i] is None:
+            entries[i] = expanded.get(alpha["q"])
+    # Anything the server returned that we didn't ask for as such.
+    requested = {alpha["q"] for alpha in to_expand}
+    entries.extend(e for a, e in expanded.items() if a not in requested)
+
+
+def _expand(lexicon: Lexicon, alphas: List[dict], timeout: float = None):
+    """Expand alpha dicts with the word DB; returns pb Alphagrams."""
+    try:
+        with searcher_client(timeout) as client:
+            response = client.Expand(
+                ctx=Context(), request=_expand_request(lexicon, alphas)
+            )
+    except TwirpServerException as e:
+        raise WDBError(e)
+    return response.alphagrams
 
+
+def _expand_request(lexicon: Lexicon, alphas: List[dict]):
     sr = pb.SearchResponse()
     sr.lexicon = lexicon.lexiconName
     pbas = []
@@ -56,13 +129,7 @@ def questions_from_alpha_dicts(
         pbas.append(pba)
 
     sr.alphagrams.extend(pbas)
-    try:
-        response = client.Expand(ctx=Context(), request=sr)
-    except TwirpServerException as e:
-        raise WDBError(e)
-    qs = Questions()
-    qs.set_from_pb_alphagrams(response.alphagrams)
-    return qs
+    return sr
 
 
 def questions_from_probability_range(
@@ -79,6 +146,27 @@ def questions_from_probability_range(
     return qs
 
 
+def question_entries_from_probability_range(
+    lexicon: Lexicon, pmin: int, pmax: int, wl: int
+):
+    """
+    The expanded questions of a probability range, as question cache
+    entries (see question_cache.pb_entry).
+
+    """
+    response = _search(
+        [
+            SearchDescription.lexicon(lexicon),
+            SearchDescription.length(wl, wl),
+            SearchDescription.probability_range(pmin, pmax),
+        ],
+        expand=True,
+    )
+    return [
+        cache_pb_alphagram(lexicon.lexiconName, pba) for pba in response.alphagrams
+    ]
+
+
 def questions_from_probability_list(
     lexicon: Lexicon, plist: List[int], wl: int, expand: bool = False
 ):
@@ -93,19 +181,94 @@ def questions_from_probability_list(
     return qs
 
 
-def word_search(
+def _search(
+    search_descriptions: List[pb.SearchRequest.SearchParam],
+    expand=False,
+    timeout: float = None,
+):
+    try:
+        with searcher_client(timeout) as client:
+            return client.Search(
+                ctx=Context(), request=_search_request(search_descriptions, expand)
+            )
+    except TwirpServerException as e:
+        raise WDBError(e)
+
+
+def _search_request(
     search_descriptions: List[pb.SearchRequest.SearchParam], expand=False
-) -> Questions:
-    client = QuestionSearcherClient(
-        settings.WORD_DB_SERVER_ADDRESS, timeout=TIMEOUT
-    )
+):
     sr = pb.SearchRequest()
     sr.expand = expand
     sr.searchparams.extend(search_descriptions)
+    return sr
+
+
+def word_search(
+    search_descriptions: List[pb.SearchRequest.SearchParam],
+    expand=False,
+    timeout: float = None,
+) -> Questions:
+    response = _search(search_descriptions, expand, timeout)
+    return _search_questions(search_descriptions, expand, response)
+
+
+async def aword_search(
+    search_descriptions: List[pb.SearchRequest.SearchParam],
+    expand=False,
+    timeout: float = None,
+) -> Questions:
+    """word_search, for async views."""
+    client = async_searcher_client(timeout)
     try:
-        response = client.Search(ctx=Context(), request=sr)
+        response = await client.Search(
+            ctx=Context(), request=_search_request(search_descriptions, expand)
+        )
     except TwirpServerException as e:
         raise WDBError(e)
+    return _search_questions(search_descriptions, expand, response)
+
+
+def _search_questions(
+    search_descriptions: List[pb.SearchRequest.SearchParam], expand, response
+) -> Questions:
+    lexicon_name = _search_lexicon(search_descriptions)
+    if expand and lexicon_name:
+        for pba in response.alphagrams:
+            cache_pb_alphagram(lexicon_name, pba)
     qs = Questions()
     qs.set_from_pb_alphagrams(response.alphagrams)
     return qs
+
+
+def word_searches(
+    searches: List[List[pb.SearchRequest.SearchParam]],
+    expand=False,
+    timeout: float = None,
+) -> List[Questions]:
+    """
+    Run several searches at once; returns a Questions for each list of
+    search descriptions in `searches`, in the same order.
+
+    The word DB has no batch call, so the searches are pipelined over up
+    to WORD_DB_CLIENT_POOL_SIZE pooled connections instead of being made
+    one after the other. If any search fails, the WDBError of the first
+    failing one (in `searches` order) is raised, just as calling
+    word_search in a loop would.
+
+    """
+    if len(searches) <= 1:
+        return [word_search(sd, expand, timeout) for sd in searches]
+    workers = min(len(searches), settings.WORD_DB_CLIENT_POOL_SIZE)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(word_search, sd, expand, timeout) for sd in searches
+        ]
+        return [f.result() for f in futures]
+
+
+def _search_lexicon(search_descriptions: List[pb.SearchRequest.SearchParam]):
+    for sd in search_descriptions:
+        if sd.condition == pb.SearchRequest.Condition.LEXICON:
+            return sd.stringvalue.value
+    return None
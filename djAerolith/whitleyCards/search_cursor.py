@@ -0,0 +1,60 @@
+"""
+Server-side cursors for flashcarding a search a chunk at a time.
+
+The first chunk of a search runs it once, without expanding it, and keeps
+the ordered {'q': ..., 'a': [...]} list of its questions in process
+memory, keyed by user, lexicon and encoded search. Each chunk then only
+expands its own slice of that list, instead of re-running and expanding
+the whole search.
+
+Cursors expire WHITLEYCARDS_CURSOR_TTL seconds after the search was run,
+and at most WHITLEYCARDS_CURSOR_CACHE_SIZE of them are kept, least
+recently used first out. Searches with more than
+WHITLEYCARDS_CURSOR_MAX_QUESTIONS questions aren't kept at all. A chunk
+whose cursor is gone just runs the search again; searches return their
+questions in a stable order, so the chunk indices stay valid.
+
+"""
+
+import threading
+
+from django.conf import settings
+
+from lib.lru import LRUCache
+from lib.wdb_interface.wdb_helper import word_search
+
+_cursors = None
+_cursors_lock = threading.Lock()
+
+
+def get_cursors():
+    global _cursors
+    if _cursors is None:
+        with _cursors_lock:
+            if _cursors is None:
+                _cursors = LRUCache(
+                    settings.WHITLEYCARDS_CURSOR_CACHE_SIZE,
+                    ttl=settings.WHITLEYCARDS_CURSOR_TTL,
+                )
+    return _cursors
+
+
+def search_questions(user, lexicon, encoded_search, make_search_params):
+    """
+    The questions of a search, as a list of {'q': ..., 'a': [...]} dicts,
+    from its cursor if it has one. `make_search_params()` builds the
+    search descriptions when the search has to be run.
+
+    """
+    key = (user.pk, lexicon.pk, encoded_search)
+    cursors = get_cursors()
+    questions = cursors.get(key)
+    if questions is None:
+        questions = word_search(make_search_params()).to_python()
+        if len(questions) <= settings.WHITLEYCARDS_CURSOR_MAX_QUESTIONS:
+            cursors.set(key, questions)
+    return questions
+
+
+def cursor_stats():
+    return get_cursors().stats()
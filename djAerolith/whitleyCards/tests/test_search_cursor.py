@@ -0,0 +1,112 @@
+import base64
+import json
+import time
+import zlib
+
+import mock
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.test.client import Client
+from django.test.utils import override_settings
+
+from base.models import Lexicon
+from whitleyCards import search_cursor
+from whitleyCards.search_cursor import search_questions
+
+QUESTIONS = [{'q': 'AEINRST', 'a': ['RETAINS', 'STAINER']},
+             {'q': 'AEILNST', 'a': ['ENTAILS']},
+             {'q': 'ADEEIKS', 'a': ['DEKES']},
+             {'q': 'AEINRSTU', 'a': ['URINATES']},
+             {'q': 'ACEINRST', 'a': ['CANISTER']}]
+
+
+def searched(questions):
+    search = mock.Mock()
+    search.to_python.return_value = list(questions)
+    return search
+
+
+class SearchCursorTest(TestCase):
+    fixtures = ['test/lexica.yaml',
+                'test/users.json',
+                'test/profiles.json']
+
+    USER = 'cesar'
+    PASSWORD = 'foobar'
+
+    def setUp(self):
+        # The cursors live in process memory, and are made with the
+        # settings of the first test to use them.
+        search_cursor._cursors = None
+        self.user = User.objects.get(username=self.USER)
+        self.lex = Lexicon.objects.get(lexiconName='NWL20')
+
+    def tearDown(self):
+        search_cursor._cursors = None
+
+    @mock.patch('whitleyCards.views.QUIZ_CHUNK_SIZE', 2)
+    @mock.patch('whitleyCards.views.getWordDataFromQuestions',
+                side_effect=lambda lex, chunk: chunk)
+    @mock.patch('whitleyCards.views.build_search_criteria', return_value=[])
+    @mock.patch('whitleyCards.search_cursor.word_search')
+    def test_next_set_reuses_cursor(self, word_search, build_search_criteria,
+                                    get_word_data):
+        word_search.return_value = searched(QUESTIONS)
+        client = Client()
+        self.assertTrue(client.login(username=self.USER,
+                                     password=self.PASSWORD))
+        params = base64.urlsafe_b64encode(
+            zlib.compress(json.dumps([]).encode('utf-8'))).decode('utf-8')
+        url = '/flashcards/search/{}/{}/'.format(self.lex.pk, params)
+
+        resp = client.post(url, {'action': 'getInitialSet'})
+        content = json.loads(resp.content)
+        self.assertEqual(content['data'], QUESTIONS[:2])
+        self.assertEqual(content['numAlphas'], 5)
+        self.assertEqual(word_search.call_count, 1)
+
+        resp = client.post(url, {'action': 'getNextSet',
+                                 'minP': content['nextMinP'],
+                                 'maxP': content['nextMaxP']})
+        content = json.loads(resp.content)
+        self.assertEqual(content['data'], QUESTIONS[2:4])
+        # The second chunk came from the cursor; the search wasn't run
+        # again.
+        self.assertEqual(word_search.call_count, 1)
+        self.assertEqual(build_search_criteria.call_count, 1)
+        self.assertEqual(search_cursor.cursor_stats()['hits'], 1)
+
+    @override_settings(WHITLEYCARDS_CURSOR_TTL=0.01)
+    @mock.patch('whitleyCards.search_cursor.word_search')
+    def test_cursor_expires(self, word_search):
+        word_search.return_value = searched(QUESTIONS)
+        search_questions(self.user, self.lex, 'abc', list)
+        search_questions(self.user, self.lex, 'abc', list)
+        self.assertEqual(word_search.call_count, 1)
+        time.sleep(0.02)
+        self.assertEqual(search_questions(self.user, self.lex, 'abc', list),
+                         QUESTIONS)
+        self.assertEqual(word_search.call_count, 2)
+
+    @override_settings(WHITLEYCARDS_CURSOR_CACHE_SIZE=2)
+    @mock.patch('whitleyCards.search_cursor.word_search')
+    def test_oldest_cursor_evicted(self, word_search):
+        word_search.return_value = searched(QUESTIONS)
+        for encoded_search in ('a', 'b', 'c'):
+            search_questions(self.user, self.lex, encoded_search, list)
+        self.assertEqual(word_search.call_count, 3)
+        self.assertEqual(search_cursor.cursor_stats()['evictions'], 1)
+        # 'b' and 'c' are still kept; 'a' has to be searched again.
+        search_questions(self.user, self.lex, 'c', list)
+        search_questions(self.user, self.lex, 'b', list)
+        self.assertEqual(word_search.call_count, 3)
+        search_questions(self.user, self.lex, 'a', list)
+        self.assertEqual(word_search.call_count, 4)
+
+    @override_settings(WHITLEYCARDS_CURSOR_MAX_QUESTIONS=4)
+    @mock.patch('whitleyCards.search_cursor.word_search')
+    def test_large_search_not_kept(self, word_search):
+        word_search.return_value = searched(QUESTIONS)
+        search_questions(self.user, self.lex, 'abc', list)
+        search_questions(self.user, self.lex, 'abc', list)
+        self.assertEqual(word_search.call_count, 2)
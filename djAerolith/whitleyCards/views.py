@@ -8,9 +8,9 @@ from django.contrib.auth.decorators import login_required
 from django.urls import reverse
 
 from lib.response import response
-from lib.wdb_interface.wdb_helper import (word_search,
-                                          questions_from_alpha_dicts,
+from lib.wdb_interface.wdb_helper import (questions_from_alpha_dicts,
                                           questions_from_probability_range)
+from whitleyCards.search_cursor import search_questions
 from wordwalls.api import build_search_criteria
 from base.forms import LexiconForm, NamedListForm, SavedListForm
 from wordwalls.models import NamedList
@@ -140,21 +140,26 @@ def getQuizChunkByProb(lexicon, length, minP, maxP):
     return (wordData, newMinP, maxP)
 
 
-def getQuizChunkByQuestions(lexicon, questions, minIndex, is_q_obj=False):
-    maxIndexGet = len(questions) - 1
+def getQuizChunk(lexicon, chunk, minIndex, numQuestions):
+    """
+    Expand `chunk`, the questions of a list from minIndex on (up to
+    QUIZ_CHUNK_SIZE of them), for a list of numQuestions questions.
+
+    """
     newMinIndex = -1
-    if len(questions) > QUIZ_CHUNK_SIZE:
-        maxIndexGet = minIndex + QUIZ_CHUNK_SIZE - 1
+    if numQuestions > QUIZ_CHUNK_SIZE:
         newMinIndex = minIndex + QUIZ_CHUNK_SIZE
+    wordData = getWordDataFromQuestions(lexicon, chunk)
+    return (wordData, newMinIndex, numQuestions - 1)
 
-    if is_q_obj:
-        # The `questions` obj already contains the words, etc.
-        wordData = get_word_data(questions[minIndex:maxIndexGet+1])
-    else:
-        wordData = getWordDataFromQuestions(lexicon,
-                                            questions[minIndex:maxIndexGet+1])
+
+def getQuizChunkByQuestions(lexicon, questions, minIndex):
+    maxIndexGet = len(questions) - 1
+    if len(questions) > QUIZ_CHUNK_SIZE:
+        maxIndexGet = minIndex + QUIZ_CHUNK_SIZE - 1
     # will get minIndex to maxIndexGet inclusive
-    return (wordData, newMinIndex, len(questions) - 1)
+    return getQuizChunk(lexicon, questions[minIndex:maxIndexGet+1], minIndex,
+                        len(questions))
 
 
 @login_required
@@ -164,17 +169,18 @@ def search(request, lex_id, paramsb64):
     elif request.method == 'POST':
         action = request.POST['action']
         lex = Lexicon.objects.get(pk=lex_id)
-        search_params = build_search_criteria(
-            request.user, lex, search_criteria_from_b64(paramsb64))
-        questions = word_search(search_params, expand=True)
+        questions = search_questions(
+            request.user, lex, paramsb64,
+            lambda: build_search_criteria(
+                request.user, lex, search_criteria_from_b64(paramsb64)))
 
         if action == 'getInitialSet':
-            data = getQuizChunkByQuestions(lex, questions, 0, is_q_obj=True)
+            data = getQuizChunkByQuestions(lex, questions, 0)
             return response({
                 'data': data[0],
                 'nextMinP': data[1],
                 'nextMaxP': data[2],
-                'numAlphas': questions.size(),
+                'numAlphas': len(questions),
             })
 
         elif action == 'getNextSet':
@@ -186,16 +192,18 @@ def search(request, lex_id, paramsb64):
 
             maxP = int(request.POST['maxP'])
             logger.info("getting set %s, %s", minP, maxP)
-            data = getQuizChunkByQuestions(lex, questions, minP, is_q_obj=True)
+            # Only this chunk of the search is expanded.
+            data = getQuizChunkByQuestions(lex, questions, minP)
             return response({'data': data[0],
                              'nextMinP': data[1],
                              'nextMaxP': data[2]})
 
 
 def getQuizChunkFromNamedList(nlpk, minIndex):
-    nl = NamedList.objects.get(pk=nlpk)
-    questions = json.loads(nl.questions)
+    # Only read the part of the questions this chunk needs.
+    nl = NamedList.objects.defer('questions').get(pk=nlpk)
     if nl.isRange:
+        questions = json.loads(nl.questions)
         data = getQuizChunkByProb(nl.lexicon, nl.wordLength,
                                   questions[0] + minIndex,
                                   questions[1])
@@ -204,8 +212,8 @@ def getQuizChunkFromNamedList(nlpk, minIndex):
         else:
             return (data[0], -1, data[2])
     else:
-        data = getQuizChunkByQuestions(nl.lexicon, questions, minIndex)
-        return data
+        chunk = nl.questions_slice(minIndex, minIndex + QUIZ_CHUNK_SIZE)
+        return getQuizChunk(nl.lexicon, chunk, minIndex, nl.numQuestions)
 
 
 @login_required
@@ -235,17 +243,17 @@ def namedListPk(request, nlpk):
 
 
 def getQuizChunkFromSavedList(slpk, minIndex, option):
-    sl = WordList.objects.get(pk=slpk)
+    # Only read the parts of the lists this chunk needs.
+    sl = WordList.objects.defer(*WordList.QUESTION_FIELDS).get(pk=slpk)
+    maxIndex = minIndex + QUIZ_CHUNK_SIZE
     if option == SavedListForm.RESTART_LIST_CHOICE:
-        questions = json.loads(sl.origQuestions)
-        data = getQuizChunkByQuestions(sl.lexicon, questions, minIndex)
-        return data[0], data[1], data[2], sl.numAlphagrams
+        chunk = sl.orig_questions_slice(minIndex, maxIndex)
+        numQuestions = sl.numAlphagrams
     elif option == SavedListForm.FIRST_MISSED_CHOICE:
-        questionIndices = json.loads(sl.firstMissed)
-        origQuestions = json.loads(sl.origQuestions)
-        questions = [origQuestions[i] for i in questionIndices]
-        data = getQuizChunkByQuestions(sl.lexicon, questions, minIndex)
-        return data[0], data[1], data[2], sl.numFirstMissed
+        chunk = sl.orig_questions_at(sl.first_missed_slice(minIndex, maxIndex))
+        numQuestions = sl.numFirstMissed
+    data = getQuizChunk(sl.lexicon, chunk, minIndex, numQuestions)
+    return data[0], data[1], data[2], numQuestions
 
 
 @login_required
@@ -0,0 +1,113 @@
+"""
+Per-week difficulty statistics for the bingos in the daily 7s and 8s.
+
+Every qualifying player that finishes one of those challenges adds one
+"asked" to every alphagram in it, and one "missed" to every alphagram
+they didn't solve, in a single upsert. The week's toughies are then just
+the highest missed/asked ratios for the week, instead of being worked out
+from the missed bingos and leaderboard entries of each challenge.
+
+The rows are bucketed by toughies week (the date of the Week's Bingo
+Toughies challenge they count towards); sum the buckets for all-time
+numbers. The first week they were kept for is incomplete, so its
+toughies still come from the per-challenge counts.
+
+The per-challenge DailyChallengeMissedBingos counts are kept the same
+way, with one upsert for all the bingos a player missed.
+
+"""
+
+from django.db import connection
+
+from wordwalls.models import AlphagramStats, DailyChallengeMissedBingos
+
+STATS_TABLE = AlphagramStats._meta.db_table
+MISSED_BINGOS_TABLE = DailyChallengeMissedBingos._meta.db_table
+
+UPSERT_STATS = """
+INSERT INTO {table} AS s
+    (lexicon_id, alphagram_string, week, times_asked, times_missed, last_seen)
+VALUES {values}
+ON CONFLICT (lexicon_id, week, alphagram_string) DO UPDATE SET
+    times_asked = s.times_asked + EXCLUDED.times_asked,
+    times_missed = s.times_missed + EXCLUDED.times_missed,
+    last_seen = GREATEST(s.last_seen, EXCLUDED.last_seen)
+"""
+
+UPSERT_MISSED_BINGOS = """
+INSERT INTO {table} AS mb (challenge_id, alphagram_string, "numTimesMissed")
+VALUES {values}
+ON CONFLICT (alphagram_string, challenge_id) DO UPDATE SET
+    "numTimesMissed" = mb."numTimesMissed" + 1
+"""
+
+WEEKLY_TOUGHIES = """
+SELECT alphagram_string FROM {table}
+WHERE lexicon_id = %s AND week = %s AND CHAR_LENGTH(alphagram_string) = %s
+    AND times_asked > 0
+ORDER BY times_missed::float / times_asked DESC, alphagram_string
+LIMIT %s
+""".format(
+    table=STATS_TABLE
+)
+
+
+def record_challenge_result(dc, week, asked, missed):
+    """
+    Count one player's result on a daily challenge towards a toughies
+    `week`. `asked` and `missed` are sets of alphagram strings; `missed`
+    is a subset of `asked`.
+
+    """
+    if not asked:
+        return
+    params = []
+    # Sorted, so that concurrent upserts lock rows in the same order.
+    for alphagram in sorted(asked):
+        params.extend(
+            [
+                dc.lexicon_id,
+                alphagram,
+                week,
+                1,
+                1 if alphagram in missed else 0,
+                dc.date,
+            ]
+        )
+    values = ", ".join(["(%s, %s, %s, %s, %s, %s)"] * len(asked))
+    with connection.cursor() as cursor:
+        cursor.execute(UPSERT_STATS.format(table=STATS_TABLE, values=values), params)
+
+
+def record_missed_bingos(dc, missed):
+    """Count one more miss of each alphagram in `missed` on a challenge."""
+    if not missed:
+        return
+    params = []
+    for alphagram in sorted(missed):
+        params.extend([dc.pk, alphagram])
+    values = ", ".join(["(%s, %s, 1)"] * len(missed))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            UPSERT_MISSED_BINGOS.format(table=MISSED_BINGOS_TABLE, values=values),
+            params,
+        )
+
+
+def has_week_stats(lexicon, week):
+    """
+    Whether the stats cover the whole of a toughies week. They do only if
+    they were already being kept when the week began, i.e. there are
+    stats for an earlier week; the week they started in is missing the
+    results from before they started.
+
+    """
+    stats = AlphagramStats.objects.filter(lexicon=lexicon)
+    return stats.filter(week=week).exists() and stats.filter(week__lt=week).exists()
+
+
+def weekly_toughies(lexicon, length, week, num):
+    """The `num` most missed alphagrams of a length in a toughies week."""
+    with connection.cursor() as cursor:
+        cursor.execute(WEEKLY_TOUGHIES, [lexicon.pk, week, length, num])
+        return [row[0] for row in cursor.fetchall()]
@@ -3,9 +3,13 @@ from datetime import datetime
 import logging
 from typing import List
 
+from asgiref.sync import sync_to_async
 from django.contrib.auth.decorators import login_required
 from django.core.exceptions import ObjectDoesNotExist
-from django.views.decorators.http import require_GET, require_POST
+from django.db import transaction
+from django.http import HttpResponse
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import etag, require_GET, require_POST
 from django.utils import timezone
 
 from wordwalls.models import (
@@ -16,7 +20,10 @@ from wordwalls.models import (
 )
 from base.models import Lexicon, WordList
 from base.forms import SavedListForm
+from lib.async_views import async_login_required, async_require_POST
 from lib.response import response, bad_request
+from lib.wdb_interface.exceptions import WDBError
+from lib.wdb_interface.wdb_helper import aword_search
 from lib.wdb_interface.word_searches import (
     SearchDescription,
     MIN_MAX_DESCRIPTIONS,
@@ -30,6 +37,7 @@ from wordwalls.views import (
     get_leaderboard_data_for_dc_instance,
 )
 from wordwalls.challenges import toughies_challenge_date
+from wordwalls.meta_info import get_create_meta_info, meta_info_etag
 from wordwalls.game import WordwallsGame, GameInitException
 import rpc.wordsearcher.searcher_pb2 as pb
 
@@ -65,8 +73,19 @@ def api_challengers(request):
         ch_name = DailyChallengeName.objects.get(pk=ch_id)
     except (ObjectDoesNotExist, ValueError, TypeError):
         return bad_request("Bad lexicon or challenge.")
+    # Optional paging: `limit` entries after the first `offset`.
+    try:
+        offset = int(request.GET.get("offset", 0))
+        limit = request.GET.get("limit")
+        limit = int(limit) if limit is not None else None
+    except ValueError:
+        return bad_request("Bad offset or limit.")
+    if offset < 0 or (limit is not None and limit < 0):
+        return bad_request("Bad offset or limit.")
 
-    return response(get_leaderboard_data(lex, ch_name, ch_date, tiebreaker))
+    return response(
+        get_leaderboard_data(lex, ch_name, ch_date, tiebreaker, offset, limit)
+    )
 
 
 def api_challengers_by_tablenum(request):
@@ -83,6 +102,14 @@ def api_challengers_by_tablenum(request):
     return bad_request("No such daily challenge.")
 
 
+@require_GET
+@cache_control(no_cache=True)
+@etag(lambda request: meta_info_etag())
+def meta_info(request):
+    """The challenge names and lexica for creating tables."""
+    return response(get_create_meta_info())
+
+
 def api_answers(request):
     if request.method != "GET":
         return bad_request("Must use GET.")
@@ -173,61 +200,78 @@ def special_challenges(request):
     return response(resp)
 
 
+def parse_new_words_body(request):
+    """
+    Parse and check the body of a request that loads new words. Returns
+    the parsed request, or a bad request response.
+
+    """
+    try:
+        body = json.loads(request.body)
+    except (TypeError, ValueError):
+        return bad_request("Badly formatted body.")
+    # First verify that the user has access to this table.
+    if not access_to_table(body["tablenum"], request.user):
+        return bad_request("User is not in this table.")
+
+    parsed_req = {
+        # If tablenum is None, the utility functions in game.py know
+        # to create a new table, instead of using an existing table
+        # number.
+        "tablenum": body["tablenum"] if body["tablenum"] != 0 else None
+    }
+
+    lex_id = body.get("lexicon")
+    try:
+        lexicon = Lexicon.objects.get(pk=lex_id)
+    except Lexicon.DoesNotExist:
+        return bad_request("Bad lexicon.")
+    parsed_req["lexicon"] = lexicon
+    parsed_req["challenge"] = body.get("challenge")
+    parsed_req["dt"] = body.get("date")
+
+    if "desiredTime" in body:
+        quiz_time_secs = int(round(body["desiredTime"] * 60))
+        if quiz_time_secs < 1 or quiz_time_secs > 3600:
+            return bad_request("Desired time must be between 1 and 3600 seconds.")
+        parsed_req["quiz_time_secs"] = quiz_time_secs
+
+    parsed_req["questions_per_round"] = body.get("questionsPerRound", 50)
+    if (
+        parsed_req["questions_per_round"] > 200
+        or parsed_req["questions_per_round"] < 10
+    ):
+        return bad_request("Questions per round must be between 10 and 200.")
+    parsed_req["search_criteria"] = body.get("searchCriteria", [])
+    parsed_req["list_option"] = body.get("listOption")
+    parsed_req["selectedList"] = body.get("selectedList")
+    parsed_req["multiplayer"] = body.get("multiplayer", False)
+    parsed_req["raw_questions"] = body.get("rawQuestions", False)
+    return parsed_req
+
+
 def load_new_words(f):
     def wrap(request, *args, **kwargs):
         """A decorator for all the functions that load new words."""
-        try:
-            body = json.loads(request.body)
-        except (TypeError, ValueError):
-            return bad_request("Badly formatted body.")
-        # First verify that the user has access to this table.
-        if not access_to_table(body["tablenum"], request.user):
-            return bad_request("User is not in this table.")
-
-        parsed_req = {
-            # If tablenum is None, the utility functions in game.py know
-            # to create a new table, instead of using an existing table
-            # number.
-            "tablenum": body["tablenum"]
-            if body["tablenum"] != 0
-            else None
-        }
-
-        lex_id = body.get("lexicon")
-        try:
-            lexicon = Lexicon.objects.get(pk=lex_id)
-        except Lexicon.DoesNotExist:
-            return bad_request("Bad lexicon.")
-        parsed_req["lexicon"] = lexicon
-        parsed_req["challenge"] = body.get("challenge")
-        parsed_req["dt"] = body.get("date")
-
-        if "desiredTime" in body:
-            quiz_time_secs = int(round(body["desiredTime"] * 60))
-            if quiz_time_secs < 1 or quiz_time_secs > 3600:
-                return bad_request(
-                    "Desired time must be between 1 and 3600 " "seconds."
-                )
-            parsed_req["quiz_time_secs"] = quiz_time_secs
-
-        parsed_req["questions_per_round"] = body.get("questionsPerRound", 50)
-        if (
-            parsed_req["questions_per_round"] > 200
-            or parsed_req["questions_per_round"] < 10
-        ):
-            return bad_request(
-                "Questions per round must be between 10 and 200."
-            )
-        parsed_req["search_criteria"] = body.get("searchCriteria", [])
-        parsed_req["list_option"] = body.get("listOption")
-        parsed_req["selectedList"] = body.get("selectedList")
-        parsed_req["multiplayer"] = body.get("multiplayer", False)
-        parsed_req["raw_questions"] = body.get("rawQuestions", False)
+        parsed_req = parse_new_words_body(request)
+        if isinstance(parsed_req, HttpResponse):
+            return parsed_req
         return f(request, parsed_req, *args, **kwargs)
 
     return wrap
 
 
+def aload_new_words(f):
+    async def wrap(request, *args, **kwargs):
+        """load_new_words, for async views."""
+        parsed_req = await sync_to_async(parse_new_words_body)(request)
+        if isinstance(parsed_req, HttpResponse):
+            return parsed_req
+        return await f(request, parsed_req, *args, **kwargs)
+
+    return wrap
+
+
 def table_response(tablenum):
     game = WordwallsGame()
     addl_params = game.get_add_params(tablenum)
@@ -327,32 +371,44 @@ def build_search_criteria(
     return search
 
 
-@login_required
-@require_POST
-@load_new_words
-def new_search(request, parsed_req_body):
+@transaction.non_atomic_requests
+@async_login_required
+@async_require_POST
+@aload_new_words
+async def new_search(request, parsed_req_body):
     """
-    Load a new search into this table.
+    Load a new search into this table. The search itself runs without
+    holding a thread.
 
     """
     try:
-        search = build_search_criteria(
+        search = await sync_to_async(build_search_criteria)(
             request.user,
             parsed_req_body["lexicon"],
             parsed_req_body["search_criteria"],
         )
-
-        tablenum = WordwallsGame().initialize_by_search_params(
-            request.user,
-            search,
-            parsed_req_body["quiz_time_secs"],
-            parsed_req_body["questions_per_round"],
-            use_table=parsed_req_body["tablenum"],
-            multiplayer=parsed_req_body["multiplayer"],
+        try:
+            questions = await aword_search(search)
+        except WDBError as e:
+            raise GameInitException(e)
+        return await sync_to_async(_load_search)(
+            request.user, search, questions, parsed_req_body
         )
     except GameInitException as e:
         return bad_request(str(e))
 
+
+@transaction.atomic
+def _load_search(user, search, questions, parsed_req_body):
+    tablenum = WordwallsGame().initialize_by_search_params(
+        user,
+        search,
+        parsed_req_body["quiz_time_secs"],
+        parsed_req_body["questions_per_round"],
+        use_table=parsed_req_body["tablenum"],
+        multiplayer=parsed_req_body["multiplayer"],
+        questions=questions,
+    )
     return table_response(tablenum)
 
 
@@ -31,6 +31,7 @@ from wordwalls.api import (
     load_aerolith_list,
     load_saved_list,
     load_raw_questions,
+    meta_info,
 )
 
 urlpatterns = [
@@ -46,6 +47,7 @@ urlpatterns = [
     re_path(r"^load_aerolith_list/$", load_aerolith_list),
     re_path(r"^load_saved_list/$", load_saved_list),
     re_path(r"^load_raw_questions/$", load_raw_questions),
+    re_path(r"^meta_info/$", meta_info),
     # re_path(r'^getNewSignature/$', 'wordwalls.views.get_new_signature',
     # name='get_new_signature')
 ]
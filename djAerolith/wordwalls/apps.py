@@ -3,3 +3,10 @@ from django.apps import AppConfig
 
 class WordwallsAppConfig(AppConfig):
     name = 'wordwalls'
+
+    def ready(self):
+        # Connect the signals that invalidate the meta info, leaderboard
+        # and challenge caches.
+        import wordwalls.challenge_cache  # noqa
+        import wordwalls.leaderboards  # noqa
+        import wordwalls.meta_info  # noqa
@@ -0,0 +1,116 @@
+"""
+An in-process cache of daily challenges with their questions already
+parsed.
+
+Every player of a challenge gets the same questions, so each process
+parses a challenge's `alphagrams` once and hands out shuffled copies of
+the list; the Question objects themselves are shared and must not be
+modified. The least recently used challenges are dropped past
+WORDWALLS_CHALLENGE_CACHE_SIZE, and a challenge is read from the database
+again after WORDWALLS_CHALLENGE_CACHE_SECS, so that edits made in another
+process (to a special challenge, say) are picked up. Edits in this
+process drop it right away. A newly created challenge is only cached
+once the transaction that created it commits.
+
+"""
+
+import threading
+from collections import namedtuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from lib.domain import Questions
+from lib.lru import LRUCache
+from wordwalls.models import DailyChallenge
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "size"])
+
+_challenges = None
+_challenges_lock = threading.Lock()
+
+
+def get_challenges():
+    global _challenges
+    if _challenges is None:
+        with _challenges_lock:
+            if _challenges is None:
+                _challenges = LRUCache(
+                    settings.WORDWALLS_CHALLENGE_CACHE_SIZE,
+                    ttl=settings.WORDWALLS_CHALLENGE_CACHE_SECS,
+                )
+    return _challenges
+
+
+def _key(ch_date, lexicon_id, name_id):
+    return (ch_date, lexicon_id, name_id)
+
+
+def _parse(dc):
+    questions = Questions()
+    questions.set_from_json(dc.alphagrams)
+    return questions
+
+
+def _store(dc, questions):
+    get_challenges().set(_key(dc.date, dc.lexicon_id, dc.name_id), (dc, questions))
+
+
+def get_challenge(ch_date, ch_lex, ch_name):
+    """
+    Return (questions, secs, dc) for the challenge with this date, lexicon
+    and name; `questions` is a shuffled copy. Raises
+    DailyChallenge.DoesNotExist if there's no such challenge.
+
+    """
+    found = get_challenges().get(_key(ch_date, ch_lex.pk, ch_name.pk))
+    if found is None:
+        dc = DailyChallenge.objects.select_related("name").get(
+            date=ch_date, lexicon=ch_lex, name=ch_name
+        )
+        questions = _parse(dc)
+        _store(dc, questions)
+    else:
+        dc, questions = found
+    qs = questions.copy()
+    qs.shuffle()
+    return qs, dc.seconds, dc
+
+
+def challenge_questions(dc):
+    """
+    Like get_challenge, for a challenge that was just saved. It goes into
+    the cache once the transaction that saved it commits, so a rolled back
+    challenge is never handed out.
+
+    """
+    questions = _parse(dc)
+    transaction.on_commit(lambda: _store(dc, questions))
+    qs = questions.copy()
+    qs.shuffle()
+    return qs, dc.seconds, dc
+
+
+def cache_info():
+    stats = get_challenges().stats()
+    return CacheInfo(stats["hits"], stats["misses"], stats["size"])
+
+
+def clear():
+    """Drop the cache and its counters. The next use makes a new one."""
+    global _challenges
+    with _challenges_lock:
+        _challenges = None
+
+
+def _challenge_changed(sender, instance, **kwargs):
+    get_challenges().delete(_key(instance.date, instance.lexicon_id, instance.name_id))
+
+
+post_save.connect(
+    _challenge_changed, DailyChallenge, dispatch_uid="challenge_cache_save"
+)
+post_delete.connect(
+    _challenge_changed, DailyChallenge, dispatch_uid="challenge_cache_delete"
+)
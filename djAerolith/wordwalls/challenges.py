@@ -8,6 +8,9 @@ import random
 import re
 import logging
 
+from django.db import connection
+
+from wordwalls.alphagram_stats import has_week_stats, weekly_toughies
 from wordwalls.models import (
     DailyChallengeName,
     DailyChallenge,
@@ -25,6 +28,7 @@ from lib.wdb_interface.wdb_helper import (
     questions_from_probability_list,
     questions_from_alphagrams,
     word_search,
+    word_searches,
 )
 from lib.wdb_interface.word_searches import SearchDescription
 
@@ -103,13 +107,22 @@ def generate_dc_questions(challenge_name, lex, challenge_date):
         questions.shuffle()
         return questions, challenge_name.timeSecs
     elif challenge_name.name == DailyChallengeName.BINGO_MARATHON:
-        questions = Questions()
+        searches = []
         for lgt in (7, 8):
             min_p = 1
             max_p = json.loads(lex.lengthCounts)[str(lgt)]
             r = list(range(min_p, max_p + 1))
             random.shuffle(r)
-            questions.extend(questions_from_probability_list(lex, r[:50], lgt))
+            searches.append(
+                [
+                    SearchDescription.lexicon(lex),
+                    SearchDescription.length(lgt, lgt),
+                    SearchDescription.probability_list(r[:50]),
+                ]
+            )
+        questions = Questions()
+        for qs in word_searches(searches):
+            questions.extend(qs)
         return questions, challenge_name.timeSecs
     # elif challenge_name.name in (DailyChallengeName.COMMON_SHORT,
     #                              DailyChallengeName.COMMON_LONG):
@@ -133,6 +146,32 @@ def generate_dc_questions(challenge_name, lex, challenge_date):
     return None
 
 
+def new_daily_challenge(challenge_name, lex, challenge_date):
+    """
+    Generate a daily challenge. Returns it unsaved, or None if it can't
+    be generated (yet).
+
+    """
+    ret = generate_dc_questions(challenge_name, lex, challenge_date)
+    if not ret:
+        return None
+    qs, secs = ret
+    if qs.size() == 0:
+        logger.info("Empty questions.")
+        return None
+    ch_category = DailyChallenge.CATEGORY_ANAGRAM
+    if qs.build_mode:
+        ch_category = DailyChallenge.CATEGORY_BUILD
+    return DailyChallenge(
+        date=challenge_date,
+        lexicon=lex,
+        name=challenge_name,
+        seconds=secs,
+        alphagrams=qs.to_json(),
+        category=ch_category,
+    )
+
+
 # def generate_common_words_challenge(ch_name):
 #     """Generate the common words challenges. Only for OWL2 right now."""
 #     if ch_name == DailyChallengeName.COMMON_SHORT:
@@ -209,62 +248,54 @@ def generate_word_builder_challenge(lex, lmin, lmax):
     return q_struct
 
 
-# XXX: This appears to be an expensive function; about 0.75 secs on my
-# machine!
+TOUGHIES_QUERY = """
+WITH challenges AS (
+    SELECT dc.id,
+        CASE WHEN lb.id IS NULL THEN 1000000
+        ELSE (
+            SELECT COUNT(*) FROM {entry_table} lbe
+            WHERE lbe.board_id = lb.id AND lbe."qualifyForAward"
+        ) END AS num_solved
+    FROM {challenge_table} dc
+    LEFT JOIN {board_table} lb ON lb.challenge_id = dc.id
+    WHERE dc.lexicon_id = %s AND dc.name_id = %s AND dc.date BETWEEN %s AND %s
+)
+SELECT mb.alphagram_string,
+    MAX(mb."numTimesMissed"::float / c.num_solved) AS miss_rate
+FROM {missed_table} mb
+JOIN challenges c ON c.id = mb.challenge_id
+WHERE c.num_solved > 0
+GROUP BY mb.alphagram_string
+ORDER BY miss_rate DESC, mb.alphagram_string
+LIMIT %s
+""".format(
+    entry_table=DailyChallengeLeaderboardEntry._meta.db_table,
+    challenge_table=DailyChallenge._meta.db_table,
+    board_table=DailyChallengeLeaderboard._meta.db_table,
+    missed_table=DailyChallengeMissedBingos._meta.db_table,
+)
+
+
 def gen_toughies_by_challenge(challenge_name, num, min_date, max_date, lex):
     """
     Generate a list of toughies given a challenge name. We only store info
     about 7s and 8s now so it would only give us those...
 
+    An alphagram's difficulty is the highest fraction of the (qualifying)
+    players that missed it in any one of the challenges, and the `num`
+    most difficult are returned, most difficult first. This is all done
+    in one query; see benchmark_toughies for the equivalent Python.
+
     Returns:
         A list of string alphagrams.
     """
-    # Find all challenges matching these parameters
-    challenges = (
-        DailyChallenge.objects.filter(lexicon=lex)
-        .filter(date__range=(min_date, max_date))
-        .filter(name=challenge_name)
-    )
-    # And the missed bingos...
-    # XXX: Rewrite as a raw SQL query.
-    mbs = DailyChallengeMissedBingos.objects.filter(
-        challenge__in=list(challenges)
-    )
-    num_solved = {}
-    logger.debug("Got all relevant challenges and bingos...")
-    # How many people did each challenge? Store this to avoid looking it
-    # up.
-    for dc in challenges:
-        try:
-            lb = DailyChallengeLeaderboard.objects.get(challenge=dc)
-            entries = DailyChallengeLeaderboardEntry.objects.filter(
-                board=lb, qualifyForAward=True
-            )
-            num_solved[dc] = len(entries)
-        except DailyChallengeLeaderboard.DoesNotExist:
-            # This should not happen.
-            num_solved[dc] = 1e6
-    logger.debug("Created num_solved dictionary...")
-    mb_dict = {}
-    # Now sort by percentage missed.
-    for b in mbs:
-        try:
-            perc_correct = float(b.numTimesMissed) / num_solved[b.challenge]
-        except ZeroDivisionError:
-            continue
-        alphagram = b.alphagram_string
-        if alphagram in mb_dict:
-            if perc_correct > mb_dict[alphagram][1]:
-                mb_dict[alphagram] = alphagram, perc_correct
-        else:
-            mb_dict[alphagram] = alphagram, perc_correct
-    # Sort by difficulty in reverse order (most difficult first)
-    alphs = sorted(list(mb_dict.items()), key=lambda x: x[1][1], reverse=True)[
-        :num
-    ]
-    logger.debug("Sorted by difficulty, returning... %s", alphs)
-    # And just return the alphagram portion.
-    return [a[0] for a in alphs]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            TOUGHIES_QUERY, [lex.pk, challenge_name.pk, min_date, max_date, num]
+        )
+        rows = cursor.fetchall()
+    logger.debug("Sorted by difficulty, returning... %s", rows)
+    return [row[0] for row in rows]
 
 
 def generate_toughies_challenge(lexicon, requested_date):
@@ -281,6 +312,12 @@ def generate_toughies_challenge(lexicon, requested_date):
         min_date,
         max_date,
     )
+    if has_week_stats(lexicon, challenge_date):
+        alphagrams = weekly_toughies(lexicon, 7, challenge_date, 25)
+        alphagrams.extend(weekly_toughies(lexicon, 8, challenge_date, 25))
+        logger.debug("Generated from weekly stats! %s", alphagrams)
+        return alphagrams
+    # Weeks from before the stats were kept, or the week they started.
     alphagrams = gen_toughies_by_challenge(
         DailyChallengeName.objects.get(name="Today's 7s"),
         25,
@@ -352,3 +389,12 @@ def toughies_challenge_date(req_date):
         diff = 7 - abs(diff)
     challenge_date = req_date - timedelta(days=diff)
     return challenge_date
+
+
+def toughies_week(dc_date):
+    """
+    The date of the toughies challenge that a daily challenge on `dc_date`
+    counts towards; i.e. the next one after it.
+
+    """
+    return toughies_challenge_date(dc_date) + timedelta(days=7)
@@ -16,16 +16,16 @@
 
 # To contact the author, please email delsolar at gmail dot com
 
+import contextlib
 import json
 import datetime
-import copy
 import logging
 import re
 import time
 from typing import List
 
 from django.conf import settings
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
 from django.utils.translation import gettext as _
 from django.utils import timezone
 import waffle
@@ -41,14 +41,30 @@ from lib.wdb_interface.wdb_helper import (
 )
 from lib.wdb_interface.word_searches import temporary_list_name
 import rpc.wordsearcher.searcher_pb2 as pb
-from wordwalls.challenges import generate_dc_questions, toughies_challenge_date
+from wordwalls.alphagram_stats import record_challenge_result, record_missed_bingos
+from wordwalls.challenge_cache import challenge_questions, get_challenge
+from wordwalls.challenges import (
+    new_daily_challenge,
+    toughies_challenge_date,
+    toughies_week,
+)
+from wordwalls.leaderboards import add_entry
+from wordwalls.round_prefetch import start_prefetch, take_prefetched
+from wordwalls.round_state import (
+    answer_index,
+    missed_question_indices,
+    new_round_state,
+    num_unsolved,
+    unsolved_answers,
+    upgrade_state,
+)
+from wordwalls.table_state import get_table_state_store
 from base.models import WordList
 from tablegame.models import GenericTableGameModel
 from wordwalls.models import (
     DailyChallenge,
     DailyChallengeLeaderboard,
     DailyChallengeLeaderboardEntry,
-    DailyChallengeMissedBingos,
     DailyChallengeName,
     WordwallsGameModel,
 )
@@ -61,11 +77,19 @@ class GameInitException(Exception):
 
 
 class WordwallsGame(object):
+    def __init__(self, table_state=None):
+        """
+        table_state - A table state store (see wordwalls/table_state.py).
+            Defaults to the process-wide store.
+
+        """
+        self.table_state = table_state or get_table_state_store()
+
     def _initial_state(self):
         """Return an initial state object, for a brand new game."""
         return {
-            "answerHash": {},
-            "originalAnswerHash": {},
+            "questions": [],
+            "questionIndices": [],
             "questionsToPull": settings.WORDWALLS_QUESTIONS_PER_ROUND,
             "quizGoing": False,
             "quizStartTime": 0,
@@ -123,32 +147,42 @@ class WordwallsGame(object):
             )
 
         old_word_list = None
+        # Loading a list into an existing table holds the table's lock, so a
+        # guess still in flight for the old round can't write its state back
+        # over the new list after the release.
         if use_table is None:
-            wgm = new_wgm()
+            table_lock = contextlib.nullcontext()
         else:
-            wgm = self.get_wgm(tablenum=use_table, lock=True)
-            old_word_list = wgm.word_list
-            if multiplayer and wgm.host != host:
-                # It's a multiplayer game, but we are not the host and thus
-                # cannot load a new list into this table.
-                wgm = new_wgm()
-            elif not multiplayer and wgm.is_multiplayer():
-                # Game used to be a multiplayer game, and now we want to
-                # make it a single player game. Instead of kicking everyone
-                # out, create a new table.
+            table_lock = self.table_state.lock(use_table)
+        with table_lock:
+            if use_table is None:
                 wgm = new_wgm()
             else:
-                wgm.currentGameState = json.dumps(state)
-                wgm.lexicon = lex
-                wgm.word_list = word_list
-                if "challenge" in state.get("gameType"):
-                    # Do not allow multiplayer!
-                    if multiplayer:
-                        raise GameInitException(
-                            "Cannot do a daily challenge in multiplayer mode."
-                        )
-                wgm.playerType = player_type
-        wgm.save()
+                wgm = self.get_wgm(tablenum=use_table, lock=True)
+                old_word_list = wgm.word_list
+                if multiplayer and wgm.host != host:
+                    # It's a multiplayer game, but we are not the host and thus
+                    # cannot load a new list into this table.
+                    wgm = new_wgm()
+                elif not multiplayer and wgm.is_multiplayer():
+                    # Game used to be a multiplayer game, and now we want to
+                    # make it a single player game. Instead of kicking everyone
+                    # out, create a new table.
+                    wgm = new_wgm()
+                else:
+                    wgm.currentGameState = json.dumps(state)
+                    wgm.lexicon = lex
+                    wgm.word_list = word_list
+                    if "challenge" in state.get("gameType"):
+                        # Do not allow multiplayer!
+                        if multiplayer:
+                            raise GameInitException(
+                                "Cannot do a daily challenge in multiplayer mode."
+                            )
+                    wgm.playerType = player_type
+            wgm.save()
+            self.table_state.release(wgm.pk)
+        self.prefetch_next_round(word_list, state["questionsToPull"])
         if old_word_list and old_word_list.is_temporary:
             # This word list is old. Check to make sure it's in no tables.
             if WordwallsGameModel.objects.filter(word_list=old_word_list).count() == 0:
@@ -189,12 +223,7 @@ class WordwallsGame(object):
         Gets a challenge with date, lex, name.
 
         """
-        dc = DailyChallenge.objects.get(date=ch_date, lexicon=ch_lex, name=ch_name)
-        qs = Questions()
-        qs.set_from_json(dc.alphagrams)
-        qs.shuffle()
-        secs = dc.seconds
-        return qs, secs, dc
+        return get_challenge(ch_date, ch_lex, ch_name)
 
     def initialize_daily_challenge(
         self, user, ch_lex, ch_name, ch_date, use_table=None
@@ -263,39 +292,26 @@ class WordwallsGame(object):
     def get_or_create_dc(self, ch_date, ch_lex, ch_name):
         """
         Get, or create, a daily challenge with the given parameters.
+        Challenges are normally made ahead of time by the
+        pregenerate_challenges command; creating one here is the fallback.
 
         """
         try:
-            qs, secs, dc = self.get_dc(ch_date, ch_lex, ch_name)
+            return self.get_dc(ch_date, ch_lex, ch_name)
         except DailyChallenge.DoesNotExist:
-            ret = generate_dc_questions(ch_name, ch_lex, ch_date)
-            if not ret:
-                return None
-
-            qs, secs = ret
-            if qs.size() == 0:
-                logger.info("Empty questions.")
-                return None
-            ch_category = DailyChallenge.CATEGORY_ANAGRAM
-            if qs.build_mode:
-                ch_category = DailyChallenge.CATEGORY_BUILD
-            dc = DailyChallenge(
-                date=ch_date,
-                lexicon=ch_lex,
-                name=ch_name,
-                seconds=secs,
-                alphagrams=qs.to_json(),
-                category=ch_category,
-            )
-            try:
+            pass
+        dc = new_daily_challenge(ch_name, ch_lex, ch_date)
+        if dc is None:
+            return None
+        try:
+            with transaction.atomic():
                 dc.save()
-            except IntegrityError:
-                logger.exception("Caught integrity error")
-                # This happens rarely if the DC gets generated twice
-                # in very close proximity.
-                qs, secs, dc = self.get_dc(ch_date, ch_lex, ch_name)
-
-        return qs, secs, dc
+        except IntegrityError:
+            logger.exception("Caught integrity error")
+            # This happens rarely if the DC gets generated twice
+            # in very close proximity.
+            return self.get_dc(ch_date, ch_lex, ch_name)
+        return challenge_questions(dc)
 
     def initialize_by_search_params(
         self,
@@ -305,7 +321,13 @@ class WordwallsGame(object):
         questions_per_round=None,
         use_table=None,
         multiplayer=None,
+        questions=None,
     ):
+        """
+        Start a table on the results of a search. Pass `questions` if the
+        search has been run already (see wordwalls.api.new_search).
+
+        """
         try:
             lexicon = Lexicon.objects.get(
                 lexiconName=search_description[0].stringvalue.value
@@ -313,10 +335,11 @@ class WordwallsGame(object):
         except Lexicon.DoesNotExist:
             raise GameInitException("Search description not properly initialized")
 
-        try:
-            questions = word_search(search_description)
-        except WDBError as e:
-            raise GameInitException(e)
+        if questions is None:
+            try:
+                questions = word_search(search_description)
+            except WDBError as e:
+                raise GameInitException(e)
 
         category = WordList.CATEGORY_ANAGRAM
         for sd in search_description:
@@ -374,7 +397,7 @@ class WordwallsGame(object):
         use_table=None,
         multiplayer=None,
     ):
-        qs = json.loads(named_list.questions)
+        qs = named_list.get_questions()
         if named_list.isRange:
             questions = questions_from_probability_range(
                 lex, qs[0], qs[1], named_list.wordLength
@@ -508,7 +531,7 @@ class WordwallsGame(object):
                 )
 
         start_message = ""
-        word_list = wgm.word_list
+        word_list = self.get_word_list(wgm)
 
         if not word_list:
             return self.create_error_message(
@@ -518,6 +541,15 @@ class WordwallsGame(object):
                 )
             )
 
+        if (
+            not word_list.is_packed()
+            and word_list.numAlphagrams >= settings.WORD_LIST_PACK_THRESHOLD
+        ):
+            # A big list from before we packed lists. Convert it once, so
+            # that later rounds don't have to decode all of it.
+            logger.info("Packing word list %s", word_list.pk)
+            word_list.pack()
+
         if word_list.questionIndex > word_list.numCurAlphagrams - 1:
             start_message += _("Now quizzing on missed list.") + "\r\n"
             word_list.set_to_missed()
@@ -530,10 +562,9 @@ class WordwallsGame(object):
                 _("The quiz is done. Please load a new word list!")
             )
 
-        cur_questions_obj = json.loads(word_list.curQuestions)
         idx = word_list.questionIndex
         num_qs_per_round = state["questionsToPull"]
-        qs = cur_questions_obj[idx : (idx + num_qs_per_round)]
+        qs = word_list.cur_questions_slice(idx, idx + num_qs_per_round)
 
         start_message += _(
             "These are questions %(qbegin)s through %(qend)s of " "%(qtotal)s."
@@ -547,21 +578,30 @@ class WordwallsGame(object):
         qs_set = set(qs)
         if len(qs_set) != len(qs):
             logger.error("Question set is not unique!!")
-        orig_questions = json.loads(word_list.origQuestions)
-        questions, answer_hash = self.load_questions(qs, orig_questions, word_list)
+        questions = take_prefetched(word_list.pk, idx, qs)
+        if questions is None:
+            questions = self.load_questions(
+                qs,
+                word_list.orig_questions_at(qs),
+                word_list.lexicon,
+                word_list.category,
+            )
 
         state["quizGoing"] = True  # start quiz
         state["quizStartTime"] = time.time()
-        state["answerHash"] = answer_hash
-        state["originalAnswerHash"] = copy.deepcopy(answer_hash)
-        state["numAnswersThisRound"] = len(answer_hash)
-        state["questions"] = [
-            {"a": q["a"], "ws": [w["w"] for w in q["ws"]]} for q in questions
-        ]
+        state.pop("answerHash", None)
+        state.pop("originalAnswerHash", None)
+        state.update(
+            new_round_state(
+                [{"a": q["a"], "ws": [w["w"] for w in q["ws"]]} for q in questions],
+                [q["idx"] for q in questions],
+            )
+        )
 
         wgm.currentGameState = json.dumps(state)
 
         wgm.save()
+        self.table_state.hold(wgm.pk, state)
 
         # XXX: Autosave doesn't really do anything for saved lists. It
         # always saves, regardless! Oh well...
@@ -580,36 +620,63 @@ class WordwallsGame(object):
 
         return ret
 
-    def load_questions(self, qs, orig_questions, word_list):
+    def prefetch_next_round(self, word_list, num_questions):
+        """
+        Start expanding the questions of the round that start_quiz will
+        start next for this word list, in the background (see
+        round_prefetch.py).
+
+        """
+        if not settings.WORDWALLS_PREFETCH:
+            return None
+        idx = word_list.questionIndex
+        if idx > word_list.numCurAlphagrams - 1:
+            # start_quiz will move on to the missed list.
+            idx = 0
+            qs = word_list.get_missed()[:num_questions]
+        else:
+            qs = word_list.cur_questions_slice(idx, idx + num_questions)
+        if not qs:
+            return None
+        return start_prefetch(
+            word_list.pk,
+            idx,
+            qs,
+            self.load_questions,
+            qs,
+            word_list.orig_questions_at(qs),
+            word_list.lexicon,
+            word_list.category,
+        )
+
+    def load_questions(self, qs, orig_questions, lexicon, category):
         """
         Turn the qs array into an array of full question objects, ready
-        for the front-end.
+        for the front-end. Doesn't use the database, so that it can run
+        in the background (see prefetch_next_round).
 
         Params:
-            - qs: An array of indices into oriq_questions
-            - orig_questions: An array of questions, looking like
+            - qs: An array of indices into the word list's origQuestions
+            - orig_questions: The questions at those indices, looking like
                 [{'q': ..., 'a': [...]}, ...]
+            - lexicon: The word list's lexicon
+            - category: The word list's category
 
         Returns:
-            - A tuple (questions, answer_hash)
-                questions: [{'a': alphagram, 'ws': words, ...}, {..}, ..]
-                answer_hash: {'word': (alphagram, idx), ...}
+            - questions: [{'a': alphagram, 'ws': words, 'idx': idx, ...}, ..]
 
         """
         alphagrams_to_fetch = []
         index_map = {}
-        for i in qs:
-            alphagrams_to_fetch.append(orig_questions[i])
-            index_map[orig_questions[i]["q"]] = i
+        for i, question in zip(qs, orig_questions):
+            alphagrams_to_fetch.append(question)
+            index_map[question["q"]] = i
 
-        if word_list.category != WordList.CATEGORY_TYPING:
-            questions = questions_from_alpha_dicts(
-                word_list.lexicon, alphagrams_to_fetch
-            )
+        if category != WordList.CATEGORY_TYPING:
+            questions = questions_from_alpha_dicts(lexicon, alphagrams_to_fetch)
         else:
             questions = Questions()
             questions.set_from_list(alphagrams_to_fetch)
-        answer_hash = {}
         ret_q_array = []
         for q in questions.questions_array():
             words = []
@@ -632,7 +699,6 @@ class WordwallsGame(object):
                         "ibh": w.inner_back_hook,
                     }
                 )
-                answer_hash[w.word] = alphagram_str, i
             ret_q_array.append(
                 {
                     "a": alphagram_str,
@@ -641,7 +707,7 @@ class WordwallsGame(object):
                     "idx": i,
                 }
             )
-        return ret_q_array, answer_hash
+        return ret_q_array
 
     def did_timer_run_out(self, state):
         # internal function; not meant to be called by the outside
@@ -662,25 +728,65 @@ class WordwallsGame(object):
             return None
         return wgm
 
+    def get_word_list(self, wgm):
+        """
+        Get the table's word list, without loading its question columns.
+        For packed lists, the accessors then only read the parts of them
+        that they need from the database.
+
+        """
+        if wgm.word_list_id is None:
+            return None
+        try:
+            return WordList.objects.defer(*WordList.QUESTION_FIELDS).get(
+                pk=wgm.word_list_id
+            )
+        except WordList.DoesNotExist:
+            return None
+
+    def live_state(self, wgm):
+        """
+        Get the state for this table. If a round is going, the table
+        state store may have a newer copy than the database.
+
+        """
+        state = self.table_state.get(wgm.pk)
+        if state is None:
+            state = json.loads(wgm.currentGameState)
+        return upgrade_state(state)
+
+    def persist_state(self, wgm, state):
+        """
+        Write the state back to the database. Only call this at round
+        boundaries; during a round, the table state store takes writes.
+
+        """
+        wgm.currentGameState = json.dumps(state)
+        wgm.save()
+        self.table_state.release(wgm.pk)
+
     def check_game_ended(self, tablenum):
         # Called when javascript tells the server that time ran out on
         # its end.
         # XXX: This function could be called multiple times from different
         # clients. The lock in get_wgm should do the right thing here,
         # but we should figure out how to test this.
+        with self.table_state.lock(tablenum):
+            return self._check_game_ended(tablenum)
+
+    def _check_game_ended(self, tablenum):
         wgm = self.get_wgm(tablenum)
         if not wgm:
             return _("Table does not exist.")
 
-        state = json.loads(wgm.currentGameState)
+        state = self.live_state(wgm)
         timer_ran_out = self.did_timer_run_out(state)
         quiz_going = state["quizGoing"]
 
         def end_game():
             state["timeRemaining"] = 0
             self.do_quiz_end_actions(state, tablenum, wgm)
-            wgm.currentGameState = json.dumps(state)
-            wgm.save()
+            self.persist_state(wgm, state)
 
         if timer_ran_out and quiz_going:
             # the game is over! mark it so.
@@ -729,16 +835,19 @@ class WordwallsGame(object):
         ).format(user=user, host=wgm.host)
 
     def give_up(self, user, tablenum):
+        with self.table_state.lock(tablenum):
+            return self._give_up(user, tablenum)
+
+    def _give_up(self, user, tablenum):
         wgm = self.get_wgm(tablenum)
         if not wgm:
             return False
         allowed = self.allow_give_up(wgm, user)
         if allowed is True:
-            state = json.loads(wgm.currentGameState)
+            state = self.live_state(wgm)
             state["timeRemaining"] = 0
             self.do_quiz_end_actions(state, tablenum, wgm)
-            wgm.currentGameState = json.dumps(state)
-            wgm.save()
+            self.persist_state(wgm, state)
             return True
         # Otherwise, return the reason we can't give up.
         return allowed
@@ -881,14 +990,11 @@ class WordwallsGame(object):
         state["quizGoing"] = False
         state["justCreatedFirstMissed"] = False
         # copy missed alphagrams to state['missed']
-        missed_indices = set()
-        for w in state["answerHash"]:
-            missed_indices.add(state["answerHash"][w][1])
-            # [0] is the alphagram, [1] is the index in origQuestions
-        missed = json.loads(wgm.word_list.missed)
+        missed_indices = missed_question_indices(state)
+        word_list = self.get_word_list(wgm)
+        missed = word_list.get_missed()
         missed.extend(missed_indices)
-        word_list = wgm.word_list
-        word_list.missed = json.dumps(missed)
+        word_list.set_missed(missed)
         word_list.numMissed = len(missed)
 
         # check if the list is unique
@@ -920,6 +1026,7 @@ class WordwallsGame(object):
             word_list.save()
         except Exception:
             logger.exception("Error saving.")
+        self.prefetch_next_round(word_list, state["questionsToPull"])
 
     def create_challenge_leaderboard_entry(self, state, tablenum):
         """
@@ -951,7 +1058,7 @@ class WordwallsGame(object):
             return
 
         except DailyChallengeLeaderboardEntry.DoesNotExist:
-            score = state["numAnswersThisRound"] - len(state["answerHash"])
+            score = state["numAnswersThisRound"] - num_unsolved(state)
             if "timeRemaining" in state:
                 timeRemaining = int(round(state["timeRemaining"]))
                 # If there was time remaining, it would get written into the
@@ -970,50 +1077,19 @@ class WordwallsGame(object):
                 qualifyForAward=qualify_for_award,
             )
             # XXX: 500 here, integrity error, much more common than lb.save
-            lbe.save()
-            if len(state["answerHash"]) > 0 and dc.name.name in (
-                "Today's 7s",
-                "Today's 8s",
-            ):
-                # if the user missed some 7s or 8s
-                self.add_dc_missed_bingos(state, dc, wgm)
-
-    def add_dc_missed_bingo(self, challenge, alphagram):
-        """
-        Adds a Daily Challenge Missed Bingo in a thread-safe manner.
-        """
-        try:
-            dcmb = DailyChallengeMissedBingos.objects.select_for_update().get(
-                challenge=challenge, alphagram_string=alphagram
-            )
-            dcmb.numTimesMissed += 1
-        except DailyChallengeMissedBingos.DoesNotExist:
-            dcmb = DailyChallengeMissedBingos(
-                challenge=challenge, alphagram_string=alphagram
-            )
-            dcmb.numTimesMissed = 1
-        try:
-            dcmb.save()
-        except IntegrityError:
-            logger.exception("Caught MissedBingos IntegrityError")
-            # It means another thread created it (in the except above).
-            # We should start over, but now that we know the object exists,
-            # we can use select_for_update without fear.
-            dcmb = DailyChallengeMissedBingos.objects.select_for_update().get(
-                challenge=challenge, alphagram_string=alphagram
-            )
-            dcmb.numTimesMissed += 1
-            dcmb.save()
-
-    def add_dc_missed_bingos(self, state, dc, wgm):
-        orig_qs_obj = json.loads(wgm.word_list.origQuestions)
-        missed_alphas = set()
-        for missed in state["answerHash"]:
-            question, idx = state["answerHash"][missed]
-            question = orig_qs_obj[idx]
-            missed_alphas.add(question["q"])
-        for alpha in missed_alphas:
-            self.add_dc_missed_bingo(dc, alpha)
+            add_entry(lbe)
+            if dc.name.name not in ("Today's 7s", "Today's 8s"):
+                return
+            missed = {a for _, a, _ in unsolved_answers(state)}
+            if qualify_for_award:
+                record_challenge_result(
+                    dc,
+                    toughies_week(dc.date),
+                    {q["a"] for q in state["questions"]},
+                    missed,
+                )
+            # if the user missed some 7s or 8s
+            record_missed_bingos(dc, missed)
 
     def mark_missed(self, question_index, tablenum, user):
         try:
@@ -1023,23 +1099,25 @@ class WordwallsGame(object):
         wgm = self.get_wgm(tablenum)
         if not wgm:
             return _("No table #%s exists") % tablenum
-        word_list = wgm.word_list
-        missed = json.loads(word_list.missed)
+        word_list = self.get_word_list(wgm)
+        if not 0 <= question_index < word_list.numAlphagrams:
+            return False
+        missed = word_list.get_missed()
         state = json.loads(wgm.currentGameState)
         if question_index in set(missed):
             # Already missed, user should not be able to mark it missed.
             return False
         missed.append(question_index)
-        word_list.missed = json.dumps(missed)
+        word_list.set_missed(missed)
         word_list.numMissed += 1
         if state.get("justCreatedFirstMissed"):
             logger.debug("Also adding to first missed count")
             # Also add to first missed count.
-            first_missed = json.loads(word_list.firstMissed)
+            first_missed = word_list.get_first_missed()
             if question_index not in set(first_missed):
                 first_missed.append(question_index)
                 word_list.numFirstMissed += 1
-                word_list.firstMissed = json.dumps(first_missed)
+                word_list.set_first_missed(first_missed)
 
         word_list.save()
         logger.debug("Missed: %s", word_list.missed)
@@ -1065,61 +1143,77 @@ class WordwallsGame(object):
         """Handle a guess submission from the front end."""
         logger.debug("User %s guessed %s (wrong=%s)", user, guess_str, wrong_answers)
         guess_str = guess_str.upper()
-        wgm = self.get_wgm(tablenum)
+        with self.table_state.lock(tablenum):
+            return self._guess(guess_str, tablenum, user, sleep, wrong_answers)
+
+    def _guess(self, guess_str, tablenum, user, sleep, wrong_answers):
         last_correct = ""
-        if not wgm:
-            return
-        state = json.loads(wgm.currentGameState)
+        # If the store has the live state of this round, we don't need to
+        # touch the database at all, unless the round ends.
+        wgm = None
+        state = self.table_state.get(tablenum)
+        if state is None:
+            wgm = self.get_wgm(tablenum)
+            if not wgm:
+                return
+            state = json.loads(wgm.currentGameState)
+        upgrade_state(state)
         state_modified = False
+        round_ended = False
         if not state["quizGoing"]:
             logger.info("Guess came in after quiz ended.")
             return
         # Otherwise, let's process the guess.
+        answers = answer_index(state, tablenum)
         if self.did_timer_run_out(state):
             state["timeRemaining"] = 0
             state["wrongAnswers"] = wrong_answers
-            state_modified = True
+            round_ended = True
             logger.info("Timer ran out, end quiz.")
-            self.do_quiz_end_actions(state, tablenum, wgm)
-            # Save state back to game.
-        elif guess_str in state["answerHash"]:
-            alpha = state["answerHash"][guess_str]
-            # state['answerHash'] is modified here
-            del state["answerHash"][guess_str]
-            state["wrongAnswers"] = wrong_answers
-            self.add_to_solvers(state, guess_str, user.username)
-            state_modified = True
-            if len(state["answerHash"]) == 0:
-                time_remaining = (
-                    state["quizStartTime"] + state["timerSecs"]
-                ) - time.time()
-                if time_remaining < 0:
-                    time_remaining = 0
-                state["timeRemaining"] = time_remaining
-                self.do_quiz_end_actions(state, tablenum, wgm)
-            last_correct = alpha[0]
-        elif guess_str in state.get("originalAnswerHash", {}):
+        elif guess_str in state["solvers"]:
             # Consider removing this.
-            # It's possible that the guess is in the answer hash that
-            # existed at the beginning of the quiz, but the front end
-            # never got the message that it was solved, due to Internet
-            # connectivity issues.
+            # It's possible that the guess was an answer for this round,
+            # but the front end never got the message that it was solved,
+            # due to Internet connectivity issues.
             # In this case, we should advise the front end to mark the
             # question correct.
             logger.info("event=guess-not-correct guess=%s", guess_str)
-            last_correct = state["originalAnswerHash"][guess_str][0]
+            pos = answers[guess_str]
             return {
                 "going": state["quizGoing"],
                 "word": guess_str,
-                "alphagram": last_correct,
-                "solver": state["solvers"].get(guess_str, "Anonymous"),
+                "alphagram": state["questions"][pos]["a"],
+                "solver": state["solvers"][guess_str],
                 "already_solved": True,
             }
+        elif guess_str in answers:
+            pos = answers[guess_str]
+            state["wrongAnswers"] = wrong_answers
+            # state['solvers'] is modified here
+            self.add_to_solvers(state, guess_str, user.username)
+            state_modified = True
+            if num_unsolved(state) == 0:
+                time_remaining = (
+                    state["quizStartTime"] + state["timerSecs"]
+                ) - time.time()
+                if time_remaining < 0:
+                    time_remaining = 0
+                state["timeRemaining"] = time_remaining
+                round_ended = True
+            last_correct = state["questions"][pos]["a"]
         if sleep:  # Only used for tests!
             time.sleep(sleep)
-        if state_modified:
-            wgm.currentGameState = json.dumps(state)
-            wgm.save()
+        if round_ended:
+            if wgm is None:
+                wgm = self.get_wgm(tablenum)
+                if not wgm:
+                    self.table_state.release(tablenum)
+                    return
+            self.do_quiz_end_actions(state, tablenum, wgm)
+            # Save state back to game.
+            self.persist_state(wgm, state)
+        elif state_modified:
+            self.table_state.set(tablenum, state)
         return {
             "going": state["quizGoing"],
             "word": guess_str,
@@ -1165,5 +1259,4 @@ class WordwallsGame(object):
     def state(self, tablenum):
         """Get the state."""
         wgm = self.get_wgm(tablenum, lock=False)
-        state = json.loads(wgm.currentGameState)
-        return state
+        return self.live_state(wgm)
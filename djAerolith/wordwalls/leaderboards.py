@@ -0,0 +1,237 @@
+"""
+Daily challenge leaderboards.
+
+Every entry stores its rank on the board under each tiebreaker
+(rank_errors, rank_time). New entries go through `add_entry`, which slots
+them in and moves the entries behind them down one, so reading the top
+K entries, a page of the board, or one user's rank is an index range
+lookup on (board, rank) rather than a sort of the whole board.
+
+The entries, usernames and medals of a leaderboard are read with a single
+query. The full board is cached per challenge and tiebreaker for
+WORDWALLS_LEADERBOARD_CACHE_TIMEOUT seconds, and dropped whenever an entry
+or medal for it is written or deleted. Saving an existing entry re-ranks
+its whole board.
+
+"""
+
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, OuterRef, Q, Subquery
+from django.db.models.signals import post_delete, post_save
+
+from wordwalls.models import (
+    DailyChallengeLeaderboard,
+    DailyChallengeLeaderboardEntry,
+    Medal,
+)
+
+# The order of a board under each tiebreaker, best first. Entries that tie
+# on every column are ranked by who got there first.
+TIEBREAKERS = {
+    "errors": ("-score", "wrong_answers", "-timeRemaining", "pk"),
+    "time": ("-score", "-timeRemaining", "wrong_answers", "pk"),
+}
+RANK_FIELDS = {"errors": "rank_errors", "time": "rank_time"}
+MEDAL_NAMES = dict(Medal.MEDAL_TYPES)
+
+
+def _cache_key(challenge_id, tiebreaker):
+    return "wordwalls:leaderboard:{}:{}".format(challenge_id, tiebreaker)
+
+
+def _ahead_of(tiebreaker, entry):
+    """A filter for the entries that rank ahead of a new `entry`."""
+    ahead = Q()
+    same = {}
+    for order in TIEBREAKERS[tiebreaker][:-1]:
+        field = order.lstrip("-")
+        lookup = "__gt" if order.startswith("-") else "__lt"
+        value = getattr(entry, field)
+        ahead |= Q(**same, **{field + lookup: value})
+        same[field] = value
+    # Existing entries with the same result were there first.
+    return ahead | Q(**same)
+
+
+def rank_board(board_id):
+    """Recompute the ranks of every entry on a board."""
+    entries = DailyChallengeLeaderboardEntry.objects.filter(board_id=board_id)
+    ranked = {}
+    for tiebreaker, field in RANK_FIELDS.items():
+        pks = entries.order_by(*TIEBREAKERS[tiebreaker]).values_list("pk", flat=True)
+        for rank, pk in enumerate(pks, 1):
+            entry = ranked.setdefault(
+                pk, DailyChallengeLeaderboardEntry(pk=pk, board_id=board_id)
+            )
+            setattr(entry, field, rank)
+    DailyChallengeLeaderboardEntry.objects.bulk_update(
+        ranked.values(), list(RANK_FIELDS.values()), batch_size=500
+    )
+
+
+def _ensure_ranked(board_id):
+    """Rank boards whose entries were added without add_entry."""
+    unranked = DailyChallengeLeaderboardEntry.objects.filter(
+        Q(rank_errors__isnull=True) | Q(rank_time__isnull=True), board_id=board_id
+    )
+    if unranked.exists():
+        rank_board(board_id)
+
+
+def add_entry(entry):
+    """Save a new leaderboard entry, ranking it on its board."""
+    with transaction.atomic():
+        # Only one entry is ranked into a board at a time.
+        DailyChallengeLeaderboard.objects.select_for_update().filter(
+            pk=entry.board_id
+        ).exists()
+        _ensure_ranked(entry.board_id)
+        entries = DailyChallengeLeaderboardEntry.objects.filter(board_id=entry.board_id)
+        for tiebreaker, field in RANK_FIELDS.items():
+            ahead = entries.filter(_ahead_of(tiebreaker, entry)).count()
+            entries.filter(**{field + "__gt": ahead}).update(**{field: F(field) + 1})
+            setattr(entry, field, ahead + 1)
+        entry.save()
+
+
+def entry_rank(lb, user, tiebreaker):
+    """A user's rank on a leaderboard, or None if they have no entry."""
+    _ensure_ranked(lb.pk)
+    return (
+        DailyChallengeLeaderboardEntry.objects.filter(board=lb, user=user)
+        .values_list(RANK_FIELDS[tiebreaker], flat=True)
+        .first()
+    )
+
+
+def leaderboard_entries(lb, tiebreaker, offset=0, limit=None):
+    """
+    The entries of a leaderboard, best first; `limit` entries starting
+    after the first `offset`, or all of them.
+
+    """
+    _ensure_ranked(lb.pk)
+    rank = RANK_FIELDS[tiebreaker]
+    medal = Medal.objects.filter(
+        leaderboard=OuterRef("board"), user=OuterRef("user")
+    ).values("medal_type")[:1]
+    rows = DailyChallengeLeaderboardEntry.objects.filter(board=lb)
+    if offset:
+        rows = rows.filter(**{rank + "__gt": offset})
+    if limit is not None:
+        rows = rows.filter(**{rank + "__lte": offset + limit})
+    rows = (
+        rows.annotate(medal=Subquery(medal))
+        .order_by(rank)
+        .values_list(
+            "user__username", "score", "timeRemaining", "wrong_answers", "medal"
+        )
+    )
+    entries = []
+    for username, score, time_remaining, wrong_answers, medal_type in rows:
+        addl_data = None
+        if medal_type:
+            addl_data = json.dumps({"medal": MEDAL_NAMES[medal_type]})
+        entries.append(
+            {
+                "user": username,
+                "score": score,
+                "tr": time_remaining,
+                "w": wrong_answers,
+                "addl": addl_data,
+            }
+        )
+    return entries
+
+
+def get_leaderboard_data_for_dc_instance(dc, tiebreaker, offset=0, limit=None):
+    """
+    Gets leaderboard data given a daily challenge instance.
+    Returns a dictionary of `entry`s; pass `offset` and `limit` for just
+    one page of them.
+
+    """
+    if tiebreaker not in TIEBREAKERS:
+        tiebreaker = "errors"
+    full = not offset and limit is None
+    key = _cache_key(dc.pk, tiebreaker)
+    if full:
+        data = cache.get(key)
+        if data is not None:
+            return data
+    try:
+        lb = DailyChallengeLeaderboard.objects.get(challenge=dc)
+    except DailyChallengeLeaderboard.DoesNotExist:
+        return None
+
+    data = {
+        "maxScore": lb.maxScore,
+        "entries": leaderboard_entries(lb, tiebreaker, offset, limit),
+        "challengeName": dc.name.name,
+        "lexicon": dc.lexicon.lexiconName,
+    }
+    if full:
+        cache.set(key, data, settings.WORDWALLS_LEADERBOARD_CACHE_TIMEOUT)
+    return data
+
+
+def invalidate_leaderboard(challenge_id):
+    cache.delete_many([_cache_key(challenge_id, t) for t in TIEBREAKERS])
+
+
+def _board_changed(board_id):
+    challenge_id = (
+        DailyChallengeLeaderboard.objects.filter(pk=board_id)
+        .values_list("challenge_id", flat=True)
+        .first()
+    )
+    if challenge_id is None:
+        return
+    invalidate_leaderboard(challenge_id)
+    # Drop it again after commit, in case it was read back in the meantime.
+    transaction.on_commit(lambda: invalidate_leaderboard(challenge_id))
+
+
+def _entry_changed(sender, instance, created, raw, update_fields, **kwargs):
+    if not created and not raw:
+        rank_fields = set(RANK_FIELDS.values())
+        if update_fields is None or not set(update_fields) <= rank_fields:
+            # The entry's result may have changed, moving it on the board.
+            with transaction.atomic():
+                DailyChallengeLeaderboard.objects.select_for_update().filter(
+                    pk=instance.board_id
+                ).exists()
+                rank_board(instance.board_id)
+    _board_changed(instance.board_id)
+
+
+def _entry_deleted(sender, instance, **kwargs):
+    # Close the gap the entry leaves behind.
+    entries = DailyChallengeLeaderboardEntry.objects.filter(board_id=instance.board_id)
+    for field in RANK_FIELDS.values():
+        rank = getattr(instance, field)
+        if rank is not None:
+            entries.filter(**{field + "__gt": rank}).update(**{field: F(field) - 1})
+    _board_changed(instance.board_id)
+
+
+def _medal_changed(sender, instance, **kwargs):
+    _board_changed(instance.leaderboard_id)
+
+
+post_save.connect(
+    _entry_changed,
+    DailyChallengeLeaderboardEntry,
+    dispatch_uid="leaderboard_entry_save",
+)
+post_delete.connect(
+    _entry_deleted,
+    DailyChallengeLeaderboardEntry,
+    dispatch_uid="leaderboard_entry_delete",
+)
+post_save.connect(_medal_changed, Medal, dispatch_uid="leaderboard_medal_save")
+post_delete.connect(_medal_changed, Medal, dispatch_uid="leaderboard_medal_delete")
@@ -0,0 +1,99 @@
+"""
+Benchmark guesses per second for each table state store.
+
+Creates a throwaway table with a synthetic round, guesses every answer
+but the last one (so the round doesn't end), and rolls everything back.
+
+    ./manage.py benchmark_guesses --questions 200
+
+"""
+
+import json
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from base.models import Lexicon
+from tablegame.models import GenericTableGameModel
+from wordwalls.game import WordwallsGame
+from wordwalls.models import WordwallsGameModel
+from wordwalls.round_state import new_round_state
+from wordwalls.table_state import create_table_state_store
+
+BACKENDS = ["db", "locmem", "cache"]
+
+
+class Rollback(Exception):
+    pass
+
+
+def synthetic_round(num_questions, answers_per_question):
+    questions = []
+    for i in range(num_questions):
+        alphagram = "Q{:05d}".format(i)
+        words = [
+            "{}W{}".format(alphagram, j) for j in range(answers_per_question)
+        ]
+        questions.append({"a": alphagram, "ws": words})
+    state = {
+        "questionsToPull": num_questions,
+        "quizGoing": True,
+        "quizStartTime": time.time(),
+        "timerSecs": 3600,
+        "gameType": "regular",
+    }
+    state.update(new_round_state(questions, list(range(num_questions))))
+    return state
+
+
+class Command(BaseCommand):
+    help = """Benchmarks guesses/sec for each table state store."""
+
+    def add_arguments(self, parser):
+        parser.add_argument("--questions", type=int, default=200)
+        parser.add_argument("--answers-per-question", type=int, default=2)
+        parser.add_argument(
+            "--backend", choices=BACKENDS, action="append", dest="backends"
+        )
+
+    def handle(self, *args, **options):
+        backends = options["backends"] or BACKENDS
+        try:
+            with transaction.atomic():
+                for backend in backends:
+                    self.run_backend(
+                        backend,
+                        options["questions"],
+                        options["answers_per_question"],
+                    )
+                raise Rollback()
+        except Rollback:
+            pass
+
+    def run_backend(self, backend, num_questions, answers_per_question):
+        user = User.objects.order_by("pk").first()
+        state = synthetic_round(num_questions, answers_per_question)
+        wgm = WordwallsGameModel.objects.create(
+            host=user,
+            currentGameState=json.dumps(state),
+            gameType=GenericTableGameModel.WORDWALLS_GAMETYPE,
+            playerType=GenericTableGameModel.SINGLEPLAYER_GAME,
+            lexicon=Lexicon.objects.order_by("pk").first(),
+        )
+        store = create_table_state_store(backend)
+        store.hold(wgm.pk, state)
+        wwg = WordwallsGame(table_state=store)
+        # Leave one answer unsolved so the round doesn't end.
+        guesses = [w for q in state["questions"] for w in q["ws"]][:-1]
+        start = time.time()
+        for g in guesses:
+            wwg.guess(g, wgm.pk, user)
+        elapsed = time.time() - start
+        store.release(wgm.pk)
+        self.stdout.write(
+            "{:8s} {:6d} guesses in {:.3f} s ({:.0f} guesses/s)".format(
+                backend, len(guesses), elapsed, len(guesses) / elapsed
+            )
+        )
@@ -0,0 +1,91 @@
+"""
+Benchmark start_quiz on a large saved list, stored as JSON and packed.
+
+Creates a throwaway typing list (so questions come straight from the list
+and not from the word DB server), plays a few rounds on it by starting
+and giving up, and rolls everything back.
+
+    ./manage.py benchmark_round_start --alphagrams 100000 --rounds 20
+
+"""
+
+import sys
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test.utils import override_settings
+
+from base.models import Lexicon, WordList
+from wordwalls.game import WordwallsGame
+from wordwalls.table_state import DatabaseTableStateStore
+
+
+class Rollback(Exception):
+    pass
+
+
+def synthetic_questions(num_alphagrams):
+    questions = []
+    for i in range(num_alphagrams):
+        alphagram = "Q{:07d}".format(i)
+        questions.append({"q": alphagram, "a": [alphagram + "W"]})
+    return questions
+
+
+class Command(BaseCommand):
+    help = """Benchmarks start_quiz on a large JSON vs packed saved list."""
+
+    def add_arguments(self, parser):
+        parser.add_argument("--alphagrams", type=int, default=100000)
+        parser.add_argument("--rounds", type=int, default=20)
+
+    def handle(self, *args, **options):
+        questions = synthetic_questions(options["alphagrams"])
+        try:
+            with transaction.atomic():
+                # Keep the JSON list from being packed on the first round.
+                with override_settings(WORD_LIST_PACK_THRESHOLD=sys.maxsize):
+                    self.run_format("json", questions, options["rounds"])
+                with override_settings(WORD_LIST_PACK_THRESHOLD=1):
+                    self.run_format("packed", questions, options["rounds"])
+                raise Rollback()
+        except Rollback:
+            pass
+
+    def run_format(self, name, questions, rounds):
+        user = User.objects.order_by("pk").first()
+        lexicon = Lexicon.objects.order_by("pk").first()
+        wwg = WordwallsGame(table_state=DatabaseTableStateStore())
+        word_list = WordList()
+        word_list.initialize_list(
+            list(questions),
+            lexicon,
+            user,
+            shuffle=True,
+            category=WordList.CATEGORY_TYPING,
+        )
+        wgm = wwg.create_or_update_game_instance(
+            user, lexicon, word_list, None, False, timerSecs=300
+        )
+        elapsed = []
+        for _ in range(rounds):
+            start = time.time()
+            params = wwg.start_quiz(wgm.pk, user)
+            elapsed.append(time.time() - start)
+            if "error" in params:
+                self.stderr.write(params["error"])
+                return
+            wwg.give_up(user, wgm.pk)
+        elapsed.sort()
+        self.stdout.write(
+            "{:7s} {:8d} alphagrams, {} rounds: median {:.1f} ms, "
+            "max {:.1f} ms".format(
+                name,
+                len(questions),
+                rounds,
+                elapsed[len(elapsed) // 2] * 1000,
+                elapsed[-1] * 1000,
+            )
+        )
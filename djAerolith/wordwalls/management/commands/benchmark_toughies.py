@@ -0,0 +1,160 @@
+"""
+Benchmark (and check) gen_toughies_by_challenge on a synthetic week of
+Today's 7s challenges.
+
+Creates a week of challenges far in the future, each with a leaderboard
+and missed bingos, runs the aggregate query against the Python it
+replaced, makes sure both agree, and rolls everything back.
+
+    ./manage.py benchmark_toughies --players 300 --missed 200 --runs 10
+
+"""
+
+import random
+import time
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from base.models import Lexicon
+from wordwalls.challenges import gen_toughies_by_challenge
+from wordwalls.models import (
+    DailyChallenge,
+    DailyChallengeLeaderboard,
+    DailyChallengeLeaderboardEntry,
+    DailyChallengeMissedBingos,
+    DailyChallengeName,
+)
+
+START_DATE = date(2099, 1, 1)
+NUM_TOUGHIES = 25
+
+
+class Rollback(Exception):
+    pass
+
+
+def toughies_in_python(challenge_name, num, min_date, max_date, lex):
+    """The original implementation; returns (alphagram, miss rate) pairs."""
+    challenges = DailyChallenge.objects.filter(
+        lexicon=lex, date__range=(min_date, max_date), name=challenge_name
+    )
+    mbs = DailyChallengeMissedBingos.objects.filter(challenge__in=list(challenges))
+    num_solved = {}
+    for dc in challenges:
+        try:
+            lb = DailyChallengeLeaderboard.objects.get(challenge=dc)
+            entries = DailyChallengeLeaderboardEntry.objects.filter(
+                board=lb, qualifyForAward=True
+            )
+            num_solved[dc] = len(entries)
+        except DailyChallengeLeaderboard.DoesNotExist:
+            num_solved[dc] = 1e6
+    mb_dict = {}
+    for b in mbs:
+        try:
+            perc_correct = float(b.numTimesMissed) / num_solved[b.challenge]
+        except ZeroDivisionError:
+            continue
+        alphagram = b.alphagram_string
+        if alphagram not in mb_dict or perc_correct > mb_dict[alphagram]:
+            mb_dict[alphagram] = perc_correct
+    return sorted(mb_dict.items(), key=lambda x: x[1], reverse=True)[:num]
+
+
+class Command(BaseCommand):
+    help = """Benchmarks the toughies query on a synthetic week."""
+
+    def add_arguments(self, parser):
+        parser.add_argument("--players", type=int, default=300)
+        parser.add_argument("--missed", type=int, default=200)
+        parser.add_argument("--runs", type=int, default=10)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options["players"], options["missed"], options["runs"])
+                raise Rollback()
+        except Rollback:
+            pass
+
+    def make_week(self, lex, ch_name, num_players, num_missed):
+        users = User.objects.bulk_create(
+            [
+                User(username="toughies_bench_{}".format(i))
+                for i in range(num_players)
+            ]
+        )
+        # Alphagrams are shared between days, so an alphagram's rate is
+        # its worst day.
+        alphagram_pool = ["B{:06d}".format(i) for i in range(num_missed * 3)]
+        for day in range(7):
+            dc = DailyChallenge.objects.create(
+                lexicon=lex,
+                date=START_DATE + timedelta(days=day),
+                name=ch_name,
+                alphagrams="[]",
+                seconds=270,
+            )
+            lb = DailyChallengeLeaderboard.objects.create(challenge=dc, maxScore=50)
+            DailyChallengeLeaderboardEntry.objects.bulk_create(
+                [
+                    DailyChallengeLeaderboardEntry(
+                        board=lb,
+                        user=user,
+                        score=random.randint(0, 50),
+                        timeRemaining=random.randint(0, 270),
+                        qualifyForAward=random.random() < 0.9,
+                    )
+                    for user in users
+                ]
+            )
+            DailyChallengeMissedBingos.objects.bulk_create(
+                [
+                    DailyChallengeMissedBingos(
+                        challenge=dc,
+                        alphagram_string=alphagram,
+                        numTimesMissed=random.randint(1, num_players),
+                    )
+                    for alphagram in random.sample(alphagram_pool, num_missed)
+                ]
+            )
+
+    def run(self, num_players, num_missed, runs):
+        lex = Lexicon.objects.order_by("pk").first()
+        ch_name, _ = DailyChallengeName.objects.get_or_create(name="Today's 7s")
+        self.make_week(lex, ch_name, num_players, num_missed)
+        dates = (START_DATE, START_DATE + timedelta(days=6))
+        args = (ch_name, NUM_TOUGHIES, *dates, lex)
+
+        expected = toughies_in_python(*args)
+        got = gen_toughies_by_challenge(*args)
+        # Ties can come back in either order, so compare the rates.
+        rates = dict(toughies_in_python(ch_name, num_missed * 7, *dates, lex))
+        if [round(rates[a], 9) for a in got] != [round(r, 9) for _, r in expected]:
+            raise CommandError(
+                "Query and Python disagree: {} vs {}".format(got, expected)
+            )
+
+        for name, fn in (
+            ("python", toughies_in_python),
+            ("query", gen_toughies_by_challenge),
+        ):
+            elapsed = []
+            for _ in range(runs):
+                start = time.time()
+                fn(*args)
+                elapsed.append(time.time() - start)
+            elapsed.sort()
+            self.stdout.write(
+                "{:6s} {} players x {} missed x 7 days: median {:.1f} ms, "
+                "max {:.1f} ms".format(
+                    name,
+                    num_players,
+                    num_missed,
+                    elapsed[len(elapsed) // 2] * 1000,
+                    elapsed[-1] * 1000,
+                )
+            )
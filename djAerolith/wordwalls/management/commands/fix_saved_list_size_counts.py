@@ -1,5 +1,3 @@
-import json
-
 from django.core.management.base import BaseCommand
 
 from accounts.models import AerolithProfile
@@ -17,7 +15,7 @@ class Command(BaseCommand):
             for word_list in word_lists:
                 ct += word_list.numAlphagrams
                 if (word_list.numAlphagrams !=
-                        len(json.loads(word_list.origQuestions))):
+                        len(word_list.get_orig_questions())):
                     print('This should not be')
 
             if ct != profile.wordwallsSaveListSize:
@@ -1,15 +1,23 @@
-"""Generate the "named" default Aerolith lists."""
+"""
+Generate the "named" default Aerolith lists.
+
+    ./manage.py genNamedLists NWL23 CSW21 --workers 4
+
+"""
 
 import json
 import time
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
-from django.core.management.base import BaseCommand
-from django.db import connection
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
 
 from base.models import Lexicon, alphagrammize
 from wordwalls.models import NamedList
-from lib.wdb_interface.wdb_helper import word_search
+from lib.wdb_interface.wdb_helper import word_searches
 from lib.wdb_interface.word_searches import SearchDescription
 
 logger = logging.getLogger(__name__)
@@ -106,29 +114,49 @@ FRIENDLY_COMMON_SHORT = "Common Short Words (8 or fewer letters)"
 FRIENDLY_COMMON_LONG = "Common Long Words (greater than 8 letters)"
 
 
-def create_named_list(lexicon, num_questions, word_length, is_range, questions, name):
+def create_named_list(
+    named_lists, lexicon, num_questions, word_length, is_range, questions, name
+):
+    """Add an unsaved NamedList to `named_lists`, unless it'd be empty."""
     if num_questions == 0:
         logger.debug(">> Not creating empty list " + name)
         return
 
-    nl = NamedList(
-        lexicon=lexicon,
-        numQuestions=num_questions,
-        wordLength=word_length,
-        isRange=is_range,
-        questions=questions,
-        name=name,
+    named_lists.append(
+        NamedList(
+            lexicon=lexicon,
+            numQuestions=num_questions,
+            wordLength=word_length,
+            isRange=is_range,
+            questions=questions,
+            name=name,
+        )
     )
-    nl.full_clean()
-    nl.save()
+
+
+def create_searched_lists(named_lists, lex, word_length, searches):
+    """
+    Create the non-range lists for one word length. `searches` is a list of
+    (list name, search descriptions) tuples; the searches are all sent to
+    the word DB at once.
+
+    """
+    results = word_searches([search for _, search in searches])
+    for (name, _), qs in zip(searches, results):
+        qs = qs.to_python()
+        create_named_list(
+            named_lists, lex, len(qs), word_length, False, json.dumps(qs), name
+        )
 
 
 def create_wl_lists(i, lex):
-    """Create word lists for words with length `i`."""
+    """Create word lists for words with length `i`; returns them unsaved."""
     logger.debug("Creating WL for lex %s, length %s", lex.lexiconName, i)
+    named_lists = []
     length_counts = json.loads(lex.lengthCounts)
     num_for_this_length = length_counts[str(i)]
     create_named_list(
+        named_lists,
         lex,
         num_for_this_length,
         i,
@@ -142,6 +170,7 @@ def create_wl_lists(i, lex):
             min_p = p
             max_p = min(p + LIST_GRANULARITY - 1, num_for_this_length)
             create_named_list(
+                named_lists,
                 lex,
                 max_p - min_p + 1,
                 i,
@@ -150,406 +179,341 @@ def create_wl_lists(i, lex):
                 "{} ({} to {})".format(friendly_number_map[i], p, max_p),
             )
 
+    searches = []
     if i >= 4 and i <= 8:
-        qs = word_search(
-            [
-                SearchDescription.lexicon(lex),
-                SearchDescription.matching_anagram("[JQXZ]" + "?" * (i - 1)),
-            ]
-        ).to_python()
-
-        create_named_list(
-            lex,
-            len(qs),
-            i,
-            False,
-            json.dumps(qs),
-            "JQXZ " + friendly_number_map[i],
+        searches.append(
+            (
+                "JQXZ " + friendly_number_map[i],
+                [
+                    SearchDescription.lexicon(lex),
+                    SearchDescription.matching_anagram("[JQXZ]" + "?" * (i - 1)),
+                ],
+            )
         )
 
     if i == 7:
         # 4+ vowel 7s
-        qs = word_search(
-            [
-                SearchDescription.lexicon(lex),
-                SearchDescription.matching_anagram("[AEIOU][AEIOU][AEIOU][AEIOU]???"),
-            ]
-        ).to_python()
-        create_named_list(
-            lex,
-            len(qs),
-            i,
-            False,
-            json.dumps(qs),
-            "Sevens with 4 or more vowels",
+        searches.append(
+            (
+                "Sevens with 4 or more vowels",
+                [
+                    SearchDescription.lexicon(lex),
+                    SearchDescription.matching_anagram(
+                        "[AEIOU][AEIOU][AEIOU][AEIOU]???"
+                    ),
+                ],
+            )
         )
     if i == 8:
         # 5+ vowel 8s
-        qs = word_search(
-            [
-                SearchDescription.lexicon(lex),
-                SearchDescription.matching_anagram(
-                    "[AEIOU][AEIOU][AEIOU][AEIOU][AEIOU]???"
-                ),
-            ]
-        ).to_python()
-        create_named_list(
-            lex,
-            len(qs),
-            i,
-            False,
-            json.dumps(qs),
-            "Eights with 5 or more vowels",
+        searches.append(
+            (
+                "Eights with 5 or more vowels",
+                [
+                    SearchDescription.lexicon(lex),
+                    SearchDescription.matching_anagram(
+                        "[AEIOU][AEIOU][AEIOU][AEIOU][AEIOU]???"
+                    ),
+                ],
+            )
         )
 
     if lex.lexiconName == "NWL23":
-        qs = word_search(
-            [
-                SearchDescription.lexicon(lex),
-                SearchDescription.length(i, i),
-                SearchDescription.not_in_lexicon("other_english"),
-            ]
-        ).to_python()
-        create_named_list(
-            lex,
-            len(qs),
-            i,
-            False,
-            json.dumps(qs),
-            "NWL23 {} not in CSW21".format(friendly_number_map[i]),
+        searches.append(
+            (
+                "NWL23 {} not in CSW21".format(friendly_number_map[i]),
+                [
+                    SearchDescription.lexicon(lex),
+                    SearchDescription.length(i, i),
+                    SearchDescription.not_in_lexicon("other_english"),
+                ],
+            )
         )
-
-        qs = word_search(
-            [
-                SearchDescription.lexicon(lex),
-                SearchDescription.length(i, i),
-                SearchDescription.not_in_lexicon("update"),
-            ]
-        ).to_python()
-        create_named_list(
-            lex,
-            len(qs),
-            i,
-            False,
-            json.dumps(qs),
-            "NWL23 {} not in NWL20".format(friendly_number_map[i]),
+        searches.append(
+            (
+                "NWL23 {} not in NWL20".format(friendly_number_map[i]),
+                [
+                    SearchDescription.lexicon(lex),
+                    SearchDescription.length(i, i),
+                    SearchDescription.not_in_lexicon("update"),
+                ],
+            )
         )
 
     if lex.lexiconName == "CSW21":
-        qs = word_search(
-            [
-                SearchDescription.lexicon(lex),
-                SearchDescription.length(i, i),
-                SearchDescription.not_in_lexicon("other_english"),
-            ]
-        ).to_python()
-        create_named_list(
-            lex,
-            len(qs),
-            i,
-            False,
-            json.dumps(qs),
-            "CSW21 {} not in NWL23".format(friendly_number_map[i]),
+        searches.append(
+            (
+                "CSW21 {} not in NWL23".format(friendly_number_map[i]),
+                [
+                    SearchDescription.lexicon(lex),
+                    SearchDescription.length(i, i),
+                    SearchDescription.not_in_lexicon("other_english"),
+                ],
+            )
         )
 
+    create_searched_lists(named_lists, lex, i, searches)
+    return named_lists
 
-def createNamedLists(lex):
-    """Create the lists for every word length, given a lexicon."""
-    # create lists for every word length
-    t1 = time.time()
-    for i in range(2, 16):
-        create_wl_lists(i, lex)
 
-    if lex.lexiconName == "OWL2":
-        create_common_words_lists()
-
-    logger.debug("%s, elapsed %s", lex, time.time() - t1)
-
-
-def create_spanish_lists():
-    lex = Lexicon.objects.get(lexiconName="FISE2")
-    for i in range(2, 16):
-        logger.debug("Creating WL for lex %s, length %s", lex.lexiconName, i)
-        length_counts = json.loads(lex.lengthCounts)
-        num_for_this_length = length_counts[str(i)]
-
-        create_named_list(
-            lex,
-            num_for_this_length,
-            i,
-            True,
-            json.dumps([1, num_for_this_length]),
-            "Los " + mapa_amigable[i],
-        )
-        if i >= 7 and i <= 8:
-            # create 'every x' list
-            for p in range(1, num_for_this_length + 1, LIST_GRANULARITY):
-                min_p = p
-                max_p = min(p + LIST_GRANULARITY - 1, num_for_this_length)
-                create_named_list(
-                    lex,
-                    max_p - min_p + 1,
-                    i,
-                    True,
-                    json.dumps([min_p, max_p]),
-                    "{} ({} a {})".format(mapa_amigable[i], p, max_p),
-                )
+def create_spanish_lists(i, lex):
+    logger.debug("Creating WL for lex %s, length %s", lex.lexiconName, i)
+    length_counts = json.loads(lex.lengthCounts)
+    num_for_this_length = length_counts[str(i)]
+    named_lists = []
 
-        if i >= 4 and i <= 8:
-            qs = word_search(
-                [
-                    SearchDescription.lexicon(lex),
-                    SearchDescription.matching_anagram("[JQXZ]" + "?" * (i - 1)),
-                ]
-            ).to_python()
+    create_named_list(
+        named_lists,
+        lex,
+        num_for_this_length,
+        i,
+        True,
+        json.dumps([1, num_for_this_length]),
+        "Los " + mapa_amigable[i],
+    )
+    if i >= 7 and i <= 8:
+        # create 'every x' list
+        for p in range(1, num_for_this_length + 1, LIST_GRANULARITY):
+            min_p = p
+            max_p = min(p + LIST_GRANULARITY - 1, num_for_this_length)
             create_named_list(
+                named_lists,
                 lex,
-                len(qs),
+                max_p - min_p + 1,
                 i,
-                False,
-                json.dumps(qs),
-                "JQXZ " + mapa_amigable[i],
+                True,
+                json.dumps([min_p, max_p]),
+                "{} ({} a {})".format(mapa_amigable[i], p, max_p),
             )
 
-            qs = word_search(
+    searches = []
+    if i >= 4 and i <= 8:
+        searches.append(
+            (
+                "JQXZ " + mapa_amigable[i],
                 [
                     SearchDescription.lexicon(lex),
-                    SearchDescription.matching_anagram("[123Ñ]" + "?" * (i - 1)),
-                ]
-            ).to_python()
-            create_named_list(
-                lex,
-                len(qs),
-                i,
-                False,
-                json.dumps(qs),
+                    SearchDescription.matching_anagram("[JQXZ]" + "?" * (i - 1)),
+                ],
+            )
+        )
+        searches.append(
+            (
                 "(ᴄʜ)(ʟʟ)(ʀʀ)Ñ " + mapa_amigable[i],
+                [
+                    SearchDescription.lexicon(lex),
+                    SearchDescription.matching_anagram("[123Ñ]" + "?" * (i - 1)),
+                ],
             )
+        )
 
-        if i == 7:
-            # 4+ vowel 7s
-            qs = word_search(
+    if i == 7:
+        # 4+ vowel 7s
+        searches.append(
+            (
+                "Sietes con 4 o más vocales",
                 [
                     SearchDescription.lexicon(lex),
                     SearchDescription.matching_anagram(
                         "[AEIOU][AEIOU][AEIOU][AEIOU]???"
                     ),
-                ]
-            ).to_python()
-            create_named_list(
-                lex,
-                len(qs),
-                i,
-                False,
-                json.dumps(qs),
-                "Sietes con 4 o más vocales",
+                ],
             )
-        if i == 8:
-            # 5+ vowel 8s
-            qs = word_search(
+        )
+    if i == 8:
+        # 5+ vowel 8s
+        searches.append(
+            (
+                "Ochos con 5 o más vocales",
                 [
                     SearchDescription.lexicon(lex),
                     SearchDescription.matching_anagram(
                         "[AEIOU][AEIOU][AEIOU][AEIOU][AEIOU]???"
                     ),
-                ]
-            ).to_python()
-            create_named_list(
-                lex,
-                len(qs),
-                i,
-                False,
-                json.dumps(qs),
-                "Ochos con 5 o más vocales",
+                ],
             )
+        )
 
-        qs = word_search(
+    searches.append(
+        (
+            "FISE2 {} nuevos".format(mapa_amigable[i]),
             [
                 SearchDescription.lexicon(lex),
                 SearchDescription.length(i, i),
                 SearchDescription.not_in_lexicon("update"),
-            ]
-        ).to_python()
-        create_named_list(
-            lex,
-            len(qs),
-            i,
-            False,
-            json.dumps(qs),
-            "FISE2 {} nuevos".format(mapa_amigable[i]),
+            ],
         )
+    )
+    create_searched_lists(named_lists, lex, i, searches)
+    return named_lists
 
 
-def create_polish_lists():
-    lex = Lexicon.objects.get(lexiconName="OSPS49")
-    for i in range(2, 16):
-        logger.debug("Creating WL for lex %s, length %s", lex.lexiconName, i)
-        length_counts = json.loads(lex.lengthCounts)
-        num_for_this_length = length_counts[str(i)]
-
-        create_named_list(
-            lex,
-            num_for_this_length,
-            i,
-            True,
-            json.dumps([1, num_for_this_length]),
-            friendly_number_map_polish[i],
-        )
-        if i >= 7 and i <= 8:
-            # create 'every x' list
-            for p in range(1, num_for_this_length + 1, LIST_GRANULARITY):
-                min_p = p
-                max_p = min(p + LIST_GRANULARITY - 1, num_for_this_length)
-                create_named_list(
-                    lex,
-                    max_p - min_p + 1,
-                    i,
-                    True,
-                    json.dumps([min_p, max_p]),
-                    "{} ({} do {})".format(friendly_number_map_polish[i], p, max_p),
-                )
+def create_polish_lists(i, lex):
+    logger.debug("Creating WL for lex %s, length %s", lex.lexiconName, i)
+    length_counts = json.loads(lex.lengthCounts)
+    num_for_this_length = length_counts[str(i)]
+    named_lists = []
 
-        if i >= 4 and i <= 8:
-            qs = word_search(
-                [
-                    SearchDescription.lexicon(lex),
-                    SearchDescription.matching_anagram("[ĄĆĘŃÓŚŹŻ]" + "?" * (i - 1)),
-                ]
-            ).to_python()
+    create_named_list(
+        named_lists,
+        lex,
+        num_for_this_length,
+        i,
+        True,
+        json.dumps([1, num_for_this_length]),
+        friendly_number_map_polish[i],
+    )
+    if i >= 7 and i <= 8:
+        # create 'every x' list
+        for p in range(1, num_for_this_length + 1, LIST_GRANULARITY):
+            min_p = p
+            max_p = min(p + LIST_GRANULARITY - 1, num_for_this_length)
             create_named_list(
+                named_lists,
                 lex,
-                len(qs),
+                max_p - min_p + 1,
                 i,
-                False,
-                json.dumps(qs),
+                True,
+                json.dumps([min_p, max_p]),
+                "{} ({} do {})".format(friendly_number_map_polish[i], p, max_p),
+            )
+
+    searches = []
+    if i >= 4 and i <= 8:
+        searches.append(
+            (
                 friendly_number_map_polish[i] + " z ĄĆĘŃÓŚŹŻ",
+                [
+                    SearchDescription.lexicon(lex),
+                    SearchDescription.matching_anagram(
+                        "[ĄĆĘŃÓŚŹŻ]" + "?" * (i - 1)
+                    ),
+                ],
             )
+        )
 
-        # New words
-        qs = word_search(
+    # New words
+    searches.append(
+        (
+            "OSPS49 {} nie jest w OSPS48".format(friendly_number_map_polish[i]),
             [
                 SearchDescription.lexicon(lex),
                 SearchDescription.length(i, i),
                 SearchDescription.not_in_lexicon("update"),
-            ]
-        ).to_python()
-        create_named_list(
-            lex,
-            len(qs),
-            i,
-            False,
-            json.dumps(qs),
-            "OSPS49 {} nie jest w OSPS48".format(friendly_number_map_polish[i]),
+            ],
         )
+    )
+    create_searched_lists(named_lists, lex, i, searches)
+    return named_lists
 
 
-def create_german_lists():
-    lex = Lexicon.objects.get(lexiconName="Deutsch")
-    for i in range(2, 15):
-        logger.debug("Creating WL for lex %s, length %s", lex.lexiconName, i)
-        length_counts = json.loads(lex.lengthCounts)
-        num_for_this_length = length_counts[str(i)]
-
-        create_named_list(
-            lex,
-            num_for_this_length,
-            i,
-            True,
-            json.dumps([1, num_for_this_length]),
-            "Die " + friendly_number_map_german[i],
-        )
-        if i >= 7 and i <= 8:
-            # create 'every x' list
-            for p in range(1, num_for_this_length + 1, LIST_GRANULARITY):
-                min_p = p
-                max_p = min(p + LIST_GRANULARITY - 1, num_for_this_length)
-                create_named_list(
-                    lex,
-                    max_p - min_p + 1,
-                    i,
-                    True,
-                    json.dumps([min_p, max_p]),
-                    "{} ({} bis {})".format(friendly_number_map_german[i], p, max_p),
-                )
+def create_german_lists(i, lex):
+    logger.debug("Creating WL for lex %s, length %s", lex.lexiconName, i)
+    length_counts = json.loads(lex.lengthCounts)
+    num_for_this_length = length_counts[str(i)]
+    named_lists = []
 
-        if i >= 4 and i <= 8:
-            qs = word_search(
-                [
-                    SearchDescription.lexicon(lex),
-                    SearchDescription.matching_anagram("[ÄJÖQÜVXY]" + "?" * (i - 1)),
-                ]
-            ).to_python()
+    create_named_list(
+        named_lists,
+        lex,
+        num_for_this_length,
+        i,
+        True,
+        json.dumps([1, num_for_this_length]),
+        "Die " + friendly_number_map_german[i],
+    )
+    if i >= 7 and i <= 8:
+        # create 'every x' list
+        for p in range(1, num_for_this_length + 1, LIST_GRANULARITY):
+            min_p = p
+            max_p = min(p + LIST_GRANULARITY - 1, num_for_this_length)
             create_named_list(
+                named_lists,
                 lex,
-                len(qs),
+                max_p - min_p + 1,
                 i,
-                False,
-                json.dumps(qs),
-                friendly_number_map_german[i] + " mit ÄJÖQÜVXY",
+                True,
+                json.dumps([min_p, max_p]),
+                "{} ({} bis {})".format(friendly_number_map_german[i], p, max_p),
             )
 
-
-def create_french_lists():
-    lex = Lexicon.objects.get(lexiconName="FRA24")
-    for i in range(2, 15):
-        logger.debug("Creating WL for lex %s, length %s", lex.lexiconName, i)
-        length_counts = json.loads(lex.lengthCounts)
-        num_for_this_length = length_counts[str(i)]
-
-        create_named_list(
+    if i >= 4 and i <= 8:
+        create_searched_lists(
+            named_lists,
             lex,
-            num_for_this_length,
             i,
-            True,
-            json.dumps([1, num_for_this_length]),
-            "Les " + friendly_number_map_french[i],
-        )
-        if i >= 7 and i <= 9:
-            # create 'every x' list
-            for p in range(1, num_for_this_length + 1, LIST_GRANULARITY):
-                min_p = p
-                max_p = min(p + LIST_GRANULARITY - 1, num_for_this_length)
-                create_named_list(
-                    lex,
-                    max_p - min_p + 1,
-                    i,
-                    True,
-                    json.dumps([min_p, max_p]),
-                    "{} ({} à {})".format(friendly_number_map_french[i], p, max_p),
+            [
+                (
+                    friendly_number_map_german[i] + " mit ÄJÖQÜVXY",
+                    [
+                        SearchDescription.lexicon(lex),
+                        SearchDescription.matching_anagram(
+                            "[ÄJÖQÜVXY]" + "?" * (i - 1)
+                        ),
+                    ],
                 )
+            ],
+        )
+    return named_lists
 
-        if i >= 4 and i <= 8:
-            qs = word_search(
-                [
-                    SearchDescription.lexicon(lex),
-                    SearchDescription.matching_anagram("[JKQWXYZ]" + "?" * (i - 1)),
-                ]
-            ).to_python()
+
+def create_french_lists(i, lex):
+    logger.debug("Creating WL for lex %s, length %s", lex.lexiconName, i)
+    length_counts = json.loads(lex.lengthCounts)
+    num_for_this_length = length_counts[str(i)]
+    named_lists = []
+
+    create_named_list(
+        named_lists,
+        lex,
+        num_for_this_length,
+        i,
+        True,
+        json.dumps([1, num_for_this_length]),
+        "Les " + friendly_number_map_french[i],
+    )
+    if i >= 7 and i <= 9:
+        # create 'every x' list
+        for p in range(1, num_for_this_length + 1, LIST_GRANULARITY):
+            min_p = p
+            max_p = min(p + LIST_GRANULARITY - 1, num_for_this_length)
             create_named_list(
+                named_lists,
                 lex,
-                len(qs),
+                max_p - min_p + 1,
                 i,
-                False,
-                json.dumps(qs),
+                True,
+                json.dumps([min_p, max_p]),
+                "{} ({} à {})".format(friendly_number_map_french[i], p, max_p),
+            )
+
+    searches = []
+    if i >= 4 and i <= 8:
+        searches.append(
+            (
                 friendly_number_map_french[i] + " avec JKQWXYZ",
+                [
+                    SearchDescription.lexicon(lex),
+                    SearchDescription.matching_anagram(
+                        "[JKQWXYZ]" + "?" * (i - 1)
+                    ),
+                ],
             )
+        )
 
-        # New words
-        qs = word_search(
+    # New words
+    searches.append(
+        (
+            "FRA24 {} pas dans FRA20".format(friendly_number_map[i]),
             [
                 SearchDescription.lexicon(lex),
                 SearchDescription.length(i, i),
                 SearchDescription.not_in_lexicon("update"),
-            ]
-        ).to_python()
-        create_named_list(
-            lex,
-            len(qs),
-            i,
-            False,
-            json.dumps(qs),
-            "FRA24 {} pas dans FRA20".format(friendly_number_map[i]),
+            ],
         )
+    )
+    create_searched_lists(named_lists, lex, i, searches)
+    return named_lists
 
 
 def create_common_words_lists():
@@ -587,23 +551,105 @@ def create_common_words_list(lname, friendly_name):
     nl.save()
 
 
+# The function that creates a lexicon's lists for one word length, and the
+# word lengths to run it for. Lexica not listed here get the English lists.
+LEXICON_LISTS = {
+    "FISE2": (create_spanish_lists, range(2, 16)),
+    "OSPS49": (create_polish_lists, range(2, 16)),
+    "Deutsch": (create_german_lists, range(2, 15)),
+    "FRA24": (create_french_lists, range(2, 15)),
+}
+ENGLISH_LISTS = (create_wl_lists, range(2, 16))
+BULK_CREATE_BATCH_SIZE = 100
+
+
+def generate_named_lists(lexica, workers):
+    """
+    Create the lists for every word length of every lexicon, running the
+    lengths (and lexica) concurrently in `workers` threads.
+
+    Returns (named lists, timings). The named lists are unsaved, in the
+    same order as generating them one length at a time would give; timings
+    maps each lexicon name to the wall-clock seconds its lists took.
+
+    """
+    jobs = []
+    for lex in lexica:
+        fn, lengths = LEXICON_LISTS.get(lex.lexiconName, ENGLISH_LISTS)
+        jobs.extend((fn, i, lex) for i in lengths)
+    started = {}
+    finished = {}
+    lock = threading.Lock()
+
+    def run(fn, i, lex):
+        t1 = time.time()
+        named_lists = fn(i, lex)
+        with lock:
+            name = lex.lexiconName
+            started[name] = min(started.get(name, t1), t1)
+            finished[name] = max(finished.get(name, t1), time.time())
+        return named_lists
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(run, *job) for job in jobs]
+        named_lists = [nl for f in futures for nl in f.result()]
+    timings = {name: finished[name] - started[name] for name in started}
+    return named_lists, timings
+
+
+def validate_named_lists(named_lists):
+    """
+    Validate all the lists before saving any of them. The lexica were
+    just fetched, so the per-list lexicon lookup is skipped.
+
+    """
+    errors = {}
+    for nl in named_lists:
+        try:
+            nl.full_clean(exclude=["lexicon"])
+        except ValidationError as e:
+            errors["{} {}".format(nl.lexicon.lexiconName, nl.name)] = e.messages
+    if errors:
+        raise CommandError(
+            "Invalid named lists: {}".format(
+                "; ".join("{}: {}".format(k, v) for k, v in errors.items())
+            )
+        )
+
+
 class Command(BaseCommand):
     help = """Populates database with named lists"""
 
-    def handle(self, **options):
-        import time
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "lexica",
+            nargs="*",
+            default=["NWL23", "CSW21"],
+            help="Lexicon names to (re)create the named lists of",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=4,
+            help="Word lengths to generate at once",
+        )
 
+    def handle(self, *args, **options):
         start = time.time()
-        NamedList.objects.filter(lexicon__lexiconName__in=["NWL23", "CSW21"]).delete()
-        for lex in Lexicon.objects.filter(lexiconName__in=["NWL23", "CSW21"]):
-            createNamedLists(lex)
-        # create_spanish_lists()
-        # NamedList.objects.filter(lexicon__lexiconName="OSPS44").delete()
-        # create_french_lists()
-        # for lex in Lexicon.objects.filter(lexiconName__in=["NWL20"]):
-        #     createNamedLists(lex)
-        # create_polish_lists()
-        # create_french_lists()
-        # NamedList.objects.filter(lexicon__lexiconName__in=["Deutsch"]).delete()
-        # create_german_lists()
-        print(f"Elapsed: {time.time()-start} s")
+        lexica = list(Lexicon.objects.filter(lexiconName__in=options["lexica"]))
+        named_lists, timings = generate_named_lists(lexica, options["workers"])
+        validate_named_lists(named_lists)
+        for nl in named_lists:
+            nl.pack()
+        # Swap the lists out in one go, so the lobby never sees a partial set.
+        with transaction.atomic():
+            NamedList.objects.filter(lexicon__in=lexica).delete()
+            NamedList.objects.bulk_create(
+                named_lists, batch_size=BULK_CREATE_BATCH_SIZE
+            )
+        if any(lex.lexiconName == "OWL2" for lex in lexica):
+            create_common_words_lists()
+        for name, elapsed in timings.items():
+            count = sum(1 for nl in named_lists if nl.lexicon.lexiconName == name)
+            self.stdout.write(f"{name}: {count} lists in {elapsed:.1f} s")
+        self.stdout.write(f"Elapsed: {time.time()-start} s")
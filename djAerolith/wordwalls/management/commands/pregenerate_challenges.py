@@ -0,0 +1,141 @@
+"""
+Create the daily challenges for today and the coming days ahead of time,
+so that the first player of the day doesn't wait for them to be generated.
+Meant to be run from cron, a little before midnight:
+
+    ./manage.py pregenerate_challenges --days 2 --workers 4
+
+Challenges that already exist are left alone, so it's safe to run as
+often as you like. The Week's Bingo Toughies are only made once their week
+is over, and special challenges are made by hand, so neither is made
+ahead of time.
+
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
+
+from base.models import EXCLUDED_LEXICA, Lexicon
+from wordwalls.challenges import new_daily_challenge, toughies_challenge_date
+from wordwalls.models import DailyChallenge, DailyChallengeName
+
+logger = logging.getLogger(__name__)
+
+
+def challenges_to_create(names, lexica, dates, today):
+    """
+    The (name, lexicon, date) of every challenge for `dates` that doesn't
+    exist yet.
+
+    """
+    wanted = set()
+    for name in names:
+        for lex in lexica:
+            for ch_date in dates:
+                if name.name == DailyChallengeName.WEEKS_BINGO_TOUGHIES:
+                    ch_date = toughies_challenge_date(ch_date)
+                    if ch_date > today:
+                        continue
+                wanted.add((name, lex, ch_date))
+    if not wanted:
+        return []
+    existing = set(
+        DailyChallenge.objects.filter(
+            name__in=names,
+            lexicon__in=lexica,
+            date__range=(min(d for _, _, d in wanted), max(dates)),
+        ).values_list("name_id", "lexicon_id", "date")
+    )
+    return sorted(
+        (
+            (name, lex, ch_date)
+            for name, lex, ch_date in wanted
+            if (name.pk, lex.pk, ch_date) not in existing
+        ),
+        key=lambda c: (c[2], c[1].lexiconName, c[0].orderPriority, c[0].pk),
+    )
+
+
+def generate(name, lex, ch_date):
+    start = time.time()
+    try:
+        return new_daily_challenge(name, lex, ch_date), time.time() - start
+    finally:
+        # Toughies read the database from this thread.
+        connection.close()
+
+
+class Command(BaseCommand):
+    help = """Creates the daily challenges for the next few days"""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=2,
+            help="Number of days to create challenges for, starting today",
+        )
+        parser.add_argument(
+            "--lexica",
+            nargs="*",
+            help="Lexicon names (default: every lexicon in the lobby)",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=4,
+            help="Challenges to generate at once",
+        )
+
+    def handle(self, *args, **options):
+        start = time.time()
+        today = timezone.localtime(timezone.now()).date()
+        dates = [today + timedelta(days=i) for i in range(options["days"])]
+        if options["lexica"]:
+            lexica = Lexicon.objects.filter(lexiconName__in=options["lexica"])
+        else:
+            lexica = Lexicon.objects.exclude(lexiconName__in=EXCLUDED_LEXICA)
+        names = DailyChallengeName.objects.exclude(
+            orderPriority=DailyChallengeName.SPECIAL_CHALLENGE_ORDER_PRIORITY
+        )
+        todo = challenges_to_create(list(names), list(lexica), dates, today)
+        self.stdout.write(f"{len(todo)} challenges to create")
+
+        created = skipped = failed = 0
+        # The word DB calls run concurrently; saving happens here.
+        with ThreadPoolExecutor(max_workers=options["workers"]) as executor:
+            futures = {executor.submit(generate, *c): c for c in todo}
+            for future in as_completed(futures):
+                name, lex, ch_date = futures[future]
+                label = f"{ch_date} {name.name} ({lex.lexiconName})"
+                try:
+                    dc, elapsed = future.result()
+                except Exception:
+                    logger.exception("Error generating %s", label)
+                    self.stderr.write(f"{label}: failed")
+                    failed += 1
+                    continue
+                if dc is None:
+                    self.stdout.write(f"{label}: nothing to create")
+                    skipped += 1
+                    continue
+                try:
+                    with transaction.atomic():
+                        dc.save()
+                except IntegrityError:
+                    # Someone requested it while we were generating it.
+                    self.stdout.write(f"{label}: already created")
+                    skipped += 1
+                    continue
+                self.stdout.write(f"{label}: {elapsed:.2f} s")
+                created += 1
+        self.stdout.write(
+            f"Created {created}, skipped {skipped}, failed {failed} "
+            f"in {time.time() - start:.1f} s"
+        )
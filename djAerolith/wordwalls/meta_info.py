@@ -0,0 +1,158 @@
+"""
+The challenge names and lexica the table page needs to create tables.
+
+These change only when an admin edits a DailyChallengeName or a Lexicon,
+so the payload is built once and kept in process memory, with a copy in
+the shared cache (WORDWALLS_META_INFO_CACHE) for other processes to pick
+up. Both copies are keyed by a version that lives in the shared cache;
+saving or deleting either model bumps it (once the transaction commits).
+
+A process holds on to its copy for up to WORDWALLS_META_INFO_CHECK_SECS
+before checking the shared version again. Changes made with
+`QuerySet.update()` don't send signals; call `invalidate_meta_info` after
+those.
+
+"""
+
+import hashlib
+import json
+import threading
+import time
+import uuid
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from base.models import EXCLUDED_LEXICA, Lexicon
+from wordwalls.models import DailyChallengeName
+
+VERSION_KEY = "wordwalls:meta_info:version"
+PAYLOAD_KEY = "wordwalls:meta_info:{}"
+
+MetaInfo = namedtuple("MetaInfo", ["version", "payload", "etag", "checked"])
+
+_local = None
+_local_lock = threading.Lock()
+
+
+def _cache():
+    return caches[settings.WORDWALLS_META_INFO_CACHE]
+
+
+def build_meta_info():
+    """Build the payload from the database."""
+    challenge_info = []
+    exclude_priority = DailyChallengeName.SPECIAL_CHALLENGE_ORDER_PRIORITY
+
+    for i in DailyChallengeName.objects.exclude(orderPriority=exclude_priority):
+        challenge_info.append(
+            {
+                "id": i.pk,
+                "seconds": i.timeSecs,
+                "numQuestions": i.num_questions,
+                "name": i.name,
+                "orderPriority": i.orderPriority,
+            }
+        )
+
+    lexica = []
+    for l in Lexicon.objects.exclude(lexiconName__in=EXCLUDED_LEXICA):
+        lexica.append(
+            {
+                "id": l.pk,
+                "lexicon": l.lexiconName,
+                "description": l.lexiconDescription,
+                "lengthCounts": json.loads(l.lengthCounts),
+            }
+        )
+    return {"challenge_info": challenge_info, "lexica": lexica}
+
+
+def _etag(payload):
+    serialized = json.dumps(payload, sort_keys=True).encode("utf-8")
+    return hashlib.sha1(serialized).hexdigest()
+
+
+def _shared_version(cache):
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, uuid.uuid4().hex, None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def get_meta_info():
+    """Return the current MetaInfo (version, payload, etag, checked)."""
+    global _local
+    local = _local
+    now = time.monotonic()
+    max_age = settings.WORDWALLS_META_INFO_CHECK_SECS
+    if local is not None and now - local.checked < max_age:
+        return local
+    with _local_lock:
+        cache = _cache()
+        version = _shared_version(cache)
+        if _local is not None and version is not None and _local.version == version:
+            _local = _local._replace(checked=now)
+            return _local
+        shared = cache.get(PAYLOAD_KEY.format(version)) if version else None
+        if shared is not None:
+            payload, etag = shared
+        else:
+            payload = build_meta_info()
+            etag = _etag(payload)
+            if version is not None:
+                cache.set(PAYLOAD_KEY.format(version), (payload, etag), None)
+        _local = MetaInfo(version, payload, etag, now)
+        return _local
+
+
+def get_create_meta_info():
+    """Return meta info for table creation."""
+    return get_meta_info().payload
+
+
+def meta_info_etag():
+    return get_meta_info().etag
+
+
+def _clear_local():
+    global _local
+    with _local_lock:
+        _local = None
+
+
+def _bump_version():
+    _cache().set(VERSION_KEY, uuid.uuid4().hex, None)
+    _clear_local()
+
+
+def invalidate_meta_info():
+    """
+    Forget the meta info everywhere. This process stops using its copy
+    right away; other processes once the current transaction commits, so
+    they can't rebuild it from data they can't see yet.
+
+    """
+    _clear_local()
+    transaction.on_commit(_bump_version)
+
+
+def _model_changed(sender, **kwargs):
+    invalidate_meta_info()
+
+
+for _model in (DailyChallengeName, Lexicon):
+    post_save.connect(
+        _model_changed,
+        _model,
+        dispatch_uid="meta_info_save_{}".format(_model.__name__),
+    )
+    post_delete.connect(
+        _model_changed,
+        _model,
+        dispatch_uid="meta_info_delete_{}".format(_model.__name__),
+    )
@@ -0,0 +1,55 @@
+from django.db import migrations, models
+
+# Rank every existing entry on its board, the same way
+# wordwalls.leaderboards.rank_board does.
+BACKFILL_RANKS = """
+UPDATE wordwalls_dailychallengeleaderboardentry e
+SET rank_errors = r.rank_errors, rank_time = r.rank_time
+FROM (
+    SELECT id,
+        ROW_NUMBER() OVER (
+            PARTITION BY board_id
+            ORDER BY score DESC, wrong_answers, "timeRemaining" DESC, id
+        ) AS rank_errors,
+        ROW_NUMBER() OVER (
+            PARTITION BY board_id
+            ORDER BY score DESC, "timeRemaining" DESC, wrong_answers, id
+        ) AS rank_time
+    FROM wordwalls_dailychallengeleaderboardentry
+) r
+WHERE e.id = r.id
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wordwalls', '0015_dailychallengeleaderboardentry_wrong_answers'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dailychallengeleaderboardentry',
+            name='rank_errors',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='dailychallengeleaderboardentry',
+            name='rank_time',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='dailychallengeleaderboardentry',
+            index=models.Index(
+                fields=['board', 'rank_errors'],
+                name='wordwalls_lbe_rank_errors',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='dailychallengeleaderboardentry',
+            index=models.Index(
+                fields=['board', 'rank_time'], name='wordwalls_lbe_rank_time'
+            ),
+        ),
+        migrations.RunSQL(BACKFILL_RANKS, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,30 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0011_auto_20190124_2058'),
+        ('wordwalls', '0016_leaderboard_entry_ranks'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AlphagramStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('alphagram_string', models.CharField(max_length=15)),
+                ('week', models.DateField()),
+                ('times_asked', models.IntegerField(default=0)),
+                ('times_missed', models.IntegerField(default=0)),
+                ('last_seen', models.DateField()),
+                ('lexicon', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='base.lexicon')),
+            ],
+            options={
+                'verbose_name': 'Alphagram Stats',
+                'verbose_name_plural': 'Alphagram Stats',
+                'unique_together': {('lexicon', 'week', 'alphagram_string')},
+            },
+        ),
+    ]
@@ -0,0 +1,55 @@
+import json
+
+from django.db import migrations, models
+
+from lib.packing import pack_questions, unpack_questions
+
+# Packed lists are read a range at a time with SUBSTR, which on a
+# compressed value has to decompress it up to the end of the range. Keep
+# the questions out of line but uncompressed; this has to be set before
+# the lists are packed (written) below.
+SET_STORAGE = ('ALTER TABLE wordwalls_namedlist '
+               'ALTER COLUMN "questions" SET STORAGE {}')
+
+
+def pack_named_lists(apps, schema_editor):
+    NamedList = apps.get_model('wordwalls', 'NamedList')
+    pks = NamedList.objects.filter(isRange=False).values_list('pk', flat=True)
+    for pk in pks:
+        # One at a time; some of these are big.
+        nl = NamedList.objects.get(pk=pk)
+        questions = json.loads(nl.questions)
+        if not all(isinstance(q, dict) for q in questions):
+            # The old common words lists hold alphagram pks.
+            continue
+        nl.questions = pack_questions(questions)
+        nl.packed = True
+        nl.save(update_fields=['questions', 'packed'])
+
+
+def unpack_named_lists(apps, schema_editor):
+    NamedList = apps.get_model('wordwalls', 'NamedList')
+    pks = NamedList.objects.filter(packed=True).values_list('pk', flat=True)
+    for pk in pks:
+        nl = NamedList.objects.get(pk=pk)
+        nl.questions = json.dumps(unpack_questions(nl.questions))
+        nl.packed = False
+        nl.save(update_fields=['questions', 'packed'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wordwalls', '0017_alphagramstats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='namedlist',
+            name='packed',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunSQL(SET_STORAGE.format('EXTERNAL'),
+                          SET_STORAGE.format('EXTENDED')),
+        migrations.RunPython(pack_named_lists, unpack_named_lists),
+    ]
@@ -15,13 +15,15 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 # To contact the author, please email delsolar at gmail dot com
+import json
 import logging
 
 from django.db import models
 from django.contrib.auth.models import User
 
-from base.models import Lexicon, WordList
+from base.models import ColumnReader, Lexicon, WordList
 from base.validators import named_list_format_validator
+from lib.packing import PackedQuestions, pack_questions
 from tablegame.models import GenericTableGameModel
 
 logger = logging.getLogger(__name__)
@@ -116,6 +118,10 @@ class DailyChallengeLeaderboardEntry(models.Model):
     timeRemaining = models.IntegerField()
     # only qualify for award if entry is in allowable range
     qualifyForAward = models.BooleanField(default=True)
+    # Position on the board (1 is best) under each tiebreaker. Kept up to
+    # date as entries are added; see wordwalls/leaderboards.py.
+    rank_errors = models.IntegerField(null=True, blank=True)
+    rank_time = models.IntegerField(null=True, blank=True)
 
     def __str__(self):
         return "{0} --- {1} {2} ({3} s.)".format(
@@ -130,6 +136,12 @@ class DailyChallengeLeaderboardEntry(models.Model):
         # There is only one leaderboard per challenge, and only one
         # user/leaderboard combination allowed in the leaderboard
         # entries
+        indexes = [
+            models.Index(
+                fields=["board", "rank_errors"], name="wordwalls_lbe_rank_errors"
+            ),
+            models.Index(fields=["board", "rank_time"], name="wordwalls_lbe_rank_time"),
+        ]
 
 
 class WordwallsGameModel(GenericTableGameModel):
@@ -164,13 +176,80 @@ class DailyChallengeMissedBingos(models.Model):
         )
 
 
+class AlphagramStats(models.Model):
+    """
+    How often an alphagram was asked and missed in the daily 7s and 8s,
+    by qualifying players, for one lexicon and toughies week. Kept up to
+    date as players finish; see wordwalls/alphagram_stats.py.
+
+    """
+
+    lexicon = models.ForeignKey(Lexicon, on_delete=models.CASCADE)
+    alphagram_string = models.CharField(max_length=15)
+    # The date of the Week's Bingo Toughies challenge that these count
+    # towards (the challenges of the 7 days before it).
+    week = models.DateField()
+    times_asked = models.IntegerField(default=0)
+    times_missed = models.IntegerField(default=0)
+    last_seen = models.DateField()
+
+    class Meta:
+        unique_together = ("lexicon", "week", "alphagram_string")
+        verbose_name = "Alphagram Stats"
+        verbose_name_plural = "Alphagram Stats"
+
+    def __str__(self):
+        return "%s, %s, %d/%d" % (
+            self.alphagram_string,
+            self.week,
+            self.times_missed,
+            self.times_asked,
+        )
+
+
 class NamedList(models.Model):
     lexicon = models.ForeignKey(Lexicon, on_delete=models.CASCADE)
     name = models.CharField(max_length=50, default="")
     numQuestions = models.IntegerField()
     wordLength = models.IntegerField()
     isRange = models.BooleanField()
+    # A JSON [min, max] probability range if isRange, else the questions;
+    # as JSON, or packed (see lib/packing.py) so that a part of the list
+    # can be read without decoding it all. Defer it to read just a part.
     questions = models.TextField(validators=[named_list_format_validator])
+    packed = models.BooleanField(default=False)
+
+    def get_questions(self):
+        """The range, or all questions as a list of {'q': .., 'a': [..]}."""
+        if self.packed:
+            return PackedQuestions(self.questions).tolist()
+        return json.loads(self.questions)
+
+    def questions_slice(self, start, stop):
+        """Return questions [start, stop) of a list that isn't a range."""
+        if self.packed:
+            source = self.questions
+            if "questions" in self.get_deferred_fields():
+                source = ColumnReader(self, "questions")
+            return PackedQuestions(source).slice(start, stop)
+        return json.loads(self.questions)[start:stop]
+
+    def pack(self):
+        """Pack the questions of a list that isn't a range. Doesn't save."""
+        if self.packed or self.isRange:
+            return
+        questions = json.loads(self.questions)
+        if not all(isinstance(q, dict) for q in questions):
+            # The old common words lists hold alphagram pks.
+            return
+        self.questions = pack_questions(questions)
+        self.packed = True
+
+    def clean_fields(self, exclude=None):
+        # The format validator only understands JSON lists.
+        if self.packed:
+            exclude = list(exclude or []) + ["questions"]
+        super().clean_fields(exclude=exclude)
 
 
 class Medal(models.Model):
@@ -0,0 +1,95 @@
+"""
+Expand the questions of a table's next round in the background, so that
+starting the round doesn't wait on the word DB.
+
+When a round ends or a list is loaded, the game hands the next round's
+questions to a small thread pool, and keeps the pending result in process
+memory, keyed by word list and question index. start_quiz takes it from
+there if the round it's starting is made of the same questions, waiting
+for it if it's still being expanded; otherwise, or if this process
+didn't prefetch it, it expands the questions itself.
+
+Prefetched rounds expire after WORDWALLS_PREFETCH_TTL seconds, and at
+most WORDWALLS_PREFETCH_CACHE_SIZE are kept. Turn prefetching off with
+WORDWALLS_PREFETCH = False.
+
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+from lib.lru import LRUCache
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_rounds = None
+_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.WORDWALLS_PREFETCH_WORKERS,
+                    thread_name_prefix="round-prefetch",
+                )
+    return _executor
+
+
+def _get_rounds():
+    global _rounds
+    if _rounds is None:
+        with _lock:
+            if _rounds is None:
+                _rounds = LRUCache(
+                    settings.WORDWALLS_PREFETCH_CACHE_SIZE,
+                    ttl=settings.WORDWALLS_PREFETCH_TTL,
+                )
+    return _rounds
+
+
+def start_prefetch(word_list_id, question_index, qs, load, *args):
+    """
+    Start `load(*args)` in the background, to expand the round of the
+    word list that starts at `question_index` and is made of the question
+    indices `qs`. Returns the future.
+
+    `load` runs in another thread, so it must not use the database.
+
+    """
+    future = _get_executor().submit(load, *args)
+    _get_rounds().set((word_list_id, question_index), (qs, future))
+    return future
+
+
+def take_prefetched(word_list_id, question_index, qs):
+    """
+    The prefetched questions for the round starting at `question_index`,
+    if it was prefetched with the same question indices `qs`; else None.
+
+    """
+    key = (word_list_id, question_index)
+    rounds = _get_rounds()
+    pending = rounds.get(key)
+    if pending is None:
+        return None
+    rounds.delete(key)
+    prefetched_qs, future = pending
+    if prefetched_qs != qs:
+        future.cancel()
+        return None
+    try:
+        return future.result(timeout=settings.WORD_DB_TIMEOUT)
+    except Exception:
+        logger.exception("Prefetching round %s failed", key)
+        return None
+
+
+def prefetch_stats():
+    return _get_rounds().stats()
@@ -0,0 +1,126 @@
+"""
+Helpers for the answer state of a Wordwalls round.
+
+A round in progress is described by these keys of the game state:
+
+    questions - [{'a': alphagram, 'ws': [word, ...]}, ...], the questions
+        in this round. Every answer is stored exactly once, here.
+    questionIndices - [idx, ...], parallel to `questions`; the index of
+        each question in the word list's origQuestions.
+    solvers - {word: username} for every answer solved so far. This is
+        the solved set; an answer is unsolved iff it is not in here.
+    numAnswersThisRound - the total number of answers in `questions`.
+
+Older states instead kept an `answerHash` of unsolved answers plus an
+`originalAnswerHash` copy of it, each mapping word -> [alphagram, idx].
+`upgrade_state` converts those, so tables that were in the middle of a
+round keep working.
+
+"""
+
+import threading
+from collections import OrderedDict
+
+
+def new_round_state(questions, question_indices):
+    """
+    Return the round keys for a new round.
+
+    questions - [{'a': alphagram, 'ws': [word, ...]}, ...]
+    question_indices - the origQuestions index of each question.
+
+    """
+    return {
+        "questions": questions,
+        "questionIndices": question_indices,
+        "solvers": {},
+        "numAnswersThisRound": sum(len(q["ws"]) for q in questions),
+    }
+
+
+def upgrade_state(state):
+    """
+    Convert a state with an answerHash to the current format, in place.
+    Returns the state.
+
+    """
+    if "answerHash" not in state:
+        return state
+    answer_hash = state.pop("answerHash")
+    original = state.pop("originalAnswerHash", None) or answer_hash
+    solvers = state.setdefault("solvers", {})
+    if state.get("quizGoing"):
+        for word in original:
+            if word not in answer_hash and word not in solvers:
+                solvers[word] = "Anonymous"
+    if "questionIndices" in state:
+        return state
+    questions = state.get("questions")
+    if questions is not None:
+        indices = []
+        for q in questions:
+            # A question always has at least one answer.
+            indices.append(original[q["ws"][0]][1])
+    else:
+        by_index = OrderedDict()
+        for word, (alphagram, idx) in original.items():
+            by_index.setdefault(idx, {"a": alphagram, "ws": []})["ws"].append(word)
+        questions = list(by_index.values())
+        indices = list(by_index.keys())
+        state["questions"] = questions
+    state["questionIndices"] = indices
+    return state
+
+
+# The word -> question lookup for a round is derived from `questions`, so
+# it's not stored in the state. Keep the ones we've built for recent rounds
+# so that a guess is a dictionary lookup rather than a scan of the round.
+_MAX_INDEXES = 512
+_indexes = OrderedDict()
+_indexes_lock = threading.Lock()
+
+
+def _build_answer_index(questions):
+    index = {}
+    for pos, q in enumerate(questions):
+        for w in q["ws"]:
+            index[w] = pos
+    return index
+
+
+def answer_index(state, tablenum):
+    """
+    Return a {word: position in state['questions']} dictionary for the
+    current round of table `tablenum`.
+
+    """
+    key = (int(tablenum), state["quizStartTime"])
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is not None:
+            _indexes.move_to_end(key)
+            return index
+    index = _build_answer_index(state["questions"])
+    with _indexes_lock:
+        _indexes[key] = index
+        if len(_indexes) > _MAX_INDEXES:
+            _indexes.popitem(last=False)
+    return index
+
+
+def num_unsolved(state):
+    return state["numAnswersThisRound"] - len(state["solvers"])
+
+
+def unsolved_answers(state):
+    """Yield (word, alphagram, origQuestions index) for unsolved answers."""
+    solvers = state["solvers"]
+    for q, idx in zip(state["questions"], state["questionIndices"]):
+        for w in q["ws"]:
+            if w not in solvers:
+                yield w, q["a"], idx
+
+
+def missed_question_indices(state):
+    """The origQuestions indices of questions with an unsolved answer."""
+    return {idx for _, _, idx in unsolved_answers(state)}
@@ -0,0 +1,175 @@
+"""
+Stores for the live state of a Wordwalls round.
+
+The state of a table (answers left, who solved what, etc) changes on every
+correct guess. The default store writes it straight back to
+`currentGameState`, which means loading and re-serializing the whole blob
+for every guess. The other stores keep the state of a round in progress
+somewhere cheaper, and the game only writes it to the database at round
+boundaries (start_quiz, the end of a round, and save).
+
+Select a store with the WORDWALLS_TABLE_STATE_BACKEND setting:
+
+    db - the database; every guess is written to currentGameState.
+    locmem - process memory. Only use this if a single process serves
+        all requests for a table (e.g. one gunicorn worker with threads),
+        since a different process will not see the live state.
+    cache - a Django cache (WORDWALLS_TABLE_STATE_CACHE). Point this at a
+        shared cache such as Redis or Memcached when running more than one
+        worker.
+
+"""
+
+import contextlib
+import json
+import logging
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+
+from wordwalls.models import WordwallsGameModel
+
+logger = logging.getLogger(__name__)
+
+
+class TableStateLockTimeout(Exception):
+    pass
+
+
+class DatabaseTableStateStore(object):
+    """
+    Keeps no state of its own; the database is always the source of truth.
+    Callers lock the row with `select_for_update` (see WordwallsGame.get_wgm),
+    so `lock` does nothing here.
+
+    """
+
+    def lock(self, tablenum):
+        return contextlib.nullcontext()
+
+    def get(self, tablenum):
+        """Return the live state of a round in progress, or None."""
+        return None
+
+    def set(self, tablenum, state):
+        """Write the state of a round in progress."""
+        WordwallsGameModel.objects.filter(pk=tablenum).update(
+            currentGameState=json.dumps(state), lastActivity=timezone.now()
+        )
+
+    def hold(self, tablenum, state):
+        """
+        A round just started. `state` has already been written to the
+        database.
+
+        """
+
+    def release(self, tablenum):
+        """
+        The database now has the latest state for this table (the round
+        ended, or a new list was loaded). Forget any live state.
+
+        """
+
+
+class LocalMemoryTableStateStore(DatabaseTableStateStore):
+    """Live state in a dictionary in process memory."""
+
+    NUM_LOCKS = 64
+
+    def __init__(self):
+        self._states = {}
+        # Striped locks, so we don't keep one lock per table forever.
+        self._locks = [threading.Lock() for _ in range(self.NUM_LOCKS)]
+
+    def lock(self, tablenum):
+        return self._locks[int(tablenum) % self.NUM_LOCKS]
+
+    def get(self, tablenum):
+        return self._states.get(int(tablenum))
+
+    def set(self, tablenum, state):
+        self._states[int(tablenum)] = state
+
+    def hold(self, tablenum, state):
+        self.set(tablenum, state)
+
+    def release(self, tablenum):
+        self._states.pop(int(tablenum), None)
+
+
+class CacheTableStateStore(DatabaseTableStateStore):
+    """Live state in a (possibly shared) Django cache."""
+
+    LOCK_TIMEOUT = 10
+    LOCK_POLL_INTERVAL = 0.005
+
+    def __init__(self, alias, timeout):
+        self._cache = caches[alias]
+        self._timeout = timeout
+
+    def _key(self, tablenum):
+        return "wwstate:{}".format(int(tablenum))
+
+    @contextlib.contextmanager
+    def lock(self, tablenum):
+        key = self._key(tablenum) + ":lock"
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + self.LOCK_TIMEOUT
+        while not self._cache.add(key, token, self.LOCK_TIMEOUT):
+            if time.monotonic() > deadline:
+                raise TableStateLockTimeout(
+                    "Timed out waiting for table {}".format(tablenum)
+                )
+            time.sleep(self.LOCK_POLL_INTERVAL)
+        try:
+            yield
+        finally:
+            if self._cache.get(key) == token:
+                self._cache.delete(key)
+
+    def get(self, tablenum):
+        return self._cache.get(self._key(tablenum))
+
+    def set(self, tablenum, state):
+        self._cache.set(self._key(tablenum), state, self._timeout)
+
+    def hold(self, tablenum, state):
+        self.set(tablenum, state)
+
+    def release(self, tablenum):
+        self._cache.delete(self._key(tablenum))
+
+
+def create_table_state_store(backend):
+    if backend == "db":
+        return DatabaseTableStateStore()
+    elif backend == "locmem":
+        return LocalMemoryTableStateStore()
+    elif backend == "cache":
+        return CacheTableStateStore(
+            settings.WORDWALLS_TABLE_STATE_CACHE,
+            settings.WORDWALLS_TABLE_STATE_TIMEOUT,
+        )
+    raise ValueError("Unknown table state backend: {}".format(backend))
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_table_state_store():
+    """Return the process-wide table state store."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = create_table_state_store(
+                    settings.WORDWALLS_TABLE_STATE_BACKEND
+                )
+                logger.info("Using table state store %s", _store)
+    return _store
@@ -2,14 +2,22 @@ import json
 import logging
 from datetime import date
 
+from django.contrib.auth.models import User
 from django.test import TestCase, Client, RequestFactory
 from django.db import connection
 from django.utils import timezone
 
-from base.models import WordList
+from base.models import Lexicon, WordList
 from wordwalls.api import date_from_request_dict
-from wordwalls.models import WordwallsGameModel
+from wordwalls.leaderboards import TIEBREAKERS, add_entry, entry_rank
+from wordwalls.models import (
+    DailyChallengeLeaderboard,
+    DailyChallengeLeaderboardEntry,
+    Medal,
+    WordwallsGameModel,
+)
 from wordwalls.game import WordwallsGame
+from wordwalls import meta_info
 
 logger = logging.getLogger(__name__)
 
@@ -439,3 +447,110 @@ class WordwallsLeaderboardTest(TestCase):
                 },
             ],
         )
+
+    def test_leaderboard_medals(self):
+        url = "/wordwalls/api/challengers/?lexicon=15&challenge=7&date=2015-10-13"
+        self.client.get(url)
+        lbe = DailyChallengeLeaderboardEntry.objects.get(
+            board__challenge__name__pk=7,
+            board__challenge__date=date(2015, 10, 13),
+            board__challenge__lexicon__pk=15,
+            user__username="user_541",
+        )
+        Medal.objects.create(
+            user=lbe.user, leaderboard=lbe.board, medal_type=Medal.TYPE_GOLD
+        )
+        loaded = json.loads(self.client.get(url).content)
+        self.assertEqual(loaded["entries"][0]["user"], "user_541")
+        self.assertEqual(json.loads(loaded["entries"][0]["addl"]), {"medal": "Gold"})
+        self.assertEqual(loaded["entries"][1]["addl"], None)
+
+    def test_leaderboard_page(self):
+        url = "/wordwalls/api/challengers/?lexicon=15&challenge=7&date=2015-10-13"
+        full = json.loads(self.client.get(url).content)["entries"]
+        page = json.loads(self.client.get(url + "&offset=2&limit=3").content)
+        self.assertEqual(page["entries"], full[2:5])
+
+    def test_leaderboard_add_entry_ranks(self):
+        lb = DailyChallengeLeaderboard.objects.get(
+            challenge__name__pk=7,
+            challenge__date=date(2015, 10, 13),
+            challenge__lexicon__pk=15,
+        )
+        user = User.objects.get(username=self.USER)
+        DailyChallengeLeaderboardEntry.objects.filter(board=lb, user=user).delete()
+        # Ties user_541 on score and errors, with less time left.
+        add_entry(
+            DailyChallengeLeaderboardEntry(
+                board=lb, user=user, score=58, wrong_answers=0, timeRemaining=50
+            )
+        )
+        self.assertEqual(entry_rank(lb, user, "errors"), 2)
+        url = "/wordwalls/api/challengers/?lexicon=15&challenge=7&date=2015-10-13"
+        for tiebreaker in ("errors", "time"):
+            entries = json.loads(
+                self.client.get(url + "&tiebreaker=" + tiebreaker).content
+            )["entries"]
+            ranks = DailyChallengeLeaderboardEntry.objects.filter(board=lb).order_by(
+                *TIEBREAKERS[tiebreaker]
+            )
+            self.assertEqual(
+                [e["user"] for e in entries], [r.user.username for r in ranks]
+            )
+
+    def test_leaderboard_entry_save_reranks(self):
+        lb = DailyChallengeLeaderboard.objects.get(
+            challenge__name__pk=7,
+            challenge__date=date(2015, 10, 13),
+            challenge__lexicon__pk=15,
+        )
+        entries = DailyChallengeLeaderboardEntry.objects.filter(board=lb)
+        last = entries.order_by(*TIEBREAKERS["errors"]).last()
+        best = entries.order_by(*TIEBREAKERS["errors"]).first()
+        self.assertNotEqual(entry_rank(lb, last.user, "errors"), 1)
+        last.score = best.score + 1
+        last.save()
+        self.assertEqual(entry_rank(lb, last.user, "errors"), 1)
+        self.assertEqual(entry_rank(lb, best.user, "errors"), 2)
+
+
+class WordwallsMetaInfoTest(TestCase):
+    fixtures = [
+        "test/lexica.yaml",
+        "test/users.json",
+        "test/profiles.json",
+        "challenge_names.json",
+    ]
+
+    def setUp(self):
+        # The meta info is kept in process memory, so don't let one test
+        # see another's.
+        meta_info._clear_local()
+
+    def test_meta_info(self):
+        resp = self.client.get("/wordwalls/api/meta_info/")
+        self.assertEqual(resp.status_code, 200)
+        content = json.loads(resp.content)
+        self.assertIn("CSW21", [lex["lexicon"] for lex in content["lexica"]])
+        self.assertTrue(len(content["challenge_info"]) > 0)
+
+    def test_meta_info_not_modified(self):
+        resp = self.client.get("/wordwalls/api/meta_info/")
+        resp = self.client.get(
+            "/wordwalls/api/meta_info/", HTTP_IF_NONE_MATCH=resp["ETag"]
+        )
+        self.assertEqual(resp.status_code, 304)
+
+    def test_meta_info_invalidated_on_save(self):
+        resp = self.client.get("/wordwalls/api/meta_info/")
+        etag = resp["ETag"]
+        lex = Lexicon.objects.get(lexiconName="CSW21")
+        lex.lexiconDescription = "A new description"
+        lex.save()
+        resp = self.client.get("/wordwalls/api/meta_info/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 200)
+        descriptions = {
+            lex["lexicon"]: lex["description"]
+            for lex in json.loads(resp.content)["lexica"]
+        }
+        self.assertEqual(descriptions["CSW21"], "A new description")
@@ -2,7 +2,8 @@ import unittest
 from datetime import date
 
 from wordwalls.challenges import toughies_challenge_date
-from base.models import alphagrammize
+from base.models import alphagrammize, alphagrammize_words
+from base.utils import UserListParseException, get_alphas_from_words
 
 
 class ChallengeDatesTestCase(unittest.TestCase):
@@ -26,3 +27,26 @@ class AlphagrammizeTestCase(unittest.TestCase):
         self.assertEqual(alphagrammize('PRENTICE'), 'CEEINPRT')
         self.assertEqual(alphagrammize('1ARMAQUITO'), 'AA1IMOQRTU')
         self.assertEqual(alphagrammize('ÑOÑE3IN1AS'), 'A1EINÑÑO3S')
+        self.assertEqual(alphagrammize('żółw'), 'ŁÓWŻ')
+
+    def test_alphagrammize_words(self):
+        words = ['BILLOWY', '1ARMAQUITO', 'ÑOÑE3IN1AS', 'ca2e', 'źdźbło',
+                 'ĄĆĘŁŃÓŚŹŻ', 'ZAŻÓŁĆ', 'GĘŚLĄ', 'JAŹŃ', '', 'A?']
+        self.assertEqual(alphagrammize_words(words),
+                         [alphagrammize(w) for w in words])
+        self.assertEqual(alphagrammize_words([]), [])
+        with self.assertRaises(KeyError) as ctx:
+            alphagrammize_words(['AB', 'C-D'])
+        self.assertEqual(ctx.exception.args[0], '-')
+
+    def test_get_alphas_from_words(self):
+        self.assertEqual(
+            sorted(get_alphas_from_words('CHOLLO\n1O2O\r\nżółw\nA\n\n1O2O',
+                                         10)),
+            ['12OO', 'CHLLOO', 'ŁÓWŻ'])
+        with self.assertRaisesRegex(UserListParseException, 'invalid'):
+            get_alphas_from_words('CAT\nDOG!', 10)
+        with self.assertRaisesRegex(UserListParseException, 'non-word'):
+            get_alphas_from_words('ABCDEFGHIJKLMNOP\nDOG!', 10)
+        with self.assertRaisesRegex(UserListParseException, 'limit'):
+            get_alphas_from_words('CAT\nDOG\nEMU', 2)
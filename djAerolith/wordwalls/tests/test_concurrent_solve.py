@@ -65,8 +65,8 @@ class WordwallsConcurrentSolveTest(TransactionTestCase):
             t.join()
 
         st = wwg.state(table_id)
-        self.assertFalse(word in st['answerHash'])
-        self.assertTrue(word in st['originalAnswerHash'])
+        self.assertTrue(
+            any(word in q['ws'] for q in st['questions']))
         self.assertTrue(word in st['solvers'])
         self.assertTrue(
             st['solvers'][word] in ['cesar', 'user_4738', 'user_131'])
@@ -98,9 +98,6 @@ class WordwallsConcurrentSolveTest(TransactionTestCase):
             t.join()
 
         st = wwg.state(table_id)
-        self.assertFalse('ELATIONS' in st['answerHash'])
-        self.assertFalse('INSOLATE' in st['answerHash'])
-        self.assertFalse('TOENAILS' in st['answerHash'])
         self.assertTrue('ELATIONS' in st['solvers'])
         self.assertTrue('INSOLATE' in st['solvers'])
         self.assertTrue('TOENAILS' in st['solvers'])
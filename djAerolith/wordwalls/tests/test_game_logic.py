@@ -17,8 +17,31 @@ from django.utils import timezone
 from django.db import connection
 
 from base.forms import SavedListForm
+from wordwalls.alphagram_stats import (
+    record_challenge_result,
+    record_missed_bingos,
+    weekly_toughies,
+)
+from wordwalls import challenge_cache
+from wordwalls.challenges import (
+    gen_toughies_by_challenge,
+    generate_toughies_challenge,
+    toughies_week,
+)
 from wordwalls.game import WordwallsGame, GameInitException
-from wordwalls.models import DailyChallengeName, NamedList, DailyChallenge
+from wordwalls.management.commands.pregenerate_challenges import (
+    challenges_to_create,
+)
+from wordwalls.table_state import LocalMemoryTableStateStore
+from wordwalls.models import (
+    AlphagramStats,
+    DailyChallengeLeaderboard,
+    DailyChallengeLeaderboardEntry,
+    DailyChallengeMissedBingos,
+    DailyChallengeName,
+    NamedList,
+    DailyChallenge,
+)
 from wordwalls.tests.mixins import WordListAssertMixin
 from lib.wdb_interface.word_searches import SearchDescription
 from base.models import Lexicon, WordList
@@ -74,6 +97,20 @@ class WordwallsBasicLogicTest(WordwallsBasicLogicTestBase):
         self.assertTrue(guess_state["going"])
         self.assertEqual(guess_state["alphagram"], "")
 
+    def test_prefetched_round(self):
+        table_id, user = self.setup_quiz()
+        wwg = WordwallsGame()
+        word_list = wwg.get_wgm(table_id, lock=False).word_list
+        with self.settings(WORDWALLS_PREFETCH=True):
+            wwg.prefetch_next_round(word_list, 50).result()
+        with mock.patch("wordwalls.game.questions_from_alpha_dicts") as expand:
+            params = wwg.start_quiz(table_id, user)
+        expand.assert_not_called()
+        self.assertEqual(len(params["questions"]), 50)
+        self.assertEqual(
+            params["serverMsg"], "These are questions 1 through 50 of 81."
+        )
+
     @mock.patch.object(WordwallsGame, "did_timer_run_out")
     def test_quiz_ends_after_time(self, timer_ran_out):
         # Mock timer running out by the time the guess comes in.
@@ -117,12 +154,94 @@ class WordwallsBasicLogicTest(WordwallsBasicLogicTestBase):
         self.assertTrue({"q": "AEEINRSU", "a": ["UNEASIER"]} in qs)
 
 
+class WordwallsTableStateStoreTest(WordwallsBasicLogicTestBase):
+    """Live round state kept in memory, written at round boundaries."""
+
+    def test_state_persisted_at_round_end(self):
+        table_id, user = self.setup_quiz()
+        store = LocalMemoryTableStateStore()
+        wwg = WordwallsGame(table_state=store)
+        params = wwg.start_quiz(table_id, user)
+        words = [w["w"] for q in params["questions"] for w in q["ws"]]
+
+        guess_state = wwg.guess(words[0], table_id, user)
+        self.assertTrue(guess_state["going"])
+        # The guess only went to the store.
+        db_state = json.loads(wwg.get_wgm(table_id).currentGameState)
+        self.assertFalse(words[0] in db_state["solvers"])
+        self.assertTrue(words[0] in wwg.state(table_id)["solvers"])
+
+        for w in words[1:]:
+            guess_state = wwg.guess(w, table_id, user)
+        self.assertFalse(guess_state["going"])
+        self.assertIsNone(store.get(table_id))
+        db_state = json.loads(wwg.get_wgm(table_id).currentGameState)
+        self.assertFalse(db_state["quizGoing"])
+        self.assertEqual(db_state["solvers"], {})
+        self.assertEqual(wwg.get_wgm(table_id).word_list.questionIndex, 50)
+
+    def test_give_up_uses_live_state(self):
+        table_id, user = self.setup_quiz()
+        store = LocalMemoryTableStateStore()
+        wwg = WordwallsGame(table_state=store)
+        params = wwg.start_quiz(table_id, user)
+        solved = params["questions"][0]["ws"]
+        for w in solved:
+            wwg.guess(w["w"], table_id, user)
+        wwg.give_up(user, table_id)
+        word_list = wwg.get_wgm(table_id).word_list
+        # Everything but the question we solved was missed.
+        self.assertEqual(word_list.numMissed, 49)
+        self.assertFalse(params["questions"][0]["idx"] in json.loads(
+            word_list.missed))
+
+
 class WordwallsFullGameLogicTest(WordwallsBasicLogicTestBase):
     """
     Testing full games, make sure word lists save, missed plays, etc.
 
     """
 
+    @override_settings(WORD_LIST_PACK_THRESHOLD=1)
+    def test_packed_word_list(self):
+        table_id, user = self.setup_quiz()
+        wwg = WordwallsGame()
+        params = wwg.start_quiz(table_id, user)
+        word_list = wwg.get_wgm(table_id).word_list
+        self.assertEqual(word_list.version, 3)
+        orig_questions = word_list.get_orig_questions()
+        self.assertEqual(len(orig_questions), 81)
+        for q in params["questions"]:
+            self.assertEqual(orig_questions[q["idx"]]["q"], q["a"])
+        # Solve the first question and give up.
+        for w in params["questions"][0]["ws"]:
+            wwg.guess(w["w"], table_id, user)
+        wwg.give_up(user, table_id)
+        word_list = wwg.get_wgm(table_id).word_list
+        self.assertEqual(word_list.numMissed, 49)
+        self.assertEqual(
+            set(word_list.get_missed()),
+            set(q["idx"] for q in params["questions"][1:]),
+        )
+        self.assertEqual(word_list.to_python()["missed"], word_list.get_missed())
+
+    def test_large_json_word_list_packed_on_start(self):
+        table_id, user = self.setup_quiz()
+        wwg = WordwallsGame()
+        word_list = wwg.get_wgm(table_id).word_list
+        self.assertEqual(word_list.version, 2)
+        orig_questions = json.loads(word_list.origQuestions)
+        cur_questions = json.loads(word_list.curQuestions)
+        with self.settings(WORD_LIST_PACK_THRESHOLD=80):
+            params = wwg.start_quiz(table_id, user)
+        word_list = wwg.get_wgm(table_id).word_list
+        self.assertEqual(word_list.version, 3)
+        self.assertEqual(word_list.get_orig_questions(), orig_questions)
+        self.assertEqual(word_list.get_cur_questions(), cur_questions)
+        self.assertEqual(
+            set(q["idx"] for q in params["questions"]), set(cur_questions[:50])
+        )
+
     def test_solve_all_words(self):
         """
         Test on a word list with more than 50 words. Go to completion,
@@ -923,6 +1042,28 @@ class WordwallsChallengeBehaviorTest(WordwallsBasicLogicTestBase):
         # Blank bingos have a zero probability for their alphagram.
         self.assertTrue(params["questions"][0]["p"] == 0)
 
+    @override_settings(WORDWALLS_CHALLENGE_CACHE_SECS=60)
+    def test_challenge_cache(self):
+        challenge_cache.clear()
+        challenge = DailyChallengeName.objects.get(name="Today's 6s")
+        today = timezone.localtime(timezone.now()).date()
+        with self.captureOnCommitCallbacks() as callbacks:
+            table_id = self.wwg.initialize_daily_challenge(
+                self.user, self.lex, challenge, today
+            )
+        first = self.wwg.get_dc_id(table_id)
+        # The new challenge isn't cached until it's committed.
+        self.assertEqual(challenge_cache.cache_info().size, 0)
+        for callback in callbacks:
+            callback()
+        self.assertEqual(challenge_cache.cache_info().size, 1)
+        table_id = self.wwg.initialize_daily_challenge(
+            self.user, self.lex, challenge, today
+        )
+        self.assertEqual(self.wwg.get_dc_id(table_id), first)
+        self.assertEqual(challenge_cache.cache_info().hits, 1)
+        challenge_cache.clear()
+
     def test_play_old_challenge(self):
         """ Play an old challenge instead of creating a new one. """
         num_challenges = DailyChallenge.objects.count()
@@ -1020,6 +1161,9 @@ class WordwallsMissedBingosTest(WordwallsBasicLogicTestBase):
     challenge 40307, leaderboard 40128, answers: 58   Thurs 7s
     challenge 40313, leaderboard 40134, answers: 33   Thurs 8s
 
+    Six 8s tie for the last of their 25 places, at 18/34 missed; the
+    alphabetically first five make the cut.
+
     """
 
     fixtures = [
@@ -1057,7 +1201,7 @@ class WordwallsMissedBingosTest(WordwallsBasicLogicTestBase):
             "ADILMOSY",
             "ADEIMSTY",
             "DEELLORW",
-            "EGIILNRS",
+            "CEILORTY",
             "AACEEHRT",
             "EEILNOSV",
             "AABLLOR",
@@ -1125,6 +1269,131 @@ class WordwallsMissedBingosTest(WordwallsBasicLogicTestBase):
             set([q["q"] for q in questions]), self.expected_missed_bingos
         )
 
+    def test_challenges_to_create(self):
+        names = list(
+            DailyChallengeName.objects.filter(
+                name__in=["Today's 7s", "Week's Bingo Toughies"]
+            )
+        )
+        # Thurs 10/15 and Fri 10/16; the 7s of 10/15 exist already.
+        todo = challenges_to_create(
+            names,
+            [self.lex],
+            [date(2015, 10, 15), date(2015, 10, 16)],
+            date(2015, 10, 15),
+        )
+        self.assertEqual(
+            [(n.name, d) for n, _, d in todo],
+            [
+                ("Week's Bingo Toughies", date(2015, 10, 13)),
+                ("Today's 7s", date(2015, 10, 16)),
+            ],
+        )
+
+    def test_record_missed_bingos(self):
+        dc = DailyChallenge.objects.get(pk=40256)
+        missed = DailyChallengeMissedBingos.objects.filter(challenge=dc)
+        before = dict(missed.values_list("alphagram_string", "numTimesMissed"))
+        existing = next(iter(before))
+        record_missed_bingos(dc, {existing, "AEINRST"})
+        record_missed_bingos(dc, {"AEINRST"})
+        after = dict(missed.values_list("alphagram_string", "numTimesMissed"))
+        self.assertEqual(after[existing], before[existing] + 1)
+        self.assertEqual(after["AEINRST"], 2)
+
+    def test_weekly_stats_toughies(self):
+        dc = DailyChallenge.objects.get(pk=40256)  # Tues 7s
+        week = toughies_week(dc.date)
+        self.assertEqual(week, date(2015, 10, 20))
+        asked = {"AEINRST", "AEILNST", "ADEEIKS"}
+        record_challenge_result(dc, week, asked, {"AEINRST", "ADEEIKS"})
+        record_challenge_result(dc, week, asked, {"ADEEIKS"})
+        stats = AlphagramStats.objects.get(alphagram_string="ADEEIKS")
+        self.assertEqual((stats.times_asked, stats.times_missed), (2, 2))
+        self.assertEqual(
+            weekly_toughies(self.lex, 7, week, 25),
+            ["ADEEIKS", "AEINRST", "AEILNST"],
+        )
+        # The stats started this week, so they're missing what was played
+        # before; the toughies still come from the missed bingos.
+        by_challenge = []
+        for name in ("Today's 7s", "Today's 8s"):
+            by_challenge.extend(
+                gen_toughies_by_challenge(
+                    DailyChallengeName.objects.get(name=name),
+                    25,
+                    date(2015, 10, 13),
+                    date(2015, 10, 19),
+                    self.lex,
+                )
+            )
+        self.assertEqual(set(by_challenge), self.expected_missed_bingos)
+        self.assertEqual(
+            generate_toughies_challenge(self.lex, date(2015, 10, 22)), by_challenge
+        )
+        # Once the stats cover the whole week, its toughies come from them.
+        monday = DailyChallenge.objects.get(pk=40233)
+        record_challenge_result(monday, toughies_week(monday.date), {"AEINRST"}, set())
+        self.assertEqual(
+            generate_toughies_challenge(self.lex, date(2015, 10, 22)),
+            ["ADEEIKS", "AEINRST", "AEILNST"],
+        )
+
+    def test_toughies_query(self):
+        name = DailyChallengeName.objects.get(name="Today's 7s")
+        users = list(User.objects.all()[:4])
+
+        def challenge(day, qualifying, not_qualifying=0, leaderboard=True):
+            dc = DailyChallenge.objects.create(
+                lexicon=self.lex,
+                date=date(2030, 1, day),
+                name=name,
+                alphagrams="[]",
+                seconds=270,
+            )
+            if leaderboard:
+                lb = DailyChallengeLeaderboard.objects.create(challenge=dc, maxScore=50)
+                for i, user in enumerate(users[: qualifying + not_qualifying]):
+                    DailyChallengeLeaderboardEntry.objects.create(
+                        board=lb,
+                        user=user,
+                        score=10,
+                        timeRemaining=0,
+                        qualifyForAward=i < qualifying,
+                    )
+            return dc
+
+        def missed(dc, alphagram, times):
+            DailyChallengeMissedBingos.objects.create(
+                challenge=dc, alphagram_string=alphagram, numTimesMissed=times
+            )
+
+        two_players = challenge(1, 2, not_qualifying=1)
+        missed(two_players, "ADEEIKS", 2)
+        missed(two_players, "AEINRST", 1)
+        # AEINRST is also in here, and missed more often.
+        four_players = challenge(2, 4)
+        missed(four_players, "AEINRST", 3)
+        # Nobody qualified, so its misses don't count.
+        no_qualifiers = challenge(3, 0, not_qualifying=2)
+        missed(no_qualifiers, "EILNRST", 5)
+        # Without a leaderboard, its misses barely count.
+        no_leaderboard = challenge(4, 0, leaderboard=False)
+        missed(no_leaderboard, "AEILNST", 1)
+
+        self.assertEqual(
+            gen_toughies_by_challenge(
+                name, 25, date(2030, 1, 1), date(2030, 1, 7), self.lex
+            ),
+            ["ADEEIKS", "AEINRST", "AEILNST"],
+        )
+        self.assertEqual(
+            gen_toughies_by_challenge(
+                name, 2, date(2030, 1, 1), date(2030, 1, 7), self.lex
+            ),
+            ["ADEEIKS", "AEINRST"],
+        )
+
 
 class WordwallsNamedListTest(TestCase, WordListAssertMixin):
     """ "Named" lists. """
@@ -1229,3 +1498,23 @@ class WordwallsNamedListTest(TestCase, WordListAssertMixin):
         self.assertNotEqual(
             re.search(r"[JQXZ]", params["questions"][0]["a"]), None
         )
+
+    def test_packed_list_slice(self):
+        named_list = NamedList.objects.get(pk=3092)
+        questions = json.loads(named_list.questions)
+        named_list.pack()
+        named_list.save()
+        self.assertTrue(named_list.packed)
+        self.assertEqual(named_list.get_questions(), questions)
+        deferred = NamedList.objects.defer("questions").get(pk=3092)
+        self.assertEqual(deferred.questions_slice(0, 50), questions[:50])
+        self.assertEqual(deferred.questions_slice(650, 700), questions[650:])
+        table_id = self.wwg.initialize_by_named_list(
+            self.lex, self.user, NamedList.objects.get(pk=3092), 240
+        )
+        word_list = self.wwg.get_wgm(table_id).word_list
+        # The list is shuffled when it's loaded.
+        self.assertEqual(
+            sorted(word_list.get_orig_questions(), key=lambda q: q["q"]),
+            sorted(questions, key=lambda q: q["q"]),
+        )
@@ -0,0 +1,79 @@
+import threading
+from io import StringIO
+
+import mock
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from base.models import Lexicon
+from wordwalls.models import NamedList
+
+QUESTIONS = [{"q": "AEINRST", "a": ["RETAINS", "STAINER"]}]
+
+
+def fake_word_searches(bad_calls=0):
+    """
+    A stand-in for word_searches that finds QUESTIONS for every search,
+    except that the first `bad_calls` calls find a question with no
+    answers.
+
+    """
+    lock = threading.Lock()
+    calls = []
+
+    def word_searches(search_lists):
+        with lock:
+            calls.append(search_lists)
+            bad = len(calls) <= bad_calls
+        results = []
+        for _ in search_lists:
+            qs = mock.Mock()
+            qs.to_python.return_value = (
+                [{"q": "AEINRST", "a": []}] if bad else list(QUESTIONS)
+            )
+            results.append(qs)
+        return results
+
+    return word_searches
+
+
+class GenNamedListsTest(TestCase):
+    fixtures = [
+        "test/lexica.yaml",
+        "test/named_lists.json",
+    ]
+
+    def setUp(self):
+        self.lex = Lexicon.objects.get(lexiconName="NWL20")
+        self.old_pks = self.list_pks()
+
+    def list_pks(self):
+        named_lists = NamedList.objects.filter(lexicon=self.lex)
+        return set(named_lists.values_list("pk", flat=True))
+
+    def test_invalid_list_rejected_before_delete(self):
+        with mock.patch(
+            "wordwalls.management.commands.genNamedLists.word_searches",
+            fake_word_searches(bad_calls=1),
+        ):
+            with self.assertRaises(CommandError) as ctx:
+                call_command("genNamedLists", "NWL20", workers=2, stdout=StringIO())
+        self.assertIn("Invalid named lists", str(ctx.exception))
+        # The old lists are all still there, and nothing was added.
+        self.assertEqual(self.list_pks(), self.old_pks)
+
+    def test_lists_replaced(self):
+        with mock.patch(
+            "wordwalls.management.commands.genNamedLists.word_searches",
+            fake_word_searches(),
+        ):
+            call_command("genNamedLists", "NWL20", workers=2, stdout=StringIO())
+        self.assertFalse(self.old_pks & self.list_pks())
+        named_lists = NamedList.objects.filter(lexicon=self.lex)
+        sevens = named_lists.get(name="The Sevens")
+        self.assertTrue(sevens.isRange)
+        self.assertEqual(sevens.get_questions(), [1, 21068])
+        jqxz = named_lists.get(name="JQXZ Fives")
+        self.assertTrue(jqxz.packed)
+        self.assertEqual(jqxz.get_questions(), QUESTIONS)
@@ -0,0 +1,70 @@
+import unittest
+
+from wordwalls.round_state import (
+    answer_index,
+    missed_question_indices,
+    new_round_state,
+    num_unsolved,
+    upgrade_state,
+)
+
+
+class RoundStateTestCase(unittest.TestCase):
+    def setUp(self):
+        self.questions = [
+            {"a": "AEILNOST", "ws": ["ELATIONS", "INSOLATE", "TOENAILS"]},
+            {"a": "ADEEMNRT", "ws": ["TRADEMEN"]},
+        ]
+
+    def test_new_round(self):
+        state = new_round_state(self.questions, [10, 3])
+        state["quizStartTime"] = 1
+        self.assertEqual(state["numAnswersThisRound"], 4)
+        self.assertEqual(num_unsolved(state), 4)
+        self.assertEqual(answer_index(state, 1)["TOENAILS"], 0)
+        self.assertEqual(answer_index(state, 1)["TRADEMEN"], 1)
+        state["solvers"]["TRADEMEN"] = "cesar"
+        self.assertEqual(num_unsolved(state), 3)
+        self.assertEqual(missed_question_indices(state), {10})
+
+    def test_upgrade_legacy_state(self):
+        original = {
+            "ELATIONS": ["AEILNOST", 10],
+            "INSOLATE": ["AEILNOST", 10],
+            "TOENAILS": ["AEILNOST", 10],
+            "TRADEMEN": ["ADEEMNRT", 3],
+        }
+        answer_hash = dict(original)
+        del answer_hash["INSOLATE"]
+        del answer_hash["TRADEMEN"]
+        state = {
+            "answerHash": answer_hash,
+            "originalAnswerHash": original,
+            "numAnswersThisRound": 4,
+            "quizGoing": True,
+            "quizStartTime": 2,
+            "questions": self.questions,
+            "solvers": {"INSOLATE": "cesar"},
+        }
+        upgrade_state(state)
+        self.assertFalse("answerHash" in state)
+        self.assertFalse("originalAnswerHash" in state)
+        self.assertEqual(state["questionIndices"], [10, 3])
+        self.assertEqual(
+            state["solvers"], {"INSOLATE": "cesar", "TRADEMEN": "Anonymous"}
+        )
+        self.assertEqual(num_unsolved(state), 2)
+        self.assertEqual(missed_question_indices(state), {10})
+
+    def test_upgrade_legacy_state_without_questions(self):
+        state = {
+            "answerHash": {"TRADEMEN": ["ADEEMNRT", 3]},
+            "originalAnswerHash": {"TRADEMEN": ["ADEEMNRT", 3]},
+            "numAnswersThisRound": 1,
+            "quizGoing": True,
+            "solvers": {},
+        }
+        upgrade_state(state)
+        self.assertEqual(state["questions"], [{"a": "ADEEMNRT", "ws": ["TRADEMEN"]}])
+        self.assertEqual(state["questionIndices"], [3])
+        self.assertEqual(num_unsolved(state), 1)
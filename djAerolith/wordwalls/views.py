@@ -34,15 +34,14 @@ from django.views.decorators.http import require_http_methods
 import waffle
 
 from base.forms import LexiconForm
-from base.models import Lexicon, WordList, EXCLUDED_LEXICA
+from base.models import Lexicon, WordList
 from wordwalls.game import WordwallsGame
+from wordwalls.leaderboards import get_leaderboard_data_for_dc_instance
+from wordwalls.meta_info import get_create_meta_info
 from lib.wdb_interface.wdb_helper import questions_from_alphagrams
 from wordwalls.models import (
     DailyChallenge,
-    DailyChallengeLeaderboard,
-    DailyChallengeLeaderboardEntry,
     DailyChallengeName,
-    Medal,
     WordwallsGameModel,
 )
 import wordwalls.settings
@@ -130,35 +129,6 @@ def get_user_meta_info(user):
     }
 
 
-def get_create_meta_info():
-    """Return meta info for table creation. This would be good to cache."""
-    challenge_info = []
-    exclude_priority = DailyChallengeName.SPECIAL_CHALLENGE_ORDER_PRIORITY
-
-    for i in DailyChallengeName.objects.exclude(orderPriority=exclude_priority):
-        challenge_info.append(
-            {
-                "id": i.pk,
-                "seconds": i.timeSecs,
-                "numQuestions": i.num_questions,
-                "name": i.name,
-                "orderPriority": i.orderPriority,
-            }
-        )
-
-    lexica = []
-    for l in Lexicon.objects.exclude(lexiconName__in=EXCLUDED_LEXICA):
-        lexica.append(
-            {
-                "id": l.pk,
-                "lexicon": l.lexiconName,
-                "description": l.lexiconDescription,
-                "lengthCounts": json.loads(l.lengthCounts),
-            }
-        )
-    return {"challenge_info": challenge_info, "lexica": lexica}
-
-
 def handle_table_post(request, tableid):
     """XXX: This function should be separated into several RPC style
     API functions. See rpc.py."""
@@ -283,55 +253,9 @@ def create_user_list(contents: str, filename, lex, user):
     return True, ""
 
 
-def get_leaderboard_data_for_dc_instance(dc, tiebreaker):
-    """
-    Gets leaderboard data given a daily challenge instance.
-    Returns a dictionary of `entry`s.
-
-    """
-    try:
-        lb = DailyChallengeLeaderboard.objects.get(challenge=dc)
-    except DailyChallengeLeaderboard.DoesNotExist:
-        return None
-
-    lbes = DailyChallengeLeaderboardEntry.objects.filter(board=lb)
-    retData = {"maxScore": lb.maxScore, "entries": []}
-    medals = Medal.objects.filter(leaderboard=lb)
-    medal_hash = {}
-    for m in medals:
-        medal_hash[m.user] = m.get_medal_type_display()
-    entries = []
-    for lbe in lbes:
-        # Check if this user has a medal.
-        # XXX: This can be made faster later by just returning the medals
-        # and letting the front end calculate what medal belongs where.
-        addl_data = None
-        if lbe.user in medal_hash:
-            addl_data = json.dumps({"medal": medal_hash[lbe.user]})
-        entry = {
-            "user": lbe.user.username,
-            "score": lbe.score,
-            "tr": lbe.timeRemaining,
-            "w": lbe.wrong_answers,
-            "addl": addl_data,
-        }
-        entries.append(entry)
-
-    if tiebreaker == "time":
-        tiebreak_fn = lambda i: (-i["score"], -i["tr"], i["w"])  # noqa
-
-    elif tiebreaker == "errors":
-        tiebreak_fn = lambda i: (-i["score"], i["w"], -i["tr"])  # noqa
-
-    entries = sorted(entries, key=tiebreak_fn)
-
-    retData["entries"] = entries
-    retData["challengeName"] = dc.name.name
-    retData["lexicon"] = dc.lexicon.lexiconName
-    return retData
-
-
-def get_leaderboard_data(lex, chName, challengeDate, tiebreaker):
+def get_leaderboard_data(
+    lex, chName, challengeDate, tiebreaker, offset=0, limit=None
+):
     if chName.name == DailyChallengeName.WEEKS_BINGO_TOUGHIES:
         chdate = toughies_challenge_date(challengeDate)
     else:
@@ -341,7 +265,7 @@ def get_leaderboard_data(lex, chName, challengeDate, tiebreaker):
     except DailyChallenge.DoesNotExist:
         return None  # daily challenge doesn't exist
 
-    return get_leaderboard_data_for_dc_instance(dc, tiebreaker)
+    return get_leaderboard_data_for_dc_instance(dc, tiebreaker, offset, limit)
 
 
 @login_required